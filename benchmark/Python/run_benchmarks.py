@@ -0,0 +1,184 @@
+import argparse
+import contextlib
+import datetime
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir)
+sys.path.append(os.path.join(ROOT, "common", "Python"))
+sys.path.append(os.path.join(ROOT, "master_production_scheduling", "Python", "common"))
+sys.path.append(os.path.join(ROOT, "procurement_planning", "Python", "code"))
+from solver_session import EnvPool
+from timing import TimerRegistry
+
+# benchmark grids: every combination of the listed sizes is one benchmark case
+GRIDS = {
+    "small": {"mps": {"T": [6, 12], "n": [3, 6], "m": [4], "m_A": [2], "q": [10, 50]},
+              "procurement": {"d_max": [10], "x_max": [20], "y_max": [15]}},
+    "medium": {"mps": {"T": [12, 24], "n": [6, 12], "m": [4, 8], "m_A": [2, 4], "q": [50, 100]},
+               "procurement": {"d_max": [10, 20], "x_max": [20, 40], "y_max": [15, 30]}},
+    "large": {"mps": {"T": [24, 52], "n": [12, 24], "m": [8], "m_A": [4], "q": [100, 200]},
+              "procurement": {"d_max": [20, 40], "x_max": [40, 80], "y_max": [30, 60]}},
+}
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.jsonl")
+
+
+def grid_cases(grid):
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def case_name(suite, sizes, solver):
+    return f"{suite} " + " ".join(f"{key}={value}" for key, value in sizes.items()) + f" solver={solver}"
+
+
+def run_mps_case(sizes, solver, num_sim, shrinking, env=None):
+    # build, solve, non-anticipativity stage and simulations of a generated master production scheduling instance
+    from evaluation_mps import draw_availabilities
+    from instances_mps import MPSInstance, generate_instance
+    from models_mps import ProductionPlanModel
+    from sampling_mps import draw_samples
+
+    timers = TimerRegistry(case_name("mps", sizes, solver))
+    with timers.phase("total"):
+        instance = MPSInstance.from_dict(generate_instance(**sizes))
+        with timers.phase("draw_samples"):
+            instance = instance.with_samples(draw_samples(instance.A, sizes["q"]))
+        model = ProductionPlanModel.from_instance(instance, solver_params={"OutputFlag": 0}, env=env, solver=solver,
+                                                  timers=timers)
+        model.build_model()
+        if model.optimize():
+            realized_A = draw_availabilities(instance.A, num_sim)
+            model.schedule_replications(realized_A)
+            model.reoptimize_subject_to_non_anticipativity(epsilon=0.1)
+            model.rolling_schedule_replications(realized_A, epsilon=0.1, shrinking=shrinking)
+        else:
+            timers.count("failed solves")
+    return timers
+
+
+def run_procurement_case(sizes, solver, env=None):
+    from backend_mdp_availability import run_gurobi_solver
+    from instances_mdp_availability import generate_params
+
+    timers = TimerRegistry(case_name("procurement", sizes, solver))
+    with timers.phase("total"):
+        run_gurobi_solver(generate_params(**sizes), solver_params={"OutputFlag": 0}, env=env, solver=solver,
+                          timers=timers)
+    return timers
+
+
+def current_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.isfile(path):
+        return []
+    with open(path, "r") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def find_regressions(record, history, window=5, threshold=1.25, min_seconds=0.01):
+    # compare the wall time of each phase with the median of the last runs of the same case on the same host; a
+    # phase regresses if it is slower by the factor threshold and by at least min_seconds
+    previous = [entry for entry in history if entry["case"] == record["case"] and entry["host"] == record["host"]]
+    regressions = []
+    for phase, timing in record["phases"].items():
+        baseline_runs = [entry["phases"][phase]["wall [s]"] for entry in previous[-window:] if phase in entry["phases"]]
+        if not baseline_runs:
+            continue
+        baseline = statistics.median(baseline_runs)
+        current = timing["wall [s]"]
+        if current > threshold * baseline and current - baseline > min_seconds:
+            regressions.append((phase, baseline, current))
+    return regressions
+
+
+def run_benchmarks(suites, grid, solver="gurobi", num_sim=10, shrinking=True, repeat=1, history_path=DEFAULT_HISTORY,
+                   record=True, window=5, threshold=1.25):
+    history = load_history(history_path)
+    commit = current_commit()
+    timestamp = datetime.datetime.now().isoformat(timespec="seconds")
+    records, regressions = [], []
+    # one silent Gurobi environment for all cases, so that the environment start-up is not part of the timings
+    pool = EnvPool(1, {"OutputFlag": 0}) if solver == "gurobi" else None
+    for suite in suites:
+        for sizes in grid_cases(grid[suite]):
+            # the fastest of the repetitions is kept to reduce noise
+            runs = []
+            for _ in range(repeat):
+                with pool.acquire() if pool is not None else contextlib.nullcontext() as env:
+                    runs.append(run_mps_case(sizes, solver, num_sim, shrinking, env) if suite == "mps"
+                                else run_procurement_case(sizes, solver, env))
+            timers = min(runs, key=lambda run: run.phases["total"]["wall [s]"])
+            entry = {"timestamp": timestamp, "commit": commit, "host": platform.node(),
+                     "python": platform.python_version(), "case": timers.name, **timers.to_dict()}
+            del entry["name"]
+            case_regressions = find_regressions(entry, history, window, threshold)
+            entry["regressions"] = [phase for phase, _, _ in case_regressions]
+            regressions += [(entry["case"], *regression) for regression in case_regressions]
+            records.append(entry)
+            print(f"{entry['case']}: {entry['phases']['total']['wall [s]']:.3f} s"
+                  + (f"  REGRESSION in {', '.join(entry['regressions'])}" if entry["regressions"] else ""))
+
+    if record:
+        directory = os.path.dirname(os.path.abspath(history_path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(history_path, "a") as file:
+            for entry in records:
+                file.write(json.dumps(entry) + "\n")
+    if pool is not None:
+        pool.close()
+    return records, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Timed build/solve/simulate benchmarks on generated instances.")
+    parser.add_argument("--suite", choices=("mps", "procurement", "all"), default="all")
+    parser.add_argument("--grid", choices=sorted(GRIDS), default="small", help="predefined grid of instance sizes")
+    for name in ("T", "n", "m", "m_A", "q", "d_max", "x_max", "y_max"):
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=int, nargs="+", default=None,
+                            help=f"values of {name} (replace those of the grid)")
+    parser.add_argument("--solver", choices=("gurobi", "highs"), default="gurobi")
+    parser.add_argument("--num-sim", type=int, default=10, help="number of simulated replications per case")
+    parser.add_argument("--pinned", action="store_true",
+                        help="simulate the rolling horizon with the pinned full horizon model instead of the shrinking "
+                             "horizon")
+    parser.add_argument("--repeat", type=int, default=1, help="repetitions per case (the fastest one is recorded)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="history file (JSON lines)")
+    parser.add_argument("--no-record", action="store_true", help="do not append the results to the history file")
+    parser.add_argument("--window", type=int, default=5, help="number of previous runs forming the baseline")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown factor relative to the baseline that is flagged as regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 on regressions")
+    args = parser.parse_args()
+
+    suites = ("mps", "procurement") if args.suite == "all" else (args.suite,)
+    grid = {suite: dict(sizes) for suite, sizes in GRIDS[args.grid].items()}
+    for suite, sizes in grid.items():
+        for name in sizes:
+            if getattr(args, name) is not None:
+                sizes[name] = getattr(args, name)
+
+    _, regressions = run_benchmarks(suites, grid, solver=args.solver, num_sim=args.num_sim,
+                                    shrinking=not args.pinned, repeat=args.repeat, history_path=args.history,
+                                    record=not args.no_record, window=args.window, threshold=args.threshold)
+    for case, phase, baseline, current in regressions:
+        print(f"Regression: {case}, {phase}: {baseline:.3f} s -> {current:.3f} s")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir)
+# graphical entry points: name -> path of the frontend module
+FRONTENDS = {
+    "mps_sto": os.path.join(ROOT, "master_production_scheduling", "Python", "stochastic", "code", "frontend_sto.py"),
+    "mps_det": os.path.join(ROOT, "master_production_scheduling", "Python", "deterministic", "code",
+                            "frontend_det.py"),
+    "procurement": os.path.join(ROOT, "procurement_planning", "Python", "code", "frontend_mdp_availability.py"),
+}
+# modules that are only needed for solving or saving and must not be loaded before the window is shown
+HEAVY_MODULES = ("gurobipy", "pandas", "scipy", "openpyxl", "plotly", "PyQt5.QtWebEngineWidgets")
+
+# run in a fresh interpreter: import the frontend, show its main window and report the elapsed time and the heavy
+# modules loaded so far
+PROBE = """
+import json, os, sys, time
+start = time.perf_counter()
+path, heavy = sys.argv[1], sys.argv[2].split(",")
+os.chdir(os.path.dirname(path))
+sys.path.insert(0, os.path.dirname(path))
+module = __import__(os.path.splitext(os.path.basename(path))[0])
+imported = time.perf_counter()
+app = module.QApplication(sys.argv[:1])
+window = module.MainWindow()
+window.show()
+app.processEvents()
+shown = time.perf_counter()
+print(json.dumps({"import [s]": imported - start, "window [s]": shown - start,
+                  "heavy modules": [name for name in heavy if name in sys.modules]}))
+"""
+
+
+def measure(path, offscreen=False):
+    # cold start of one frontend in a new process, so that no module is cached (the times are measured from the end
+    # of the interpreter start-up)
+    env = dict(os.environ)
+    if offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+    process = subprocess.run([sys.executable, "-c", PROBE, path, ",".join(HEAVY_MODULES)], capture_output=True,
+                             text=True, env=env)
+    if process.returncode != 0:
+        raise RuntimeError(f"{os.path.basename(path)} could not be started:\n{process.stderr}")
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start time of the graphical frontends until the main window "
+                                                 "is shown.")
+    parser.add_argument("--frontend", choices=sorted(FRONTENDS) + ["all"], default="all")
+    parser.add_argument("--repeat", type=int, default=3, help="cold starts per frontend (the median is reported)")
+    parser.add_argument("--budget", type=float, default=1.0, help="maximum time until the window is shown [s]")
+    parser.add_argument("--offscreen", action="store_true", help="use the offscreen Qt platform (no display needed)")
+    args = parser.parse_args()
+
+    names = sorted(FRONTENDS) if args.frontend == "all" else [args.frontend]
+    failed = False
+    for name in names:
+        runs = [measure(FRONTENDS[name], args.offscreen) for _ in range(args.repeat)]
+        import_time = statistics.median(run["import [s]"] for run in runs)
+        window_time = statistics.median(run["window [s]"] for run in runs)
+        heavy = sorted(set().union(*(run["heavy modules"] for run in runs)))
+        over_budget = window_time > args.budget
+        failed = failed or over_budget or bool(heavy)
+        print(f"{name}: import {import_time:.3f} s, window shown after {window_time:.3f} s"
+              + (f"  OVER BUDGET ({args.budget:.3f} s)" if over_budget else "")
+              + (f"  eagerly loaded: {', '.join(heavy)}" if heavy else ""))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+# status codes and objective senses follow the gurobipy constants (GRB.OPTIMAL, GRB.MAXIMIZE, ...), so that the
+# status of a sparse model can be compared like the status of a Gurobi model
+LOADED, OPTIMAL, INFEASIBLE, INF_OR_UNBD, UNBOUNDED, ITERATION_LIMIT, TIME_LIMIT, INTERRUPTED, NUMERIC = \
+    1, 2, 3, 4, 5, 7, 9, 11, 12
+# status code -> name (the gurobipy name in lower case), e.g. for result tables
+STATUS_NAMES = {LOADED: "loaded", OPTIMAL: "optimal", INFEASIBLE: "infeasible", INF_OR_UNBD: "inf_or_unbd",
+                UNBOUNDED: "unbounded", ITERATION_LIMIT: "iteration_limit", TIME_LIMIT: "time_limit",
+                INTERRUPTED: "interrupted", NUMERIC: "numeric"}
+MINIMIZE, MAXIMIZE = 1, -1
+# status of scipy.optimize.linprog -> status code
+LINPROG_STATUS = {0: OPTIMAL, 1: ITERATION_LIMIT, 2: INFEASIBLE, 3: UNBOUNDED, 4: NUMERIC}
+SOLVERS = ("gurobi", "highs")
+
+
+class SparseLP:
+    # linear program  max/min obj @ x  s.t.  A x (<=, =, >=) rhs,  lb <= x <= ub  in sparse matrix form. The model
+    # offers the small part of the gurobipy interface used by the planning models (optimize, getAttr, objVal, status,
+    # ModelName, setParam, dispose) and is solved by HiGHS through scipy.optimize.linprog, which needs no license,
+    # or by Gurobi through its matrix interface
+    # Gurobi parameter -> HiGHS option of scipy.optimize.linprog; other Gurobi parameters are ignored by HiGHS
+    HIGHS_OPTIONS = {"OutputFlag": "disp", "TimeLimit": "time_limit", "IterationLimit": "maxiter",
+                     "FeasibilityTol": "primal_feasibility_tolerance", "OptimalityTol": "dual_feasibility_tolerance"}
+    # Gurobi Method parameter -> HiGHS algorithm (primal and dual simplex are both served by the HiGHS simplex)
+    HIGHS_METHODS = {-1: "highs", 0: "highs-ds", 1: "highs-ds", 2: "highs-ipm"}
+
+    def __init__(self, name="LP", solver="highs", env=None):
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown solver '{solver}'. Use one of {', '.join(SOLVERS)}.")
+        self.ModelName = name
+        self.solver = solver
+        self.env = env
+        self.params = {}
+        self.ModelSense = MAXIMIZE
+        # columns
+        self.lb = np.zeros(0)
+        self.ub = np.zeros(0)
+        self.obj = np.zeros(0)
+        # rows, collected block-wise in coordinate format
+        self.num_constrs = 0
+        self._blocks = []
+        # solution
+        self.status = LOADED
+        self.objVal = np.nan
+        self.IterCount = 0
+        self.NumNZs = 0
+        self.X = None
+        self.Pi = None
+        self.RC = None
+
+    @property
+    def num_vars(self):
+        return len(self.lb)
+
+    # model sizes under the gurobipy attribute names
+    @property
+    def NumVars(self):
+        return self.num_vars
+
+    @property
+    def NumConstrs(self):
+        return self.num_constrs
+
+    def setParam(self, param_name, value):
+        self.params[param_name] = value
+
+    def add_vars(self, *shape, lb=0.0, ub=np.inf):
+        # block of variables; returns the array of their column indices with the given shape
+        size = int(np.prod(shape))
+        index = np.arange(self.num_vars, self.num_vars + size).reshape(shape)
+        self.lb = np.concatenate([self.lb, np.broadcast_to(np.asarray(lb, dtype=float), size)])
+        self.ub = np.concatenate([self.ub, np.broadcast_to(np.asarray(ub, dtype=float), size)])
+        self.obj = np.concatenate([self.obj, np.zeros(size)])
+        return index
+
+    def linear(self, columns, coefficients):
+        # dense coefficient vector of the linear expression sum_r coefficients[r] * x[columns[r]]
+        columns = np.asarray(columns)
+        expression = np.zeros(self.num_vars)
+        np.add.at(expression, columns.ravel(), np.broadcast_to(coefficients, columns.shape).ravel())
+        return expression
+
+    def add_constrs(self, columns, coefficients, sense, rhs):
+        # one row per entry r of rhs: sum_k coefficients[r, k] * x[columns[r, k]] (sense) rhs[r], where sense is
+        # "<", "=" or ">"; returns the row indices
+        columns = np.asarray(columns)
+        columns = columns.reshape(len(columns), -1)
+        rhs = np.broadcast_to(np.asarray(rhs, dtype=float), (len(columns),))
+        coefficients = np.broadcast_to(np.asarray(coefficients, dtype=float), columns.shape)
+        rows = np.arange(self.num_constrs, self.num_constrs + len(rhs))
+        self._blocks.append((np.repeat(rows, columns.shape[1]), columns.ravel(), coefficients.ravel(),
+                             np.full(len(rhs), sense), rhs.copy()))
+        self.num_constrs += len(rhs)
+        return rows
+
+    def add_matrix_constrs(self, columns, matrix, sense, rhs):
+        # one row per row r of the scipy.sparse matrix: sum_k matrix[r, k] * x[columns[k]] (sense) rhs[r]; only the
+        # non-zero entries of the matrix are stored. Returns the row indices
+        matrix = sparse.coo_matrix(matrix)
+        rhs = np.broadcast_to(np.asarray(rhs, dtype=float), (matrix.shape[0],))
+        rows = np.arange(self.num_constrs, self.num_constrs + len(rhs))
+        self._blocks.append((rows[matrix.row], np.asarray(columns)[matrix.col], matrix.data.astype(float),
+                             np.full(len(rhs), sense), rhs.copy()))
+        self.num_constrs += len(rhs)
+        return rows
+
+    def set_objective(self, coefficients, sense=MAXIMIZE):
+        self.obj = np.asarray(coefficients, dtype=float)
+        self.ModelSense = sense
+
+    def matrix(self):
+        # constraint matrix (CSR), senses and right-hand sides
+        if not self._blocks:
+            return sparse.csr_matrix((0, self.num_vars)), np.zeros(0, dtype="<U1"), np.zeros(0)
+        rows, columns, values, senses, rhs = (np.concatenate(part) for part in zip(*self._blocks))
+        A = sparse.csr_matrix((values, (rows, columns)), shape=(self.num_constrs, self.num_vars))
+        A.eliminate_zeros()
+        return A, senses, rhs
+
+    def optimize(self, callback=None):
+        # callback: Gurobi callback (e.g. to terminate the solve); HiGHS cannot be interrupted and ignores it
+        A, senses, rhs = self.matrix()
+        self.NumNZs = A.nnz
+        if self.solver == "gurobi":
+            self._optimize_gurobi(A, senses, rhs, callback)
+        else:
+            self._optimize_highs(A, senses, rhs)
+        return self.status == OPTIMAL
+
+    def _optimize_highs(self, A, senses, rhs):
+        le, eq, ge = senses == "<", senses == "=", senses == ">"
+        # >= rows are passed as <= rows with negated coefficients
+        A_ub = sparse.vstack([A[le], -A[ge]]).tocsr()
+        b_ub = np.concatenate([rhs[le], -rhs[ge]])
+        options = {option: self.params[param_name] for param_name, option in self.HIGHS_OPTIONS.items()
+                   if param_name in self.params}
+        if "disp" in options:
+            options["disp"] = bool(options["disp"])
+        method = self.HIGHS_METHODS.get(self.params.get("Method", -1), "highs")
+        res = linprog(self.ModelSense * self.obj, A_ub=A_ub if A_ub.shape[0] else None,
+                      b_ub=b_ub if A_ub.shape[0] else None, A_eq=A[eq] if eq.any() else None,
+                      b_eq=rhs[eq] if eq.any() else None, bounds=np.column_stack([self.lb, self.ub]),
+                      method=method, options=options)
+        self.status = LINPROG_STATUS.get(res.status, NUMERIC)
+        self.IterCount = res.nit
+        if self.status != OPTIMAL:
+            self.X = self.Pi = self.RC = None
+            self.objVal = np.nan
+            return
+        self.X = res.x
+        self.objVal = float(self.obj @ res.x)
+        # dual prices d objVal / d rhs and reduced costs in the sense of the original objective
+        self.Pi = np.zeros(self.num_constrs)
+        marginals_ub = self.ModelSense * res.ineqlin.marginals if A_ub.shape[0] else np.zeros(0)
+        self.Pi[le] = marginals_ub[:le.sum()]
+        self.Pi[ge] = -marginals_ub[le.sum():]
+        if eq.any():
+            self.Pi[eq] = self.ModelSense * res.eqlin.marginals
+        self.RC = self.ModelSense * (res.lower.marginals + res.upper.marginals)
+
+    def _optimize_gurobi(self, A, senses, rhs, callback=None):
+        import gurobipy as gp
+        model = gp.Model(self.ModelName, env=self.env)
+        for param_name, value in self.params.items():
+            model.setParam(param_name, value)
+        x = model.addMVar(self.num_vars, lb=self.lb, ub=self.ub)
+        model.setObjective(self.obj @ x, self.ModelSense)
+        if self.num_constrs:
+            model.addMConstr(A, x, senses, rhs)
+        model.optimize(callback)
+        self.status = model.Status
+        self.IterCount = model.IterCount
+        if self.status == OPTIMAL:
+            self.X = np.asarray(x.X)
+            self.objVal = model.ObjVal
+            self.Pi = np.asarray(model.getAttr("Pi", model.getConstrs()))
+            self.RC = np.asarray(x.RC)
+        else:
+            self.X = self.Pi = self.RC = None
+            self.objVal = np.nan
+        model.dispose()
+
+    def optimize_lexicographic(self, objectives, callback=None):
+        # hierarchical optimization: each objective (coefficient vector in the model sense) is optimized without
+        # deteriorating the optimal values of the previous ones; objVal reports the first objective
+        primary = self.obj
+        num_blocks, num_constrs = len(self._blocks), self.num_constrs
+        optimal = False
+        iterations = 0
+        for rank, objective in enumerate(objectives):
+            self.obj = np.asarray(objective, dtype=float)
+            optimal = self.optimize(callback)
+            iterations += self.IterCount
+            if not optimal:
+                break
+            if rank < len(objectives) - 1:
+                # keep the objective at its optimal value up to the solver tolerance
+                bound = self.objVal + self.ModelSense * 1e-9 * max(1.0, abs(self.objVal))
+                columns = np.flatnonzero(self.obj)
+                self.add_constrs(columns[None, :], self.obj[columns][None, :],
+                                 ">" if self.ModelSense == MAXIMIZE else "<", bound)
+        # remove the objective constraints and report the primary objective
+        del self._blocks[num_blocks:]
+        self.num_constrs = num_constrs
+        self.obj = primary
+        self.IterCount = iterations
+        if optimal:
+            self.objVal = float(primary @ self.X)
+            self.Pi = self.Pi[:num_constrs]
+        return optimal
+
+    def getAttr(self, attr, columns):
+        # attribute values ("X" or "RC") of the given columns, like gurobipy's Model.getAttr
+        return getattr(self, attr)[np.asarray(columns)]
+
+    def dispose(self):
+        self.X = self.Pi = self.RC = None
@@ -0,0 +1,43 @@
+import threading
+
+
+class Cancelled(Exception):
+    # raised in the thread running the solver when the run has been cancelled
+    pass
+
+
+class RunControl:
+    # progress reporting, intermediate results and cooperative cancellation of a solver run. The callbacks are called
+    # in the thread running the solver; cancel() may be called from any thread and takes effect at the next check,
+    # or within a running Gurobi solve through gurobi_callback
+    def __init__(self, on_progress=None, on_results=None):
+        self.on_progress = on_progress
+        self.on_results = on_results
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise Cancelled()
+
+    def progress(self, phase, done=0, total=0):
+        # phase started (total = 0) or done of total steps (e.g. replications) of the phase completed
+        self.check()
+        if self.on_progress is not None:
+            self.on_progress(phase, done, total)
+
+    def publish(self, results):
+        # results available so far (a copy, so that the receiver may keep it)
+        if self.on_results is not None:
+            self.on_results(dict(results))
+
+    def gurobi_callback(self, model, where):
+        # callback of Model.optimize: a cancelled run terminates the solve (status INTERRUPTED)
+        if self._cancelled.is_set():
+            model.terminate()
@@ -0,0 +1,180 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+
+# registry file shared by all applications (the environment variable RUN_REGISTRY selects another file)
+DEFAULT_REGISTRY = os.environ.get("RUN_REGISTRY", os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                                                                os.pardir, "runs.sqlite"))
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created TEXT NOT NULL,
+    application TEXT NOT NULL,
+    status TEXT NOT NULL,
+    param_hash TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    results TEXT,
+    timings TEXT,
+    solver_stats TEXT,
+    result_paths TEXT
+);
+CREATE TABLE IF NOT EXISTS run_params (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS runs_hash ON runs (param_hash);
+CREATE INDEX IF NOT EXISTS runs_application ON runs (application, created);
+CREATE INDEX IF NOT EXISTS run_params_value ON run_params (name, value, run_id);
+"""
+# comparison operators of parameter conditions
+OPERATORS = ("=", "!=", "<", "<=", ">", ">=")
+
+
+def to_json(value, sort_keys=True):
+    # JSON with NumPy arrays and scalars as lists and numbers
+    return json.dumps(value, sort_keys=sort_keys,
+                      default=lambda item: item.tolist() if hasattr(item, "tolist") else str(item))
+
+
+def parameter_hash(params, inputs=None):
+    # hash of the parameters and input data of a run; runs of the same scenario have the same hash
+    return hashlib.sha256(to_json({"params": params, "inputs": inputs}).encode()).hexdigest()
+
+
+class RunRegistry:
+    # SQLite registry of solver runs: parameters (indexed), input data, results, phase timings, solver statistics
+    # and paths of the result files. Each call opens its own connection, so a registry may be shared by threads
+    # (e.g. a solver running in the background) and processes
+    def __init__(self, path=DEFAULT_REGISTRY, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with closing(self._connect()) as connection, connection:
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=self.timeout)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA foreign_keys = ON")
+        return connection
+
+    def record(self, application, params, inputs=None, results=None, timers=None, result_paths=None,
+               status="finished"):
+        # params: scalar parameters (indexed, e.g. sizes, distribution parameters, solver), inputs: further input
+        # data (e.g. arrays of an instance), timers: TimerRegistry of the run; returns the id of the run
+        timings = solver_stats = None
+        if timers is not None:
+            timings = timers.phases
+            solver_stats = {"counters": timers.counters, "models": timers.models}
+        params = {name: value.item() if isinstance(value, np.generic) else value for name, value in params.items()}
+        paths = [os.path.abspath(path) for path in result_paths or []]
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                "INSERT INTO runs (created, application, status, param_hash, inputs, results, timings, solver_stats, "
+                "result_paths) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (datetime.datetime.now().isoformat(timespec="seconds"), application, status,
+                 parameter_hash(params, inputs), to_json({"params": params, "inputs": inputs}), to_json(results),
+                 to_json(timings), to_json(solver_stats), to_json(paths)))
+            connection.executemany("INSERT INTO run_params (run_id, name, value) VALUES (?, ?, ?)",
+                                   [(cursor.lastrowid, name, value) for name, value in params.items()])
+            return cursor.lastrowid
+
+    def find(self, application=None, param_hash=None, status=None, limit=None, params=None):
+        # runs (newest first) matching all conditions on parameters, given as params={name: value} or
+        # {name: (operator, value)}, e.g. find("mps_stochastic", params={"T": 12, "q": (">=", 50)}); each condition
+        # is answered by the parameter index
+        query = "SELECT * FROM runs"
+        clauses, values = [], []
+        for column, value in (("application", application), ("param_hash", param_hash), ("status", status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                values.append(value)
+        for name, condition in (params or {}).items():
+            operator, value = condition if isinstance(condition, tuple) else ("=", condition)
+            if operator not in OPERATORS:
+                raise ValueError(f"Unknown operator '{operator}'. Use one of {', '.join(OPERATORS)}.")
+            clauses.append(f"id IN (SELECT run_id FROM run_params WHERE name = ? AND value {operator} ?)")
+            values += [name, value]
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY id DESC"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        with closing(self._connect()) as connection:
+            return [self._decode(row) for row in connection.execute(query, values)]
+
+    def get(self, run_id):
+        with closing(self._connect()) as connection:
+            row = connection.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return self._decode(row) if row is not None else None
+
+    def latest(self, params, inputs=None):
+        # most recent finished run of the same scenario (e.g. to show its results instead of solving again)
+        runs = self.find(param_hash=parameter_hash(params, inputs), status="finished", limit=1)
+        return runs[0] if runs else None
+
+    def table(self, runs, results=True):
+        # pandas table of runs with one column per parameter and (optionally) per result
+        import pandas as pd
+
+        rows = []
+        for run in runs:
+            row = {"id": run["id"], "created": run["created"], "application": run["application"],
+                   "status": run["status"], **run["inputs"]["params"]}
+            if results and isinstance(run["results"], dict):
+                row.update(run["results"])
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    @staticmethod
+    def _decode(row):
+        run = dict(row)
+        for column in ("inputs", "results", "timings", "solver_stats", "result_paths"):
+            run[column] = json.loads(run[column]) if run[column] is not None else None
+        return run
+
+
+def parse_condition(entry):
+    # "name<op>value" -> (name, (operator, value)), e.g. "T=12" or "q>=50"
+    for operator in sorted(OPERATORS, key=len, reverse=True):
+        name, sep, value = entry.partition(operator)
+        if sep and name:
+            for convert in (int, float, str):
+                try:
+                    return name, (operator, convert(value))
+                except ValueError:
+                    continue
+    raise argparse.ArgumentTypeError(f"Invalid condition '{entry}'. Use e.g. T=12 or q>=50.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List past solver runs of the run registry.")
+    parser.add_argument("conditions", nargs="*", type=parse_condition,
+                        help="conditions on parameters, e.g. T=12 q>=50 solver=highs")
+    parser.add_argument("--registry", default=DEFAULT_REGISTRY, help="registry file (SQLite)")
+    parser.add_argument("--application", default=None, help="e.g. mps_stochastic, mps_deterministic, procurement")
+    parser.add_argument("--limit", type=int, default=20, help="maximum number of runs (newest first)")
+    parser.add_argument("--output", default=None, help="write the table to a .csv file instead of printing it")
+    args = parser.parse_args()
+
+    registry = RunRegistry(args.registry)
+    runs = registry.find(args.application, limit=args.limit, params=dict(args.conditions))
+    table = registry.table(runs)
+    if args.output:
+        table.to_csv(args.output, index=False)
+    else:
+        print(table.to_string(index=False) if len(table) else "No runs found.")
+
+
+if __name__ == "__main__":
+    main()
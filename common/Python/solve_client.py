@@ -0,0 +1,106 @@
+import importlib
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+
+from run_control import Cancelled, RunControl
+from run_registry import RunRegistry, to_json
+from solve_service import APPLICATIONS
+
+# address of the solve service used by the frontends; if it is not set, they solve locally
+SERVICE_URL_VARIABLE = "SOLVE_SERVICE_URL"
+
+
+class ServiceError(Exception):
+    # error reported by the solve service (or the service is unreachable)
+    pass
+
+
+class SolveClient:
+    # client of the solve service (solve_service.py), e.g. http://127.0.0.1:8765
+    def __init__(self, url=None, timeout=30.0):
+        self.url = (url or os.environ.get(SERVICE_URL_VARIABLE) or "http://127.0.0.1:8765").rstrip("/")
+        self.timeout = timeout
+
+    def request(self, method, path, payload=None):
+        data = to_json(payload, sort_keys=False).encode() if payload is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", e.reason)
+            except ValueError:
+                message = e.reason
+            raise ServiceError(f"Solve service: {message}") from e
+        except urllib.error.URLError as e:
+            raise ServiceError(f"The solve service at {self.url} is not reachable: {e.reason}") from e
+
+    def submit(self, application, arguments):
+        return self.request("POST", "/jobs", {"application": application, "arguments": arguments})
+
+    def job(self, job_id):
+        return self.request("GET", f"/jobs/{job_id}")
+
+    def cancel(self, job_id):
+        return self.request("DELETE", f"/jobs/{job_id}")
+
+    def health(self):
+        return self.request("GET", "/health")
+
+    def solve(self, application, arguments, control=None, poll_interval=0.5):
+        # submit a job and wait for it; its progress is reported to control, and cancelling control cancels the job.
+        # Returns the finished job (results and timings)
+        control = control if control is not None else RunControl()
+        job = self.submit(application, arguments)
+        try:
+            while job["status"] in ("queued", "running"):
+                if job["status"] == "queued":
+                    control.progress("service_queue")
+                elif "progress" in job:
+                    control.progress(job["progress"]["phase"], job["progress"]["done"], job["progress"]["total"])
+                time.sleep(poll_interval)
+                control.check()
+                job = self.job(job["job"])
+        except Cancelled:
+            self.cancel(job["job"])
+            raise
+        if job["status"] == "cancelled":
+            raise Cancelled()
+        if job["status"] == "failed":
+            raise ServiceError(f"Solve service: {job.get('error')}")
+        return job
+
+
+def remote_solver(application, url=None):
+    # function with the arguments of run_gurobi_solver of the application's backend that solves in the solve service
+    client = SolveClient(url)
+    names = APPLICATIONS[application]["arguments"]
+
+    def run_gurobi_solver(*args, control=None, timers=None, **kwargs):
+        job = client.solve(application, {**dict(zip(names, args)), **kwargs}, control)
+        # timings of the run in the service
+        if timers is not None:
+            timers.phases.update(job["timings"]["phases"])
+            timers.counters.update(job["timings"]["counters"])
+            timers.models.update(job["timings"]["models"])
+        if application == "procurement":
+            import pandas as pd
+            return pd.DataFrame(job["results"]["policy"]), job["results"]["performance"]
+        return job["results"]
+
+    return run_gurobi_solver
+
+
+def solver_for(application):
+    # run_gurobi_solver of the application and additional keyword arguments for it: with SOLVE_SERVICE_URL set, the
+    # frontends are thin clients of the solve service (which records the runs), otherwise the backend is loaded and
+    # solves locally, recording the run in the run registry
+    url = os.environ.get(SERVICE_URL_VARIABLE)
+    if url:
+        return remote_solver(application, url), {}
+    return importlib.import_module(APPLICATIONS[application]["module"]).run_gurobi_solver, {"registry": RunRegistry()}
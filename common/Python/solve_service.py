@@ -0,0 +1,348 @@
+import argparse
+import asyncio
+import importlib
+import json
+import math
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from run_control import Cancelled, RunControl
+from run_registry import DEFAULT_REGISTRY, RunRegistry, parameter_hash, to_json
+from timing import TimerRegistry
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir)
+MPS_ARGUMENTS = ("n", "m", "m_A", "T", "x_a", "R_a", "R_fix", "a", "A", "b", "c", "h", "k", "p", "d")
+# applications of the service: code directory, backend module and arguments of its run_gurobi_solver that a client
+# may pass (in the order of the positional arguments); results_dir, env, timers, control and registry are set by the
+# service
+APPLICATIONS = {
+    "mps_stochastic": {
+        "directory": os.path.join(ROOT, "master_production_scheduling", "Python", "stochastic", "code"),
+        "module": "backend_sto",
+        "arguments": MPS_ARGUMENTS + ("q", "solver_params", "resample", "shrinking", "solver", "A_l", "num_sim",
+                                       "precision", "min_sim", "distribution"),
+    },
+    "mps_deterministic": {
+        "directory": os.path.join(ROOT, "master_production_scheduling", "Python", "deterministic", "code"),
+        "module": "backend_det",
+        "arguments": MPS_ARGUMENTS + ("solver_params", "shrinking", "solver", "num_sim", "precision", "min_sim",
+                                       "distribution"),
+    },
+    "procurement": {
+        "directory": os.path.join(ROOT, "procurement_planning", "Python", "code"),
+        "module": "backend_mdp_availability",
+        "arguments": ("params", "solver_params", "solver"),
+    },
+}
+# numeric tuning parameters of the solver that a client may set; all other parameters (in particular those writing
+# files on the host, e.g. LogFile or ResultFile) are rejected
+SOLVER_PARAMS = ("TimeLimit", "IterationLimit", "MIPGap", "Threads", "Method", "OptimalityTol", "FeasibilityTol",
+                 "Presolve", "Crossover", "NumericFocus", "ScaleFlag", "Seed")
+MAX_BODY_SIZE = 64 * 1024 * 1024
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 503: "Service Unavailable"}
+# configuration and solver session of a worker process (the session is created by the first Gurobi job)
+WORKER_CONFIG = {}
+SESSION = None
+
+
+def solver_params_error(solver_params):
+    # error message for solver parameters of a client that the service does not accept (None if they are valid)
+    if solver_params is None:
+        return None
+    if not isinstance(solver_params, dict):
+        return "The solver parameters must be a JSON object."
+    unknown = set(solver_params) - set(SOLVER_PARAMS)
+    if unknown:
+        return (f"Solver parameters not accepted by the service: {', '.join(sorted(unknown))}. "
+                f"Use {', '.join(SOLVER_PARAMS)}.")
+    invalid = [name for name, value in solver_params.items()
+               if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value)]
+    if invalid:
+        return f"Solver parameters must be numbers: {', '.join(sorted(invalid))}."
+    return None
+
+
+def init_worker(cores, env_params):
+    WORKER_CONFIG.update(cores=cores, env_params=env_params)
+
+
+def solve_job(application, arguments, results_dir, registry_path=None, cancel_event=None, progress=None):
+    # solve one job in a worker process; a set cancel_event cancels the run, progress (a shared dictionary) receives
+    # the current phase. Returns the results (JSON types) and the timings of the run
+    global SESSION
+    spec = APPLICATIONS[application]
+    if spec["directory"] not in sys.path:
+        sys.path.append(spec["directory"])
+    run_gurobi_solver = importlib.import_module(spec["module"]).run_gurobi_solver
+
+    def report(phase, done, total):
+        if progress is not None:
+            progress.update(phase=phase, done=done, total=total)
+
+    control = RunControl(on_progress=report)
+    timers = TimerRegistry(application)
+    kwargs = dict(arguments, control=control, timers=timers)
+    if application != "procurement":
+        kwargs["results_dir"] = results_dir
+    if registry_path is not None:
+        kwargs["registry"] = RunRegistry(registry_path)
+    solver_params = kwargs.pop("solver_params", None)
+
+    # the cancellation of the job is passed on to the run control of the solver
+    finished = threading.Event()
+
+    def watch():
+        while not finished.is_set():
+            if cancel_event.wait(0.2):
+                control.cancel()
+                return
+
+    if cancel_event is not None:
+        threading.Thread(target=watch, daemon=True).start()
+    try:
+        if kwargs.get("solver", "gurobi") == "gurobi":
+            # one pooled Gurobi environment per worker process, reused for all jobs of the worker
+            if SESSION is None:
+                from solver_session import SolverSession
+                SESSION = SolverSession(pool_size=1, cores=WORKER_CONFIG.get("cores"),
+                                        env_params=WORKER_CONFIG.get("env_params"))
+            with SESSION.job(solver_params=solver_params) as (env, job_params):
+                outcome = run_gurobi_solver(**kwargs, solver_params=job_params, env=env)
+        else:
+            outcome = run_gurobi_solver(**kwargs, solver_params=solver_params)
+    finally:
+        finished.set()
+    if application == "procurement":
+        policy, performance_results = outcome
+        outcome = {"policy": policy.to_dict(orient="list"), "performance": performance_results}
+    return {"results": json.loads(to_json(outcome, sort_keys=False)), "timings": timers.to_dict()}
+
+
+@dataclass
+class Job:
+    id: str
+    application: str
+    arguments: dict
+    key: str
+    status: str = "queued"
+    created: float = field(default_factory=time.time)
+    result: dict = None
+    error: str = None
+    cancel_event: object = None
+    progress: object = None
+
+    def to_dict(self, cached=False):
+        job = {"job": self.id, "application": self.application, "status": self.status, "cached": cached}
+        # current phase of a running job (once the solver has reported one)
+        if self.status == "running" and self.progress is not None and len(self.progress):
+            job["progress"] = dict(self.progress)
+        if self.result is not None:
+            job.update(self.result)
+        if self.error is not None:
+            job["error"] = self.error
+        return job
+
+
+class SolveService:
+    # HTTP/JSON solve service for the planning backends: jobs wait in a bounded queue and are solved by a pool of
+    # worker processes. Results are cached by the hash of application and arguments, and a request identical to a
+    # queued or running job is attached to that job instead of being solved again
+    def __init__(self, workers=1, queue_size=32, cache_size=256, results_dir="./service_results", registry=None,
+                 cores=None, solver_log=False):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.cache_size = cache_size
+        self.results_dir = results_dir
+        self.registry = registry
+        # the cores are split among the worker processes so that parallel solves do not oversubscribe the machine
+        cores_per_worker = max(1, (cores or os.cpu_count() or 1) // workers)
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=init_worker,
+                                            initargs=(cores_per_worker, {"OutputFlag": int(solver_log)}))
+        # cancellation events and progress of jobs shared with the worker processes
+        self.manager = multiprocessing.get_context("spawn").Manager()
+        self.queue = None
+        self.jobs = OrderedDict()
+        self.cache = OrderedDict()
+        self.in_flight = {}
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        dispatchers = [asyncio.create_task(self.dispatch()) for _ in range(self.workers)]
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Solve service listening on http://{host}:{port} ({self.workers} workers)")
+        try:
+            # a terminated service stops its worker processes (no signal handlers on Windows, use Ctrl+C there)
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except NotImplementedError:
+            pass
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for dispatcher in dispatchers:
+                dispatcher.cancel()
+            # running jobs are cancelled, waiting ones dropped
+            for job in self.in_flight.values():
+                job.cancel_event.set()
+            self.executor.shutdown(cancel_futures=True)
+            self.manager.shutdown()
+
+    def submit(self, payload):
+        # returns the HTTP status and the job
+        application = payload.get("application")
+        arguments = payload.get("arguments", {})
+        if application not in APPLICATIONS:
+            return 400, {"error": f"Unknown application '{application}'. Use one of {', '.join(APPLICATIONS)}."}
+        if not isinstance(arguments, dict):
+            return 400, {"error": "The arguments must be a JSON object."}
+        unknown = set(arguments) - set(APPLICATIONS[application]["arguments"])
+        if unknown:
+            return 400, {"error": f"Unknown arguments for '{application}': {', '.join(sorted(unknown))}."}
+        error = solver_params_error(arguments.get("solver_params"))
+        if error:
+            return 400, {"error": error}
+        key = parameter_hash({"application": application}, arguments)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return 200, self.cache[key].to_dict(cached=True)
+        if key in self.in_flight:
+            return 202, self.in_flight[key].to_dict()
+        if self.queue.full():
+            return 503, {"error": "The job queue is full. Please try again later."}
+        job = Job(uuid.uuid4().hex[:12], application, arguments, key, cancel_event=self.manager.Event(),
+                  progress=self.manager.dict())
+        self.jobs[job.id] = job
+        self.in_flight[key] = job
+        self.queue.put_nowait(job)
+        self.forget_old_jobs()
+        return 202, job.to_dict()
+
+    def cancel(self, job):
+        if job.status == "queued":
+            job.status = "cancelled"
+            self.in_flight.pop(job.key, None)
+        elif job.status == "running":
+            job.cancel_event.set()
+        else:
+            return 409, {"error": f"Job {job.id} has already {job.status}."}
+        return 200, job.to_dict()
+
+    def forget_old_jobs(self):
+        # only the most recent jobs are kept for status requests (finished results remain in the cache)
+        for job_id in list(self.jobs)[:max(0, len(self.jobs) - 4 * self.cache_size)]:
+            if self.jobs[job_id].status not in ("queued", "running"):
+                del self.jobs[job_id]
+
+    async def dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            if job.status == "cancelled":
+                continue
+            job.status = "running"
+            try:
+                job.result = await loop.run_in_executor(
+                    self.executor, solve_job, job.application, job.arguments,
+                    os.path.join(self.results_dir, job.id), self.registry, job.cancel_event, job.progress)
+                job.status = "finished"
+                self.cache[job.key] = job
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            except Cancelled:
+                job.status = "cancelled"
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                self.in_flight.pop(job.key, None)
+
+    def route(self, method, path, body):
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        if parts == ["health"] and method == "GET":
+            running = sum(job.status == "running" for job in self.in_flight.values())
+            return 200, {"workers": self.workers, "queued": self.queue.qsize(), "running": running,
+                         "cached": len(self.cache)}
+        if parts == ["jobs"] and method == "POST":
+            try:
+                payload = json.loads(body or b"{}")
+            except json.JSONDecodeError as e:
+                return 400, {"error": f"Invalid JSON: {e}"}
+            if not isinstance(payload, dict):
+                return 400, {"error": "The request must be a JSON object."}
+            return self.submit(payload)
+        if len(parts) == 2 and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                return 404, {"error": f"Unknown job '{parts[1]}'."}
+            if method == "GET":
+                return 200, job.to_dict()
+            if method == "DELETE":
+                return self.cancel(job)
+        if parts in (["health"], ["jobs"]) or (len(parts) == 2 and parts[0] == "jobs"):
+            return 405, {"error": f"Method {method} is not allowed for {path}."}
+        return 404, {"error": f"Unknown path {path}."}
+
+    async def handle(self, reader, writer):
+        # one request per connection: request line, headers and a JSON body of the given length
+        try:
+            method, path, _ = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY_SIZE:
+                status, response = 413, {"error": "The request is too large."}
+            else:
+                status, response = self.route(method, path, await reader.readexactly(length))
+        except (ValueError, asyncio.IncompleteReadError):
+            status, response = 400, {"error": "Invalid HTTP request."}
+        body = to_json(response, sort_keys=False).encode()
+        writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON solve service for the planning backends.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes (parallel solves)")
+    parser.add_argument("--queue-size", type=int, default=32, help="maximum number of waiting jobs")
+    parser.add_argument("--cache-size", type=int, default=256, help="number of cached results")
+    parser.add_argument("--cores", type=int, default=None,
+                        help="number of cores available to the service (default: all cores of the machine)")
+    parser.add_argument("--results-dir", default="./service_results",
+                        help="directory for the result files (one subdirectory per job)")
+    parser.add_argument("--registry", nargs="?", const=DEFAULT_REGISTRY, default=None, metavar="FILE",
+                        help="record the runs in the run registry (default file: runs.sqlite of the repository)")
+    parser.add_argument("--log", action="store_true", help="show the Gurobi log")
+    args = parser.parse_args()
+
+    service = SolveService(workers=args.workers, queue_size=args.queue_size, cache_size=args.cache_size,
+                           results_dir=args.results_dir, registry=args.registry, cores=args.cores,
+                           solver_log=args.log)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
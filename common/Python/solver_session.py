@@ -0,0 +1,103 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+
+class EnvPool:
+    # pool of started Gurobi environments; an environment is created once and reused by successive solves, so the
+    # environment start-up and the license check are paid once per pool slot instead of once per model
+    def __init__(self, size=1, params=None):
+        self.size = size
+        self.params = params or {}
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _create_env(self):
+        # gurobipy is only imported once an environment is needed, so that HiGHS runs work without it
+        import gurobipy as gp
+        env = gp.Env(empty=True)
+        # environment parameters (e.g. OutputFlag) are inherited by every model built in the environment
+        for param_name, value in self.params.items():
+            env.setParam(param_name, value)
+        env.start()
+        return env
+
+    @contextmanager
+    def acquire(self):
+        try:
+            env = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            # wait for an environment to be returned if the pool is exhausted
+            env = self._create_env() if create else self._idle.get()
+        try:
+            yield env
+        finally:
+            self._idle.put(env)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().dispose()
+            except queue.Empty:
+                break
+        self._created = 0
+
+
+class ThreadBudget:
+    # hands out the cores of the machine to concurrent solves; a solve waits until the threads it asks for are free
+    def __init__(self, cores=None):
+        self.cores = cores or os.cpu_count() or 1
+        self.free = self.cores
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, threads):
+        threads = max(1, min(int(threads), self.cores))
+        with self._condition:
+            self._condition.wait_for(lambda: self.free >= threads)
+            self.free -= threads
+        try:
+            yield threads
+        finally:
+            with self._condition:
+                self.free += threads
+                self._condition.notify_all()
+
+
+class SolverSession:
+    # shared solver-session layer: pooled environments plus a thread budget, so that concurrent solves share the
+    # available cores instead of each letting Gurobi use all of them
+    def __init__(self, pool_size=1, cores=None, threads=None, method=None, env_params=None):
+        self.pool = EnvPool(pool_size, env_params)
+        self.budget = ThreadBudget(cores)
+        # default threads per solve: the cores split evenly among the pooled environments
+        self.threads = threads or max(1, self.budget.cores // pool_size)
+        self.method = method
+
+    @contextmanager
+    def job(self, threads=None, method=None, solver_params=None):
+        # yields the environment and the solver parameters of one solve; Threads in solver_params is treated
+        # as a request and replaced by the number of threads granted by the budget
+        solver_params = dict(solver_params or {})
+        requested = threads or solver_params.pop("Threads", None) or self.threads
+        with self.budget.reserve(requested) as granted, self.pool.acquire() as env:
+            solver_params["Threads"] = granted
+            method = method if method is not None else self.method
+            if method is not None:
+                solver_params["Method"] = method
+            yield env, solver_params
+
+    def close(self):
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,66 @@
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from run_control import Cancelled, RunControl
+
+# progress phases reported by the backends -> text shown in the frontends
+PHASE_LABELS = {
+    "draw_samples": "Drawing samples",
+    "build_model": "Building model",
+    "optimize": "Solving model",
+    "reoptimize_subject_to_non_anticipativity": "Solving model with non-anticipativity",
+    "schedule_simulation": "Simulating predictive schedule",
+    "rolling_simulation": "Simulating rolling schedule",
+    "rewards": "Computing rewards",
+    "transition_probabilities": "Computing transition probabilities",
+    "service_queue": "Waiting for the solve service",
+}
+
+
+def progress_text(phase, done=0, total=0):
+    label = PHASE_LABELS.get(phase, phase)
+    return f"{label}: {done}/{total}" if total else f"{label} ..."
+
+
+class SolverWorker(QObject):
+    # runs a solver function (e.g. run_gurobi_solver of a backend) in its own QThread, so that the window stays
+    # responsive. The function gets the keyword argument control (a RunControl); its progress, intermediate results
+    # and outcome arrive as signals in the GUI thread
+    progress = pyqtSignal(str, int, int)  # phase, completed steps, total steps (0 if the phase has no steps)
+    results = pyqtSignal(object)          # results available so far
+    finished = pyqtSignal(object)         # return value of the function
+    failed = pyqtSignal(str)              # error message
+    cancelled = pyqtSignal()
+
+    def __init__(self, function, *args, **kwargs):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.control = RunControl(on_progress=self.progress.emit, on_results=self.results.emit)
+        self.thread = QThread()
+        self.moveToThread(self.thread)
+        self.thread.started.connect(self.run)
+        for signal in (self.finished, self.failed, self.cancelled):
+            signal.connect(self.thread.quit)
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        try:
+            outcome = self.function(*self.args, control=self.control, **self.kwargs)
+        except Cancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.finished.emit(outcome)
+
+    def cancel(self):
+        # takes effect at the next replication or terminates the running Gurobi solve
+        self.control.cancel()
+
+    def is_running(self):
+        return self.thread.isRunning()
+
+    def wait(self):
+        self.thread.wait()
@@ -0,0 +1,61 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+
+class TimerRegistry:
+    # wall and CPU time per phase, event counters and model sizes of one run, written as JSON. Phases may be nested
+    # (e.g. optimize within a rolling horizon simulation); the time of a phase includes its nested phases
+    def __init__(self, name="run"):
+        self.name = name
+        self.phases = {}
+        self.counters = {}
+        self.models = {}
+
+    @contextmanager
+    def phase(self, name):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            entry = self.phases.setdefault(name, {"calls": 0, "wall [s]": 0.0, "cpu [s]": 0.0})
+            entry["calls"] += 1
+            entry["wall [s]"] += time.perf_counter() - wall
+            entry["cpu [s]"] += time.process_time() - cpu
+
+    def count(self, name, increment=1):
+        self.counters[name] = self.counters.get(name, 0) + increment
+
+    def record_solve(self, model):
+        # iterations of a solved Gurobi model or SparseLP and its size and status code at the first solve (before
+        # e.g. constraints of a rolling horizon stage are removed)
+        self.count("solves")
+        self.count("iterations", int(model.IterCount))
+        self.models.setdefault(model.ModelName, {"rows": int(model.NumConstrs), "cols": int(model.NumVars),
+                                                 "nnz": int(model.NumNZs), "status": int(model.status)})
+
+    def to_dict(self):
+        return {"name": self.name, "phases": self.phases, "counters": self.counters, "models": self.models}
+
+    def write_json(self, filename, directory="."):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        path = os.path.join(directory, filename)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+def timed(phase):
+    # method decorator timing the method as the given phase in the registry self.timers (if any)
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.timers is None:
+                return method(self, *args, **kwargs)
+            with self.timers.phase(phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,79 @@
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtWidgets import QAbstractItemView, QTableView
+
+
+class ArrayTableModel(QAbstractTableModel):
+    # editable table over a 2-D float array (vectors are single-row arrays); the views only request the visible
+    # cells, and entries are converted once when they are edited, so the array can be passed to the solver as is.
+    # NaN marks an empty entry
+    def __init__(self, array, row_name="", column_name=""):
+        super().__init__()
+        self.array = np.atleast_2d(np.asarray(array, dtype=float))
+        self.row_name = row_name
+        self.column_name = column_name
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.array.shape[0]
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.array.shape[1]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self.array[index.row(), index.column()]
+        if role == Qt.DisplayRole:
+            return "" if np.isnan(value) else f"{value:g}"
+        if role == Qt.EditRole:
+            return "" if np.isnan(value) else repr(float(value))
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        try:
+            self.array[index.row(), index.column()] = float(value) if str(value).strip() else np.nan
+        except ValueError:
+            # invalid entries are rejected and the previous value is kept
+            return False
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    def flags(self, index):
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        name = self.column_name if orientation == Qt.Horizontal else self.row_name
+        return f"{name}{section + 1}"
+
+    def set_array(self, array):
+        self.beginResetModel()
+        self.array = np.atleast_2d(np.asarray(array, dtype=float))
+        self.endResetModel()
+
+    def values(self, vector=False):
+        # copy of the entries (1-D for vectors), e.g. for a solver running in the background
+        return self.array[0].copy() if vector else self.array.copy()
+
+    def is_complete(self):
+        return not np.isnan(self.array).any()
+
+
+def array_table_view(model, max_rows=6, column_width=60, row_height=24):
+    # compact view of an ArrayTableModel showing up to max_rows rows; larger tables scroll
+    view = QTableView()
+    view.setModel(model)
+    view.setEditTriggers(QAbstractItemView.AllEditTriggers)
+    view.horizontalHeader().setDefaultSectionSize(column_width)
+    view.verticalHeader().setDefaultSectionSize(row_height)
+    if model.rowCount() == 1 and not model.row_name:
+        view.verticalHeader().hide()
+    rows = min(model.rowCount(), max_rows)
+    view.setFixedHeight(view.horizontalHeader().sizeHint().height() + rows * row_height + 2 * view.frameWidth()
+                        + view.horizontalScrollBar().sizeHint().height())
+    return view
@@ -0,0 +1,226 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, os.pardir, "common",
+                             "Python"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "stochastic", "code"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "deterministic", "code"))
+from backend_det import run_gurobi_solver as run_deterministic
+from backend_sto import run_gurobi_solver as run_stochastic
+from lp_backend import STATUS_NAMES
+from run_registry import DEFAULT_REGISTRY, RunRegistry
+from solver_session import SolverSession
+from distributions_mps import distribution_spec
+from instances_mps import MPSInstance
+from timing import TimerRegistry
+
+# backends of the models (imported once per process instead of per instance)
+SOLVERS = {"stochastic": run_stochastic, "deterministic": run_deterministic}
+INSTANCE_KEYS = ("n", "m", "m_A", "T", "x_a", "R_a", "R_fix", "a", "A", "b", "c", "h", "k", "p", "d")
+# solver session of the current (worker) process, created by init_worker
+SESSION = None
+
+
+def load_instance(path, model_type, q=None):
+    # read an instance file written by the frontends or by MPSInstance.save (*.json, *.npz) and return the
+    # arguments of run_gurobi_solver (validated arrays). Stored samples are used by the stochastic model; of a
+    # sample cube next to a JSON header only the first q samples are read
+    samples = (slice(q) if q is not None else slice(None)) if model_type == "stochastic" else None
+    instance = MPSInstance.load(path, samples=samples)
+    args = {key: getattr(instance, key) for key in INSTANCE_KEYS}
+    if model_type == "stochastic" and instance.A_l is not None:
+        args["A_l"] = instance.A_l
+        args["q"] = instance.q
+    elif model_type == "stochastic":
+        if q is None and path.endswith(".json"):
+            with open(path, "r") as file:
+                q = json.load(file).get("q")
+        if q is None:
+            raise ValueError(f"Instance file '{path}' holds no number of samples q.")
+        args["q"] = int(q)
+    return args
+
+
+def parse_solver_params(entries):
+    # convert "Name=Value" pairs into a Gurobi parameter dictionary
+    solver_params = {}
+    for entry in entries:
+        name, sep, value = entry.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Invalid solver parameter '{entry}'. Use Name=Value.")
+        for convert in (int, float, str):
+            try:
+                solver_params[name] = convert(value)
+                break
+            except ValueError:
+                continue
+    return solver_params
+
+
+def parse_distribution(entry):
+    # availability distribution given as a type name or a JSON specification (see distributions_mps)
+    try:
+        return distribution_spec(json.loads(entry) if entry.lstrip().startswith("{") else entry)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def init_worker(cores, threads=None, method=None, env_params=None):
+    # one pooled Gurobi environment per worker process, reused for all instances solved by the worker
+    global SESSION
+    SESSION = SolverSession(pool_size=1, cores=cores, threads=threads, method=method, env_params=env_params)
+
+
+def solve_instance(task):
+    # solve a single instance; runs in a worker process
+    path, model_type, q, solver_params, output_dir, solver, registry_path, evaluation = task
+    run_gurobi_solver = SOLVERS[model_type]
+
+    # the results directory is named after the file incl. its extension, so that e.g. x.json and x.npz of the same
+    # folder keep their results apart
+    name = os.path.basename(path)
+    row = {"instance": name, "model": model_type}
+    start = time.perf_counter()
+    try:
+        args = load_instance(path, model_type, q)
+        args.update(evaluation)
+        timers = args["timers"] = TimerRegistry(name)
+        # the run is recorded in the run registry, if one is given (SQLite handles concurrent worker processes)
+        if registry_path is not None:
+            args["registry"] = RunRegistry(registry_path)
+        if solver == "highs":
+            # HiGHS needs neither a Gurobi environment nor a license
+            results = run_gurobi_solver(**args, solver_params=solver_params, solver=solver,
+                                        results_dir=os.path.join(output_dir, name))
+        else:
+            with SESSION.job(solver_params=solver_params) as (env, job_params):
+                results = run_gurobi_solver(**args, solver_params=job_params, env=env,
+                                            results_dir=os.path.join(output_dir, name))
+                row["threads"] = job_params["Threads"]
+        # status of the solve of the predictive schedule (the first solve of the run), e.g. time_limit if no
+        # schedule was found within the time limit
+        statuses = [model["status"] for model in timers.models.values()]
+        row["status"] = STATUS_NAMES.get(statuses[0], f"status {statuses[0]}") if statuses else "failed"
+        row.update(results)
+    except Exception as e:
+        row["status"] = "error"
+        row["error"] = str(e)
+    row["runtime [s]"] = time.perf_counter() - start
+    return row
+
+
+def run_batch(instance_dir, model_type, output_dir, workers=1, q=None, solver_params=None, output="summary.csv",
+              threads=None, method=None, cores=None, solver="gurobi", registry=None, evaluation=None,
+              export_format=None, timings=False):
+    # evaluation: keyword arguments of run_gurobi_solver for the samples and simulations (num_sim, precision,
+    # min_sim, distribution and, of the stochastic model, resample). Columnar exports of the schedules (export_format
+    # "parquet" or "feather") and the timings of each run (timings.json) are written to the result directories of
+    # the instances on request
+    evaluation = {**(evaluation or {}), "export_format": export_format,
+                  "timings_file": "timings.json" if timings else None}
+    paths = sorted(glob.glob(os.path.join(instance_dir, "*.json")) + glob.glob(os.path.join(instance_dir, "*.npz")))
+    if not paths:
+        raise FileNotFoundError(f"No instance files (*.json, *.npz) found in '{instance_dir}'.")
+    tasks = [(path, model_type, q, solver_params or {}, output_dir, solver, registry, evaluation)
+             for path in paths]
+    # the cores are split among the worker processes so that parallel solves do not oversubscribe the machine
+    cores_per_worker = max(1, (cores or os.cpu_count() or 1) // workers)
+    env_params = {"OutputFlag": (solver_params or {}).get("OutputFlag", 1)}
+    init_args = (cores_per_worker, threads, method, env_params)
+    initializer = init_worker if solver == "gurobi" else None
+    if workers > 1:
+        with Pool(processes=workers, initializer=initializer, initargs=init_args) as pool:
+            rows = pool.map(solve_instance, tasks, chunksize=1)
+    else:
+        if initializer:
+            initializer(*init_args)
+        rows = [solve_instance(task) for task in tasks]
+        if SESSION is not None:
+            SESSION.close()
+
+    # consolidated results table, one row per instance
+    summary = pd.DataFrame(rows)
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    summary_path = os.path.join(output_dir, output)
+    if summary_path.endswith(".parquet"):
+        summary.to_parquet(summary_path, index=False)
+    else:
+        summary.to_csv(summary_path, index=False)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a directory of master production scheduling instances "
+                                                 "without the graphical user interface.")
+    parser.add_argument("instance_dir", help="directory with instance files (*.json, *.npz)")
+    parser.add_argument("--model", choices=sorted(SOLVERS), default="stochastic",
+                        help="stochastic (sampling approximation) or deterministic (expected value) model")
+    parser.add_argument("--solver", choices=("gurobi", "highs"), default="gurobi",
+                        help="LP solver; HiGHS (open source) needs no Gurobi license")
+    parser.add_argument("--output-dir", default="./batch_results",
+                        help="directory for the per-instance results and the summary table")
+    parser.add_argument("--output", default="summary.csv",
+                        help="file name of the summary table (.csv or .parquet)")
+    parser.add_argument("--workers", type=int, default=1, help="number of parallel worker processes")
+    parser.add_argument("--samples", type=int, default=None,
+                        help="number of samples q of the stochastic model (default: value in the instance file)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Gurobi threads per solve (default: available cores divided by the number of workers)")
+    parser.add_argument("--method", type=int, default=None, help="Gurobi LP algorithm (Method parameter) per solve")
+    parser.add_argument("--cores", type=int, default=None,
+                        help="number of cores available to the batch (default: all cores of the machine)")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE",
+                        help="additional Gurobi parameter, may be given several times")
+    parser.add_argument("--num-sim", type=int, default=100,
+                        help="replications per evaluated schedule (the budget, if a precision is given)")
+    parser.add_argument("--precision", type=float, default=None,
+                        help="stop the replications of an evaluation once the relative half-width of the 95%% "
+                             "confidence interval is at most this value, e.g. 0.005")
+    parser.add_argument("--min-sim", type=int, default=10, help="minimum number of replications with --precision")
+    parser.add_argument("--distribution", type=parse_distribution, default=None, metavar="TYPE|JSON",
+                        help="availability distribution of the samples and simulations: uniform (default), "
+                             "binomial, normal, empirical, correlated or a JSON specification, e.g. "
+                             "'{\"type\": \"correlated\", \"marginal\": \"binomial\", \"rho\": 0.6}'")
+    parser.add_argument("--resample", action="store_true",
+                        help="re-draw the samples of the stages of the rolling schedules from a pool of sample blocks "
+                             "(stochastic model only)")
+    parser.add_argument("--export", choices=("parquet", "feather"), default=None,
+                        help="also export the schedules of each instance as columnar files in this format")
+    parser.add_argument("--timings", action="store_true",
+                        help="write the phase timings of each instance to timings.json in its result directory")
+    parser.add_argument("--log", action="store_true", help="show the Gurobi log")
+    parser.add_argument("--registry", nargs="?", const=DEFAULT_REGISTRY, default=None, metavar="FILE",
+                        help="record the runs in the run registry (default file: runs.sqlite of the repository)")
+    args = parser.parse_args()
+
+    if args.resample and args.model != "stochastic":
+        parser.error("--resample needs the stochastic model.")
+    evaluation = {"num_sim": args.num_sim, "precision": args.precision, "min_sim": args.min_sim,
+                  "distribution": args.distribution}
+    if args.resample:
+        evaluation["resample"] = True
+
+    solver_params = {"OutputFlag": 1 if args.log else 0}
+    try:
+        solver_params.update(parse_solver_params(args.param))
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    summary = run_batch(args.instance_dir, args.model, args.output_dir, workers=args.workers, q=args.samples,
+                        solver_params=solver_params, output=args.output, threads=args.threads, method=args.method,
+                        cores=args.cores, solver=args.solver, registry=args.registry,
+                        evaluation=evaluation,
+                        export_format=args.export, timings=args.timings)
+    print(summary.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
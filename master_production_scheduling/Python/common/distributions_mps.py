@@ -0,0 +1,144 @@
+import numpy as np
+from scipy import stats
+
+# distributions of the availabilities of the secondary materials with their parameters and default values. A
+# distribution is given as a specification {"type": ..., parameter: value, ...} (plain JSON, so that it can be
+# stored with a run or sent to the solve service); None or "uniform" is the uniform distribution on
+# {0, ..., 2*A[i][t]} of the original models
+#   uniform:     uniform on {0, ..., 2*A[i][t]}
+#   binomial:    binomial with 2*A[i][t] trials and success probability p (mean A[i][t] for p = 0.5)
+#   normal:      normal with mean A[i][t] and standard deviation cv*A[i][t], discretized to integers and truncated
+#                to {0, ..., 2*A[i][t]}
+#   empirical:   observed availabilities history[obs][i][t] (or history[obs][i] for all periods), e.g. historical
+#                returns; A is not used
+#   correlated:  the marginal distribution (one of the above) with availabilities of consecutive periods of a
+#                secondary material correlated by a Gaussian copula with AR(1) correlation rho
+DISTRIBUTIONS = {
+    "uniform": {},
+    "binomial": {"p": 0.5},
+    "normal": {"cv": 0.5},
+    "empirical": {"history": None},
+    "correlated": {"marginal": None, "rho": 0.5},
+}
+
+
+def distribution_spec(distribution=None):
+    # complete and validated specification of a distribution (None, a type name or a specification)
+    if distribution is None:
+        distribution = "uniform"
+    if isinstance(distribution, str):
+        distribution = {"type": distribution}
+    distribution_type = distribution.get("type")
+    if distribution_type not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown availability distribution '{distribution_type}'. "
+                         f"Use one of {', '.join(DISTRIBUTIONS)}.")
+    unknown = set(distribution) - set(DISTRIBUTIONS[distribution_type]) - {"type"}
+    if unknown:
+        raise ValueError(f"Unknown parameters of the {distribution_type} distribution: {', '.join(sorted(unknown))}.")
+    spec = {"type": distribution_type, **DISTRIBUTIONS[distribution_type], **distribution}
+    if distribution_type == "binomial" and not 0.0 <= spec["p"] <= 1.0:
+        raise ValueError("The success probability p of the binomial distribution must be in [0, 1].")
+    if distribution_type == "normal" and spec["cv"] <= 0.0:
+        raise ValueError("The coefficient of variation cv of the normal distribution must be positive.")
+    if distribution_type == "empirical":
+        if spec["history"] is None or len(spec["history"]) == 0:
+            raise ValueError("The empirical distribution needs a history of observed availabilities.")
+        # availabilities are integral quantities (as the samples A_l of an MPSInstance)
+        history = np.asarray(spec["history"], dtype=float)
+        if not np.array_equal(history, np.round(history)) or (history < 0).any():
+            raise ValueError("The history of the empirical distribution must hold non-negative integral "
+                             "availabilities.")
+    if distribution_type == "correlated":
+        spec["marginal"] = distribution_spec(spec["marginal"])
+        if spec["marginal"]["type"] == "correlated":
+            raise ValueError("The marginal distribution of the correlated distribution must not be correlated.")
+        if not -1.0 < spec["rho"] < 1.0:
+            raise ValueError("The correlation rho must be in (-1, 1).")
+    return spec
+
+
+def periods_independent(distribution=None):
+    # True if the availabilities of different periods are independent (required by the exact evaluation)
+    return distribution_spec(distribution)["type"] != "correlated"
+
+
+def availability_pmfs(A, distribution=None):
+    # marginal distribution of the availability of each secondary material and period: pmfs[i][t] =
+    # (values, probabilities) with ascending values
+    spec = distribution_spec(distribution)
+    if spec["type"] == "correlated":
+        return availability_pmfs(A, spec["marginal"])
+    A = np.asarray(A, dtype=np.int64)
+    if spec["type"] == "empirical":
+        history = np.asarray(spec["history"], dtype=float)
+        if history.ndim == 2:
+            history = np.repeat(history[:, :, None], A.shape[1], axis=2)
+        if history.shape[1:] != A.shape:
+            raise ValueError(f"The history of the empirical distribution has the shape {history.shape[1:]} per "
+                             f"observation instead of {A.shape}.")
+        pmfs = []
+        for i in range(A.shape[0]):
+            pmfs.append([])
+            for t in range(A.shape[1]):
+                values, counts = np.unique(history[:, i, t], return_counts=True)
+                pmfs[i].append((values, counts / counts.sum()))
+        return pmfs
+    pmfs = []
+    for i in range(A.shape[0]):
+        pmfs.append([])
+        for t in range(A.shape[1]):
+            values = np.arange(2*A[i, t] + 1, dtype=float)
+            if spec["type"] == "uniform":
+                probabilities = np.full(len(values), 1.0 / len(values))
+            elif spec["type"] == "binomial":
+                probabilities = stats.binom.pmf(values, 2*A[i, t], spec["p"])
+            elif A[i, t] == 0:
+                probabilities = np.ones(1)
+            else:
+                sigma = spec["cv"] * A[i, t]
+                probabilities = np.diff(stats.norm.cdf(np.append(values - 0.5, values[-1] + 0.5), A[i, t], sigma))
+            pmfs[i].append((values, probabilities / probabilities.sum()))
+    return pmfs
+
+
+def expected_availabilities(A, distribution=None):
+    # expected availability of each secondary material and period (A itself for the uniform distribution, but e.g.
+    # 2*p*A for the binomial distribution and the mean of the history for the empirical distribution)
+    pmfs = availability_pmfs(A, distribution)
+    return np.array([[values @ probabilities for values, probabilities in pmfs_i] for pmfs_i in pmfs],
+                    dtype=float).reshape(np.shape(A))
+
+
+def uniforms(shape, distribution=None, random_state=None, seed=None):
+    # uniform random numbers u[..., i, t] on (0, 1) that are turned into availabilities by availability_quantiles;
+    # for a correlated distribution, they are correlated over the periods t of each secondary material
+    spec = distribution_spec(distribution)
+    if random_state is None:
+        random_state = np.random.RandomState(seed)
+    if spec["type"] != "correlated":
+        return random_state.random_sample(shape)
+    # Gaussian AR(1) process over the periods, transformed to uniform margins
+    rho = spec["rho"]
+    z = random_state.standard_normal(shape)
+    for t in range(1, shape[-1]):
+        z[..., t] = rho * z[..., t - 1] + np.sqrt(1.0 - rho**2) * z[..., t]
+    return stats.norm.cdf(z)
+
+
+def availability_quantiles(pmfs, u):
+    # availabilities with the distributions pmfs[i][t] for uniform random numbers u[..., i, t] (inverse
+    # transformation method, so that 1 - u gives antithetic availabilities)
+    realized_A = np.empty(u.shape)
+    for i, pmfs_i in enumerate(pmfs):
+        for t, (values, probabilities) in enumerate(pmfs_i):
+            cdf = np.cumsum(probabilities)
+            index = np.searchsorted(cdf, u[..., i, t], side="right")
+            realized_A[..., i, t] = values[np.minimum(index, len(values) - 1)]
+    return realized_A
+
+
+def sample_availabilities(A, size, distribution=None, random_state=None, seed=None):
+    # size availability matrices realized_A[l, i, t] of the distribution, drawn in one call
+    A = np.asarray(A)
+    return availability_quantiles(availability_pmfs(A, distribution),
+                                  uniforms((size,) + A.shape, distribution, random_state, seed))
@@ -0,0 +1,219 @@
+import numpy as np
+from scipy import stats
+from distributions_mps import availability_pmfs, distribution_spec, periods_independent, sample_availabilities
+
+
+def draw_availabilities(A, num_sim, first_seed=1, distribution=None):
+    # realized availabilities realized_A[ctr, i, t], uniform on {0, ..., 2*A[i][t]}; the matrix is drawn once
+    # and fed to every evaluated schedule as common random numbers. Replication ctr uses seed ctr + first_seed
+    # and draws the periods in the same order as the original per-replication simulation loops.
+    # Other distributions (see distributions_mps) are drawn in one call with the seed first_seed
+    if distribution_spec(distribution)["type"] != "uniform":
+        return sample_availabilities(A, num_sim, distribution, seed=first_seed)
+    A = np.asarray(A, dtype=np.int64)
+    realized_A = np.empty((num_sim,) + A.shape)
+    for ctr in range(num_sim):
+        realized_A[ctr] = np.random.RandomState(ctr + first_seed).randint(0, 2*A.T + 1).T
+    return realized_A
+
+
+def expected_procurement_cost(R_a, consumption, remaining, pmfs, b, c, decimals=9):
+    # expected cost b*v + c*w of the realized procurement of one secondary material under a fixed schedule, without
+    # sampling: given the consumption, the inventory level R of the next period depends only on R and the realized
+    # availability of the period, so its distribution (inventory levels -> probabilities) is propagated period by
+    # period through the procurement rule of the simulations. pmfs[t] = (values, probabilities) of the availability
+    # in period t; inventory levels equal up to decimals are merged
+    levels, probabilities = np.array([float(R_a)]), np.array([1.0])
+    expected_cost = 0.0
+    for t, (values, value_probabilities) in enumerate(pmfs):
+        R = levels[:, None]
+        realized_A = np.asarray(values, dtype=float)[None, :]
+        joint = probabilities[:, None] * np.asarray(value_probabilities)[None, :]
+        # vectorized _realized_procurement over all pairs of inventory level and availability
+        realized_v = np.where(R + realized_A <= remaining[t], realized_A, np.maximum(0.0, remaining[t] - R))
+        realized_w = np.maximum(0.0, consumption[t] - R - realized_v)
+        expected_cost += np.sum(joint * (b * realized_v + c * realized_w))
+        new_levels = (R + realized_v + realized_w - consumption[t]).ravel()
+        levels, index = np.unique(np.round(new_levels, decimals), return_inverse=True)
+        probabilities = np.bincount(index.ravel(), weights=joint.ravel(), minlength=len(levels))
+    return expected_cost
+
+
+def t_half_width(std, count, confidence=0.95):
+    # half-width of the t confidence interval for the mean of count values with the sample standard deviation std
+    if count < 2:
+        return np.inf
+    return stats.t.ppf(0.5 + confidence/2, count - 1) * std / np.sqrt(count)
+
+
+def confidence_half_width(values, confidence=0.95):
+    # half-width of the t confidence interval for the mean of values
+    values = np.asarray(values, dtype=float)
+    return t_half_width(values.std(ddof=1) if len(values) > 1 else np.nan, len(values), confidence)
+
+
+def relative_half_width(values, confidence=0.95):
+    # half-width of the t confidence interval relative to the absolute mean of values
+    mean = np.mean(values) if len(values) else 0.0
+    return confidence_half_width(values, confidence) / abs(mean) if mean != 0 else np.inf
+
+
+def sequential_replications(replications, precision=None, min_sim=10, confidence=0.95):
+    # realized contribution margins of a generator of replications (e.g. iter_schedule_replications of a model).
+    # With a precision, the replications stop as soon as the relative half-width of the confidence interval of
+    # their mean is at most precision (after at least min_sim replications); the length of the generator is the
+    # budget. Without one, all replications are run
+    values = []
+    statistics = RunningStatistics(confidence)
+    for value in replications:
+        values.append(value)
+        statistics.add(value)
+        if precision is not None and statistics.count >= min_sim and statistics.relative_half_width <= precision:
+            break
+    return np.array(values)
+
+
+def paired_differences(real_CMs, baseline, confidence=0.95):
+    # mean difference of the realized contribution margins of each schedule to the baseline schedule and
+    # the half-width of its confidence interval; replications are paired since they share the realizations.
+    # Schedules evaluated with different numbers of replications are paired on their common replications
+    differences = {}
+    for name, values in real_CMs.items():
+        if name == baseline:
+            continue
+        num_sim = min(len(values), len(real_CMs[baseline]))
+        diff = np.asarray(values[:num_sim]) - np.asarray(real_CMs[baseline][:num_sim])
+        differences[name] = (diff.mean(), confidence_half_width(diff, confidence))
+    return differences
+
+
+def evaluate_schedules(model, model_label, labels, timers, run_control, num_sim=100, epsilon=0.1, shrinking=False,
+                       sample_pool=None, precision=None, min_sim=10, distribution=None, results_dir="./results",
+                       export_format=None):
+    # solve a built master production scheduling model, reoptimize it subject to non-anticipativity and evaluate the
+    # predictive schedules of both solves ("pred", "pred_na") and the rolling schedules without and with
+    # non-anticipativity ("rolling", "rolling_na"). model_label names the model and labels[variant] the schedules in
+    # the result keys. Returns the results (published by run_control as soon as they are known) and the paths of the
+    # result files: the text reports and, if an export_format ("parquet" or "feather") is given, columnar exports
+    results = {}
+    result_paths = []
+    run_control.progress("optimize")
+    if not model.optimize():
+        print("Could not determine predictive master production schedule")
+        return results, result_paths
+    result_paths.append(model.save_results("results_model", directory=results_dir))
+    if export_format is not None:
+        result_paths += model.export_results("results_model", fmt=export_format, directory=results_dir)
+    predictive_CM = model.model.objVal
+    results[f"Contribution margin predicted by {model_label} without non-anticipativity"] = predictive_CM
+    results[f"Contribution margin predicted by {model_label} with non-anticipativity"] = predictive_CM
+    run_control.publish(results)
+    # all simulated schedules are evaluated on the same realized availabilities (common random numbers). With a
+    # precision (target relative half-width of the 95% confidence interval), each evaluation stops as soon as it is
+    # reached and num_sim is the budget of replications
+    with timers.phase("draw_availabilities"):
+        realized_A = draw_availabilities(model.A, num_sim=num_sim, distribution=distribution)
+    stopping = {"precision": precision, "min_sim": min_sim}
+    # the predictive schedules are evaluated exactly (without sampling noise and without replications), if the
+    # availabilities are independent over the periods, and on the realized availabilities otherwise
+    pmfs = availability_pmfs(model.A, distribution) if periods_independent(distribution) else None
+    expected_CMs = {}
+    real_CMs = {}
+    for variant in ("pred", "pred_na"):
+        if variant == "pred_na":
+            run_control.progress("reoptimize_subject_to_non_anticipativity")
+            model.reoptimize_subject_to_non_anticipativity(epsilon=epsilon)
+            result_paths.append(model.save_results("results_model_na", directory=results_dir))
+            if export_format is not None:
+                result_paths += model.export_results("results_model_na", fmt=export_format, directory=results_dir)
+        if pmfs is not None:
+            expected_CMs[variant] = model.expected_schedule_CM(pmfs)
+            results[f"Expected contribution margin of {labels[variant]} (exact evaluation)"] = expected_CMs[variant]
+        else:
+            real_CMs[variant] = model.schedule_replications(realized_A, **stopping)
+            results[f"Average realized contribution margin of {labels[variant]}"] = np.mean(real_CMs[variant])
+        run_control.publish(results)
+    # the rolling schedules solve stage models of the remaining periods (with samples re-drawn from the sample_pool,
+    # if one is given)
+    for variant, rolling_epsilon in (("rolling", 0.0), ("rolling_na", epsilon)):
+        if sample_pool is not None:
+            real_CMs[variant] = model.resampled_rolling_schedule_replications(
+                realized_A, epsilon=rolling_epsilon, sample_pool=sample_pool, **stopping)
+        else:
+            real_CMs[variant] = model.rolling_schedule_replications(
+                realized_A, epsilon=rolling_epsilon, shrinking=shrinking, **stopping)
+        results[f"Average realized contribution margin of {labels[variant]}"] = np.mean(real_CMs[variant])
+        if variant == "rolling":
+            run_control.publish(results)
+    # differences to the predictive schedule without non-anticipativity with 95% confidence intervals: paired on the
+    # realized availabilities, or to its exact expected contribution margin (whose half-width is that of the
+    # simulated schedule alone)
+    if pmfs is not None:
+        differences = {variant: (np.mean(values) - expected_CMs["pred"], confidence_half_width(values))
+                       for variant, values in real_CMs.items()}
+        differences = {"pred_na": (expected_CMs["pred_na"] - expected_CMs["pred"], 0.0), **differences}
+    else:
+        differences = paired_differences(real_CMs, baseline="pred")
+    for variant, (mean_difference, half_width) in differences.items():
+        results[f"Paired difference of {labels[variant]} to {labels['pred']}"] = mean_difference
+        results[f"Confidence interval half-width (95%) of paired difference of {labels[variant]}"] = half_width
+    if precision is not None:
+        # stopping statistics of the sequential evaluations (of the simulated schedules)
+        for variant, values in real_CMs.items():
+            results[f"Replications of {labels[variant]}"] = len(values)
+            results[f"Relative confidence interval half-width (95%) of {labels[variant]}"] = \
+                relative_half_width(values)
+    return results, result_paths
+
+
+def finish_run(application, params, inputs, results, result_paths, timers, registry=None, results_dir="./results",
+               timings_file=None):
+    # phase timings, solve counts, simplex iterations and model sizes of the run (also stored by the run registry)
+    # are written to timings_file on request; the run is recorded in the registry, if one is given, with the sizes
+    # and options params indexed
+    if timings_file is not None:
+        result_paths.append(timers.write_json(timings_file, directory=results_dir))
+    if registry is not None:
+        registry.record(application, params, inputs=inputs, results=results, timers=timers,
+                        result_paths=result_paths, status="finished" if results else "failed")
+
+
+class RunningStatistics:
+    # mean, variance and confidence interval of a stream of values (e.g. realized contribution margins of
+    # replications as they complete), updated in O(1) per value with Welford's algorithm
+    def __init__(self, confidence=0.95):
+        self.confidence = confidence
+        self.count = 0
+        self.mean = 0.0
+        self._sum_squares = 0.0  # sum of squared deviations from the mean
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._sum_squares += delta * (value - self.mean)
+        return self
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+        return self
+
+    @property
+    def variance(self):
+        # sample variance (ddof=1)
+        return self._sum_squares / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    @property
+    def half_width(self):
+        # half-width of the t confidence interval for the mean
+        return t_half_width(self.std, self.count, self.confidence)
+
+    @property
+    def relative_half_width(self):
+        # half-width relative to the absolute mean
+        return self.half_width / abs(self.mean) if self.mean != 0 else np.inf
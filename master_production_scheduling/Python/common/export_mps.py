@@ -0,0 +1,49 @@
+import os
+import numpy as np
+import pandas as pd
+
+
+def export_results(filename, x, y, z, d, v, w, R, fmt="parquet", directory="./results"):
+    # write a master production schedule to two columnar files:
+    #   <filename>_products.<fmt>: inventory, production, sales and demand per product and period
+    #   <filename>_secondary.<fmt>: inventory and procurement per secondary material, period and sample
+    # x and R hold T+1 inventory levels (index 0 is the initial inventory) and are reported per period like
+    # in the text report; v, w and R carry a trailing sample axis, which has length 1 for deterministic models
+    if fmt not in ("parquet", "feather"):
+        raise ValueError(f"Unknown export format '{fmt}'. Use 'parquet' or 'feather'.")
+    n, T = np.shape(y)
+    m_A, _, q = np.shape(v)
+
+    product, period = np.indices((n, T), dtype=np.int32)
+    products = pd.DataFrame({
+        "product": product.ravel() + 1,
+        "period": period.ravel() + 1,
+        "inventory": np.asarray(x)[:, :T].ravel(),
+        "production": np.asarray(y).ravel(),
+        "sales": np.asarray(z).ravel(),
+        "demand": np.asarray(d, dtype=float).ravel(),
+    })
+
+    material, period, sample = np.indices((m_A, T, q), dtype=np.int32)
+    secondary = pd.DataFrame({
+        "material": material.ravel() + 1,
+        "period": period.ravel() + 1,
+        "sample": sample.ravel() + 1,
+        "inventory": np.asarray(R)[:, :T, :].ravel(),
+        "procurement_secondary": np.asarray(v).ravel(),
+        "procurement_primary": np.asarray(w).ravel(),
+    })
+
+    # check whether folder results exists; if not, create folder
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    paths = []
+    for name, df in (("products", products), ("secondary", secondary)):
+        path = os.path.join(directory, f"{filename}_{name}.{fmt}")
+        if fmt == "parquet":
+            df.to_parquet(path, index=False)
+        else:
+            # uncompressed Arrow IPC files can be memory-mapped by pyarrow
+            df.to_feather(path, compression="uncompressed")
+        paths.append(path)
+    return paths
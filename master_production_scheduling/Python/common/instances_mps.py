@@ -0,0 +1,174 @@
+import json
+import os
+from dataclasses import dataclass, fields
+import numpy as np
+
+# array fields of an instance: dtype and shape in terms of the problem sizes (m_F = m - m_A non-secondary factors)
+ARRAY_FIELDS = {
+    "d": (np.float64, ("n", "T")),        # demands
+    "p": (np.float64, ("n",)),            # prices
+    "k": (np.float64, ("n",)),            # production cost
+    "h": (np.float64, ("n",)),            # holding cost
+    "b": (np.float64, ("m_A",)),          # procurement cost of secondary materials
+    "c": (np.float64, ("m_A",)),          # procurement cost of corresponding primary materials
+    "A": (np.int64, ("m_A", "T")),        # expected availabilities of secondary materials
+    "a": (np.float64, ("m", "n")),        # production coefficients
+    "R_fix": (np.float64, ("m_F", "T")),  # capacities of non-secondary production factors
+    "x_a": (np.float64, ("n",)),          # initial inventory levels of products
+    "R_a": (np.float64, ("m_A",)),        # initial inventory levels of secondary materials
+    "A_l": (np.int64, ("m_A", "T", "q")), # availability samples (optional)
+}
+# data that must be non-negative (inventory levels of simulated stages may fall below zero by rounding errors)
+NON_NEGATIVE_FIELDS = ("d", "A", "a", "R_fix", "A_l")
+
+
+@dataclass(slots=True)
+class MPSInstance:
+    # master production scheduling instance backed by typed NumPy arrays; arrays of the right dtype are taken over
+    # without copying, so sub-instances and sample blocks are views of the original arrays
+    T: int
+    n: int
+    m: int
+    m_A: int
+    d: np.ndarray
+    p: np.ndarray
+    k: np.ndarray
+    h: np.ndarray
+    b: np.ndarray
+    c: np.ndarray
+    A: np.ndarray
+    a: np.ndarray
+    R_fix: np.ndarray
+    x_a: np.ndarray
+    R_a: np.ndarray
+    A_l: np.ndarray = None
+
+    def __post_init__(self):
+        self.T, self.n, self.m, self.m_A = int(self.T), int(self.n), int(self.m), int(self.m_A)
+        if not 0 <= self.m_A <= self.m:
+            raise ValueError(f"Invalid number of secondary factors m_A = {self.m_A} for m = {self.m} factors.")
+        sizes = {"T": self.T, "n": self.n, "m": self.m, "m_A": self.m_A, "m_F": self.m - self.m_A}
+        for name, (dtype, dims) in ARRAY_FIELDS.items():
+            value = getattr(self, name)
+            if value is None:
+                continue
+            array = np.asarray(value)
+            if dtype is np.int64 and array.dtype.kind not in "iu" and not np.array_equal(array, np.round(array)):
+                raise ValueError(f"'{name}' must be integral.")
+            array = np.asarray(array, dtype=dtype)
+            if name == "A_l":
+                sizes["q"] = array.shape[-1] if array.ndim == 3 else -1
+            shape = tuple(sizes[dim] for dim in dims)
+            if array.shape != shape:
+                raise ValueError(f"'{name}' has shape {array.shape}, expected {shape}.")
+            if name in NON_NEGATIVE_FIELDS and (array < 0).any():
+                raise ValueError(f"'{name}' must be non-negative.")
+            setattr(self, name, array)
+
+    @property
+    def q(self):
+        return self.A_l.shape[2] if self.A_l is not None else 1
+
+    @property
+    def I_A(self):
+        return range(self.m_A)
+
+    @property
+    def I_minus_I_A(self):
+        return list(range(self.m_A, self.m))
+
+    def with_samples(self, A_l):
+        # same instance with the availability samples A_l[i, t, l]
+        return MPSInstance(**{**self.arrays(), "A_l": A_l})
+
+    def sample_block(self, start, stop):
+        # view of the samples start, ..., stop-1
+        return self.A_l[:, :, start:stop]
+
+    def tail(self, tau, x_a, R_a, A_l=None):
+        # instance of the periods tau, ..., T-1 starting from the inventory levels x_a and R_a; the period arrays are
+        # views, the samples default to those of the tail periods
+        if A_l is None and self.A_l is not None:
+            A_l = self.A_l[:, tau:, :]
+        return MPSInstance(self.T - tau, self.n, self.m, self.m_A, self.d[:, tau:], self.p, self.k, self.h, self.b,
+                           self.c, self.A[:, tau:], self.a, self.R_fix[:, tau:], x_a, R_a, A_l)
+
+    def arrays(self):
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+    def to_dict(self):
+        # plain lists and numbers in the format of the instance files of the frontends
+        data = {"T": self.T, "n": self.n, "m": self.m, "m_A": self.m_A, "q": self.q}
+        data.update({name: getattr(self, name).tolist() for name in ARRAY_FIELDS if getattr(self, name) is not None})
+        data["I_minus_I_A"] = self.I_minus_I_A
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        # instance from a dictionary like an instance file of the frontends (additional keys are ignored)
+        return cls(**{field.name: data[field.name] for field in fields(cls) if field.name in data})
+
+    def save(self, path):
+        # JSON (instance file format of the frontends) or binary .npz file, depending on the extension. The JSON
+        # file is a small header; a sample cube is written next to it as binary .npy file in the layout
+        # [l, i, t], so that any range of samples is a contiguous range of bytes
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        if path.endswith(".npz"):
+            np.savez(path, **{name: value for name, value in self.arrays().items() if value is not None})
+            return path
+        data = self.to_dict()
+        if self.A_l is not None:
+            del data["A_l"]
+            sample_file = f"{os.path.splitext(os.path.basename(path))[0]}_samples.npy"
+            np.save(os.path.join(directory, sample_file), np.ascontiguousarray(np.moveaxis(self.A_l, 2, 0)))
+            data["samples"] = {"file": sample_file, "layout": ["l", "i", "t"], "shape": [self.q, self.m_A, self.T]}
+        with open(path, "w") as file:
+            json.dump(data, file)
+        return path
+
+    @classmethod
+    def load(cls, path, samples=slice(None)):
+        # samples: selection (slice or indices) of the stored samples to be used, None to skip them. The sample
+        # cube of a JSON header is memory-mapped, so only the selected samples are read from disk; a slice gives a
+        # view of the mapped file
+        if path.endswith(".npz"):
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files if name != "A_l"}
+                if "A_l" in data.files and samples is not None:
+                    arrays["A_l"] = data["A_l"][:, :, samples]
+            return cls.from_dict(arrays)
+        with open(path, "r") as file:
+            data = json.load(file)
+        A_l = data.pop("A_l", None)
+        if samples is not None and "samples" in data:
+            cube = np.load(os.path.join(os.path.dirname(os.path.abspath(path)), data["samples"]["file"]),
+                           mmap_mode="r")
+            data["A_l"] = np.moveaxis(cube[samples], 0, 2)
+        elif samples is not None and A_l is not None:
+            data["A_l"] = np.asarray(A_l)[:, :, samples]
+        return cls.from_dict(data)
+
+
+def generate_instance(T=12, n=6, m=4, m_A=2, q=100, seed=111):
+    # random master production scheduling instance of the given size, drawn in the order of the original main scripts
+    # (T=12, n=6, m=4, m_A=2 and seed 111 reproduce their instance); the keys are those of the instance files
+    # written by the frontends
+    I_A = range(min(m_A, m))
+    I_minus_I_A = [i for i in range(m) if i not in I_A]   # set of non-secondary production factors
+    np.random.seed(seed)
+    d = [[np.random.randint(4, 8)*(1.1-np.sin(j+2*np.pi*t/T)) for t in range(T)] for j in range(n)]  # product demands
+    p = [np.random.randint(120, 150) for _ in range(n)]   # product prices
+    k = [np.random.randint(10, 20) for _ in range(n)]     # production cost
+    h = [np.random.uniform(0.5, 2.5) for _ in range(n)]   # holding cost
+    b = [np.random.randint(5, 10) for _ in I_A]           # procurement cost of secondary materials
+    c = [np.random.randint(30, 60) for _ in I_A]          # procurement cost of corresponding primary materials
+    A = [[np.random.randint(15, 35) for _ in range(T)] for _ in I_A]   # expected availability of secondary materials
+    a = [[np.random.randint(0, 8) for _ in range(n)] for _ in range(m)]    # production coefficients
+    R_fix = [[np.random.randint(50, 100) for _ in range(T)] for _ in I_minus_I_A]  # capacity of non-secondary factors
+    x_a = [np.random.randint(3, 5) for _ in range(n)]     # initial inventory levels of products
+    R_a = [np.random.randint(10, 50) for _ in I_A]        # initial inventory levels of secondary materials
+    return {"T": T, "n": n, "m": m, "m_A": m_A, "q": q, "d": d, "p": p, "k": k, "h": h, "b": b, "c": c, "A": A, "a": a,
+            "I_minus_I_A": I_minus_I_A, "R_fix": R_fix, "x_a": x_a, "R_a": R_a}
+
@@ -0,0 +1,623 @@
+import numpy as np
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, os.pardir, "common",
+                             "Python"))
+from export_mps import export_results
+from distributions_mps import availability_pmfs
+from evaluation_mps import draw_availabilities, expected_procurement_cost, sequential_replications
+from instances_mps import MPSInstance
+from lp_backend import OPTIMAL, SparseLP
+from timing import timed
+try:
+    import gurobipy as gp
+    from gurobipy import GRB, quicksum
+except ImportError:
+    # without gurobipy (e.g. on nodes without a Gurobi license), only models with solver="highs" can be built
+    gp = GRB = quicksum = None
+
+
+class ProductionPlanModel:
+    # master production schedule with secondary materials whose availability is represented by q samples
+    # A_l[i][t][l]; the expected value (deterministic) model is the special case q = 1 with A_l = A. The parameters
+    # are held as typed NumPy arrays of an MPSInstance
+    # name of the solver model unless another name is given
+    model_name = "MPS"
+
+    def __init__(self, n, T, m, q, m_A, I_A, I_minus_I_A, R_fix, a, p, d, A, A_l, h, k, b, c, R_a, x_a,
+                 solver_params=None, name=None, env=None, solver="gurobi", timers=None, control=None):
+        # model: a Gurobi model, built in the given environment (e.g. from a pool of environments) or the default
+        # one, or with solver="highs" a sparse matrix model solved by HiGHS, which needs no Gurobi license
+        if name is None:
+            name = self.model_name
+        self.env = env
+        self.solver = solver
+        # optional TimerRegistry collecting phase timings, solve counts and model sizes
+        self.timers = timers
+        # optional RunControl receiving the progress of the simulations and cancelling the run
+        self.control = control
+        if solver != "highs" and gp is None:
+            raise ImportError("gurobipy is not installed. Use solver='highs' to solve without Gurobi.")
+        self.model = SparseLP(name, solver="highs") if solver == "highs" else gp.Model(name, env=env)
+        self.model.setParam("OptimalityTol", 1e-9)
+        self.model.setParam("FeasibilityTol", 1e-9)
+        self.model.setParam("Method", 0)  # set solver to primal simplex
+        self.model.setParam("LPWarmStart", 2)  # enforce warm starts
+        # user-defined solver parameters (e.g. Threads, TimeLimit, OutputFlag) override the defaults
+        self.solver_params = solver_params or {}
+        for param_name, value in self.solver_params.items():
+            self.model.setParam(param_name, value)
+        # validated parameter arrays (lists are converted, arrays of the right dtype are used without copying)
+        self.instance = MPSInstance(T, n, m, m_A, d, p, k, h, b, c, A, a, R_fix, x_a, R_a, A_l)
+        if self.instance.q != q:
+            raise ValueError(f"A_l holds {self.instance.q} samples, expected q = {q}.")
+        # problem sizes
+        self.n = n
+        self.T = T
+        self.m_A = m_A
+        self.m = m
+        self.q = q
+        # sets
+        self.I_A = I_A
+        self.I_minus_I_A = I_minus_I_A
+        # parameters
+        self.a = self.instance.a
+        self.R_fix = self.instance.R_fix
+        self.d = self.instance.d
+        self.A = self.instance.A
+        self.A_l = self.instance.A_l
+        self.h = self.instance.h
+        self.k = self.instance.k
+        self.b = self.instance.b
+        self.c = self.instance.c
+        self.R_a = self.instance.R_a
+        self.x_a = self.instance.x_a
+        self.p = self.instance.p
+        # decision variables
+        self.x = None
+        self.y = None
+        self.z = None
+        self.v = None
+        self.w = None
+        self.R = None
+        self.variables = None
+        self.variable_shapes = None
+        # consumption of secondary material i in period t, shared by all samples
+        self.usage = None
+        # objective functions
+        self.profit = None
+        self.na_objectives = {}
+
+    @classmethod
+    def from_instance(cls, instance, solver_params=None, name=None, *, env=None, solver="gurobi", timers=None,
+                      control=None):
+        # model of an MPSInstance with availability samples
+        return cls(instance.n, instance.T, instance.m, instance.q, instance.m_A, instance.I_A, instance.I_minus_I_A,
+                   instance.R_fix, instance.a, instance.p, instance.d, instance.A, instance.A_l, instance.h,
+                   instance.k, instance.b, instance.c, instance.R_a, instance.x_a, solver_params=solver_params,
+                   name=name, env=env, solver=solver, timers=timers, control=control)
+
+    # build model
+    @timed("build_model")
+    def build_model(self):
+        # define variables
+        # xjt: inventory level of product j at the end of period t
+        # yjt: quantity of product j manufactured in period t
+        # zjt: sales of product j in period t
+        # Ritl: inventory level of secondary material i in period t in sample l
+        # vitl: procurement of secondary material i in period t in sample l
+        # witl: procurement of primary material replacing secondary material i in period t in sample l
+        if self.solver == "highs":
+            self._build_sparse_model()
+            return
+        self.x = self.model.addVars(self.n, self.T + 1, name="x", vtype=GRB.CONTINUOUS)
+        self.y = self.model.addVars(self.n, self.T, name="y", vtype=GRB.CONTINUOUS)
+        self.z = self.model.addVars(self.n, self.T, name="z", vtype=GRB.CONTINUOUS)
+        self.v = self.model.addVars(self.m_A, self.T, self.q, name="v", vtype=GRB.CONTINUOUS)
+        self.w = self.model.addVars(self.m_A, self.T, self.q, name="w", vtype=GRB.CONTINUOUS)
+        self.R = self.model.addVars(self.m_A, self.T + 1, self.q, name="R", vtype=GRB.CONTINUOUS)
+        # flat variable list and block shapes for bulk solution retrieval
+        self.variable_shapes = {"x": (self.n, self.T + 1), "y": (self.n, self.T), "z": (self.n, self.T),
+                                "v": (self.m_A, self.T, self.q), "w": (self.m_A, self.T, self.q),
+                                "R": (self.m_A, self.T + 1, self.q)}
+        self.variables = [*self.x.values(), *self.y.values(), *self.z.values(),
+                          *self.v.values(), *self.w.values(), *self.R.values()]
+        self.usage = {(i, t): quicksum(self.a[i, j] * self.y[j, t] for j in range(self.n))
+                      for i in self.I_A for t in range(self.T)}
+
+        # objective function: maximize profit (built once and reused by the non-anticipativity stage)
+        self.profit = quicksum(
+            quicksum(self.p[j]*self.z[j, t] - self.k[j]*self.y[j, t] - self.h[j]*self.x[j, t+1]
+                     for j in range(self.n))
+            - (1/self.q)*quicksum(quicksum(self.b[i]*self.v[i, t, l] + self.c[i]*self.w[i, t, l]
+                                           for i in self.I_A) for l in range(self.q))
+            for t in range(self.T))
+        self.model.setObjective(self.profit, GRB.MAXIMIZE)
+
+        # add constraints
+        self._add_constraints()
+
+    def _add_constraints(self):
+        # resource constraint for non-secondary production factors
+        for t in range(self.T):
+            for i in self.I_minus_I_A:
+                self.model.addConstr(
+                    quicksum(self.a[i, j] * self.y[j, t] for j in range(self.n)) <= self.R_fix[i-self.m_A, t],
+                    name=f"ResourceConstraint_{i}_{t}")
+
+        # inventory initialization
+        for j in range(self.n):
+            self.model.addConstr(self.x[j, 0] == self.x_a[j], name=f"InventoryInitProduct_{j}")
+
+        # initial inventory secondary material
+        for l in range(self.q):
+            for i in self.I_A:
+                self.model.addConstr(self.R[i, 0, l] == self.R_a[i], name=f"InventoryInitSecondary_{i}_{l}")
+
+        # sales constraint, inventory balance, non-negativity constraints
+        for t in range(self.T):
+            for j in range(self.n):
+                self.model.addConstr(self.x[j, t + 1] == self.x[j, t] + self.y[j, t] - self.z[j, t],
+                                     name=f"InventoryBalanceProduct_{j}_{t}")
+                self.model.addConstr(self.z[j, t] <= self.d[j, t], name=f"SalesConstraint_{j}_{t}")
+
+        # inventory balance constraint secondary material, non-negativity of secondary material and
+        # availability constraint secondary material
+        for l in range(self.q):
+            for t in range(self.T):
+                for i in self.I_A:
+                    self.model.addConstr(
+                        self.R[i, t + 1, l] == self.R[i, t, l] + self.v[i, t, l] + self.w[i, t, l] - self.usage[i, t],
+                        name=f"InventoryBalanceSecondary_{i}_{t}_{l}")
+                    self.model.addConstr(self.v[i, t, l] <= self.A_l[i, t, l],
+                                         name=f"AvailabilityConstraint_{i}_{t}_{l}")
+
+    def _build_sparse_model(self):
+        # same model in sparse matrix form; the variable blocks hold column indices instead of Gurobi variables
+        n, T, q, m_A = self.n, self.T, self.q, self.m_A
+        lp = self.model
+        self.x = lp.add_vars(n, T + 1)
+        self.y = lp.add_vars(n, T)
+        self.z = lp.add_vars(n, T)
+        self.v = lp.add_vars(m_A, T, q)
+        self.w = lp.add_vars(m_A, T, q)
+        self.R = lp.add_vars(m_A, T + 1, q)
+        self.variable_shapes = {"x": (n, T + 1), "y": (n, T), "z": (n, T), "v": (m_A, T, q), "w": (m_A, T, q),
+                                "R": (m_A, T + 1, q)}
+        self.variables = np.concatenate([block.ravel() for block in (self.x, self.y, self.z, self.v, self.w, self.R)])
+        a = self.a
+        p, k, h = self.p[:, None], self.k[:, None], self.h[:, None]
+        b, c = self.b[:, None, None], self.c[:, None, None]
+
+        # objective function: maximize profit
+        self.profit = (lp.linear(self.z, p) + lp.linear(self.y, -k) + lp.linear(self.x[:, 1:], -h)
+                       + lp.linear(self.v, -b/q) + lp.linear(self.w, -c/q))
+        lp.set_objective(self.profit)
+
+        # resource constraint for non-secondary production factors
+        I_minus_I_A = np.asarray(self.I_minus_I_A, dtype=int)
+        lp.add_constrs(np.broadcast_to(self.y.T[None, :, :], (len(I_minus_I_A), T, n)).reshape(-1, n),
+                       np.repeat(a[I_minus_I_A], T, axis=0), "<", self.R_fix.ravel())
+        # inventory initialization of products and secondary materials
+        lp.add_constrs(self.x[:, 0], 1.0, "=", self.x_a)
+        lp.add_constrs(self.R[:, 0, :].ravel(), 1.0, "=", np.repeat(self.R_a, q))
+        # inventory balance and sales constraint of products
+        lp.add_constrs(np.stack([self.x[:, 1:], self.x[:, :-1], self.y, self.z], axis=-1).reshape(-1, 4),
+                       [1.0, -1.0, -1.0, 1.0], "=", 0.0)
+        lp.add_constrs(self.z.ravel(), 1.0, "<", self.d.ravel())
+        # inventory balance of secondary materials: R[t+1] - R[t] - v - w + sum_j a_ij y_jt = 0
+        y_columns = np.broadcast_to(self.y.T[None, :, None, :], (m_A, T, q, n))
+        lp.add_constrs(np.concatenate([np.stack([self.R[:, 1:, :], self.R[:, :-1, :], self.v, self.w], axis=-1),
+                                       y_columns], axis=-1).reshape(-1, 4 + n),
+                       np.concatenate([np.broadcast_to([1.0, -1.0, -1.0, -1.0], (m_A, T, q, 4)),
+                                       np.broadcast_to(a[:m_A, None, None, :], (m_A, T, q, n))],
+                                      axis=-1).reshape(-1, 4 + n), "=", 0.0)
+        # availability constraint secondary material
+        lp.add_constrs(self.v.ravel(), 1.0, "<", self.A_l.ravel())
+
+    def _add_period_constraints(self, t):
+        # constraints of period t, re-added when restoring the model after a rolling horizon simulation
+        # resource constraint for non-secondary production factors
+        for i in self.I_minus_I_A:
+            self.model.addConstr(
+                quicksum(self.a[i, j] * self.y[j, t] for j in range(self.n)) <= self.R_fix[i-self.m_A, t],
+                name=f"ResourceConstraint_{i}_{t}")
+
+        # sales constraint, inventory balance
+        for j in range(self.n):
+            self.model.addConstr(self.x[j, t + 1] == self.x[j, t] + self.y[j, t] - self.z[j, t],
+                                 name=f"InventoryBalanceProduct_{j}_{t}")
+            self.model.addConstr(self.z[j, t] <= self.d[j, t], name=f"SalesConstraint_{j}_{t}")
+
+        # inventory balance constraint secondary material and availability constraint secondary material
+        for l in range(self.q):
+            for i in self.I_A:
+                self.model.addConstr(
+                    self.R[i, t + 1, l] == self.R[i, t, l] + self.v[i, t, l] + self.w[i, t, l] - self.usage[i, t],
+                    name=f"InventoryBalanceSecondary_{i}_{t}_{l}")
+                self.model.addConstr(self.v[i, t, l] <= self.A_l[i, t, l],
+                                     name=f"AvailabilityConstraint_{i}_{t}_{l}")
+
+    def _remove_period_constraints(self, t):
+        for l in range(self.q):
+            for i in self.I_A:
+                self.model.remove(self.model.getConstrByName(f"InventoryBalanceSecondary_{i}_{t}_{l}"))
+                self.model.remove(self.model.getConstrByName(f"AvailabilityConstraint_{i}_{t}_{l}"))
+
+        for i in self.I_minus_I_A:
+            self.model.remove(self.model.getConstrByName(f"ResourceConstraint_{i}_{t}"))
+
+        for j in range(self.n):
+            self.model.remove(self.model.getConstrByName(f"InventoryBalanceProduct_{j}_{t}"))
+            self.model.remove(self.model.getConstrByName(f"SalesConstraint_{j}_{t}"))
+
+    @timed("tail_model")
+    def tail_model(self, tau, x_init, R_init, A_l=None):
+        # model of the remaining periods tau, ..., T-1 starting from the inventory levels x_init and R_init;
+        # A_l[i][t][l] holds availability samples of these periods (default: the samples of this model); the
+        # parameters of the tail model are views of those of this model
+        tail = ProductionPlanModel.from_instance(self.instance.tail(tau, x_init, R_init, A_l),
+                                                 solver_params=self.solver_params,
+                                                 name=f"{self.model.ModelName}_{tau}", env=self.env,
+                                                 solver=self.solver, timers=self.timers, control=self.control)
+        tail.build_model()
+        return tail
+
+    @timed("restore_model")
+    def restore_model(self):
+        # reset variable bounds for each simulation
+        for t in range(self.T):
+            for j in range(self.n):
+                self.x[j, t+1].LB = 0.0
+                self.x[j, t+1].UB = np.inf
+                self.y[j, t].LB = 0.0
+                self.y[j, t].UB = np.inf
+                self.z[j, t].LB = 0.0
+                self.z[j, t].UB = np.inf
+
+            for l in range(self.q):
+                for i in self.I_A:
+                    self.R[i, t+1, l].LB = 0.0
+                    self.R[i, t+1, l].UB = np.inf
+                    self.v[i, t, l].LB = 0.0
+                    self.v[i, t, l].UB = np.inf
+                    self.w[i, t, l].LB = 0.0
+                    self.w[i, t, l].UB = np.inf
+
+        # add deleted constraints
+        for t in range(self.T):
+            self._add_period_constraints(t)
+
+        self.model.update()
+
+    def non_anticipativity_objective(self, epsilon):
+        # weighted procurement of secondary materials, cached per epsilon since the rolling
+        # horizon approach requests the same expression in every stage
+        if epsilon not in self.na_objectives and self.solver == "highs":
+            self.na_objectives[epsilon] = self.model.linear(self.v, (1+epsilon)**np.arange(self.T)[None, :, None])
+        elif epsilon not in self.na_objectives:
+            self.na_objectives[epsilon] = quicksum((1+epsilon)**t * quicksum(quicksum(
+                self.v[i, t, l] for i in self.I_A) for l in range(self.q)) for t in range(self.T))
+        return self.na_objectives[epsilon]
+
+    @timed("reoptimize_subject_to_non_anticipativity")
+    def reoptimize_subject_to_non_anticipativity(self, epsilon):
+        # lexicographic optimization: maximize profit first, then minimize the weighted procurement
+        # of secondary materials without deteriorating the profit; both stages run in one warm solve
+        if self.solver == "highs":
+            if self.control is not None:
+                self.control.check()
+            optimal = self.model.optimize_lexicographic([self.profit, -self.non_anticipativity_objective(epsilon)])
+            if self.timers is not None:
+                self.timers.record_solve(self.model)
+            return optimal
+        # apply a pending reset of a previous call (objective 1 cannot be set while NumObj = 1 is pending)
+        self.model.update()
+        self.model.ModelSense = GRB.MAXIMIZE
+        self.model.setObjectiveN(self.profit, index=0, priority=1, abstol=0.0, reltol=0.0,
+                                 name="Profit")
+        self.model.setObjectiveN(-self.non_anticipativity_objective(epsilon), index=1, priority=0,
+                                 name="NonAnticipativity")
+        optimal = self.optimize()
+        # reset model to original model (objective 0 is the profit); the reset stays pending, so that the solution
+        # of this solve remains available until the next solve or update
+        self.model.NumObj = 1
+        return optimal
+
+    @timed("optimize")
+    def optimize(self):
+        # a cancelled run stops before the solve or terminates a running Gurobi solve
+        if self.control is not None:
+            self.control.check()
+            self.model.optimize(self.control.gurobi_callback)
+        else:
+            self.model.optimize()
+        if self.timers is not None:
+            self.timers.record_solve(self.model)
+        if self.control is not None:
+            self.control.check()
+        return self.model.status == OPTIMAL
+
+    def _report(self, phase, done=0, total=0):
+        # progress of a simulation (and cancellation point)
+        if self.control is not None:
+            self.control.progress(phase, done, total)
+
+    def _secondary_requirements(self, y):
+        # consumption of secondary materials per period and remaining requirements from period tau onwards
+        consumption = self.a[:self.m_A] @ y
+        remaining = np.cumsum(consumption[:, ::-1], axis=1)[:, ::-1]
+        return consumption, remaining
+
+    @staticmethod
+    def _realized_procurement(R_value, realized_A, consumption, remaining):
+        # procure secondary material up to the remaining requirements and replace shortages by primary material
+        if R_value + realized_A <= remaining:
+            realized_v = realized_A
+        else:
+            realized_v = max(0.0, remaining - R_value)
+        realized_w = max(0.0, consumption - R_value - realized_v)
+        return realized_v, realized_w
+
+    def simulate_rolling_schedule(self, num_sim, epsilon, realized_A=None, shrinking=False, precision=None,
+                                  min_sim=10):
+        if realized_A is None:
+            realized_A = draw_availabilities(self.A, num_sim)
+        real_CM_avg_rolling = np.mean(self.rolling_schedule_replications(realized_A[:num_sim], epsilon, shrinking,
+                                                                         precision, min_sim))
+        return real_CM_avg_rolling
+
+    @timed("rolling_simulation")
+    def rolling_schedule_replications(self, realized_A, epsilon, shrinking=False, precision=None, min_sim=10):
+        # realized contribution margin of the rolling horizon approach for each row of realized_A[ctr, i, t];
+        # with shrinking=True, stage tau solves a model of the periods tau, ..., T-1 instead of the full model
+        # with the decisions up to tau-1 fixed. Fixing decisions relies on Gurobi's bound modifications and
+        # constraint removal, so sparse models always use the shrinking horizon. With a precision, the replications
+        # stop early once the estimate is precise enough (see sequential_replications)
+        if shrinking or self.solver == "highs":
+            return self.shrinking_horizon_replications(realized_A, epsilon, precision=precision, min_sim=min_sim)
+        return sequential_replications(self.iter_rolling_schedule_replications(realized_A, epsilon), precision,
+                                       min_sim)
+
+    def iter_rolling_schedule_replications(self, realized_A, epsilon, shrinking=False):
+        # generator of the realized contribution margins of rolling_schedule_replications; a margin is yielded
+        # after the model of its replication has been restored, so the caller may stop after any replication
+        if shrinking or self.solver == "highs":
+            yield from self.iter_shrinking_horizon_replications(realized_A, epsilon)
+            return
+        p, k, h = self.p, self.k, self.h
+        for ctr in range(len(realized_A)):
+            CM_without_secondary_materials_cost = 0.0
+            secondary_materials_cost = 0.0
+
+            # iterations of rolling horizon approach
+            for tau in range(self.T):
+                # solve model with decisions fixed up to tau-1
+                if epsilon > 0.0:
+                    optimal = self.reoptimize_subject_to_non_anticipativity(epsilon)
+                else:
+                    optimal = self.optimize()
+                if optimal:
+                    solution = self.solution_arrays()
+                    consumption, remaining = self._secondary_requirements(solution["y"])
+                    # retrieve x, y, and z values
+                    x_value = solution["x"][:, tau]
+                    y_value = solution["y"][:, tau]
+                    z_value = solution["z"][:, tau]
+                    new_x_value = np.maximum(0.0, x_value + y_value - z_value)  # max due to inaccuracies
+
+                    # fix x, y, and z variables at time tau
+                    for j in range(self.n):
+                        self.x[j, tau+1].LB = new_x_value[j]
+                        self.x[j, tau+1].UB = new_x_value[j]
+                        self.y[j, tau].LB = y_value[j]
+                        self.y[j, tau].UB = y_value[j]
+                        self.z[j, tau].LB = z_value[j]
+                        self.z[j, tau].UB = z_value[j]
+
+                    CM_without_secondary_materials_cost += np.sum(p*z_value - k*y_value - h*new_x_value)
+
+                    for i in self.I_A:
+                        # retrieve R value
+                        R_value = solution["R"][i, tau, 0]
+
+                        # compute realized purchases of secondary and primary materials
+                        realized_v, realized_w = self._realized_procurement(R_value, realized_A[ctr, i, tau],
+                                                                            consumption[i, tau], remaining[i, tau])
+                        secondary_materials_cost += (self.b[i] * realized_v + self.c[i] * realized_w)
+
+                        # fix purchase variables and inventory
+                        new_R_value = R_value + realized_v + realized_w - consumption[i, tau]
+                        for l in range(self.q):
+                            self.v[i, tau, l].LB = realized_v
+                            self.v[i, tau, l].UB = realized_v
+                            self.w[i, tau, l].LB = realized_w
+                            self.w[i, tau, l].UB = realized_w
+                            self.R[i, tau+1, l].LB = new_R_value
+                            self.R[i, tau+1, l].UB = new_R_value
+
+                    # remove constraints for time tau
+                    self._remove_period_constraints(tau)
+                    self.model.update()
+
+            total_CM = CM_without_secondary_materials_cost - secondary_materials_cost
+            self.restore_model()
+            self._report("rolling_simulation", ctr + 1, len(realized_A))
+            yield total_CM
+
+    def resampled_rolling_schedule_replications(self, realized_A, epsilon, sample_pool, precision=None, min_sim=10):
+        # shrinking horizon stages whose availability samples are re-sampled from the pre-drawn
+        # sample_pool[block, i, t, l], stage tau of replication ctr using block (ctr + tau) mod the number of blocks
+        return self.shrinking_horizon_replications(realized_A, epsilon, sample_pool, precision, min_sim)
+
+    @timed("shrinking_horizon_simulation")
+    def shrinking_horizon_replications(self, realized_A, epsilon, sample_pool=None, precision=None, min_sim=10):
+        # rolling horizon approach in which stage tau solves a model of the remaining periods tau, ..., T-1 only,
+        # starting from the realized inventory levels; nothing is fixed in this model, so nothing has to be restored.
+        # The stage models use the samples of this model unless a sample_pool is given
+        return sequential_replications(self.iter_shrinking_horizon_replications(realized_A, epsilon, sample_pool),
+                                       precision, min_sim)
+
+    def iter_shrinking_horizon_replications(self, realized_A, epsilon, sample_pool=None):
+        # generator of the realized contribution margins of shrinking_horizon_replications
+        p, k, h = self.p, self.k, self.h
+        for ctr in range(len(realized_A)):
+            x_state = self.x_a
+            R_state = self.R_a
+            CM_without_secondary_materials_cost = 0.0
+            secondary_materials_cost = 0.0
+
+            for tau in range(self.T):
+                if sample_pool is None:
+                    stage = self.tail_model(tau, x_state, R_state)
+                else:
+                    block = sample_pool[(ctr + tau) % len(sample_pool)]
+                    stage = self.tail_model(tau, x_state, R_state, block[:, tau:, :])
+                if epsilon > 0.0:
+                    optimal = stage.reoptimize_subject_to_non_anticipativity(epsilon)
+                else:
+                    optimal = stage.optimize()
+                if optimal:
+                    # decisions of the first period of the stage model are implemented
+                    solution = stage.solution_arrays()
+                    consumption, remaining = stage._secondary_requirements(solution["y"])
+                    y_value = solution["y"][:, 0]
+                    z_value = solution["z"][:, 0]
+                    x_state = np.maximum(0.0, x_state + y_value - z_value)  # max due to inaccuracies
+                    CM_without_secondary_materials_cost += np.sum(p*z_value - k*y_value - h*x_state)
+
+                    new_R_state = R_state.copy()
+                    for i in self.I_A:
+                        realized_v, realized_w = self._realized_procurement(R_state[i], realized_A[ctr, i, tau],
+                                                                            consumption[i, 0], remaining[i, 0])
+                        secondary_materials_cost += self.b[i] * realized_v + self.c[i] * realized_w
+                        new_R_state[i] = R_state[i] + realized_v + realized_w - consumption[i, 0]
+                    R_state = new_R_state
+                stage.model.dispose()
+
+            self._report("rolling_simulation", ctr + 1, len(realized_A))
+            yield CM_without_secondary_materials_cost - secondary_materials_cost
+
+    def simulate_schedule(self, num_sim, realized_A=None, precision=None, min_sim=10):
+        if realized_A is None:
+            realized_A = draw_availabilities(self.A, num_sim)
+        real_CM = np.mean(self.schedule_replications(realized_A[:num_sim], precision, min_sim))
+        return real_CM
+
+    @timed("schedule_simulation")
+    def schedule_replications(self, realized_A, precision=None, min_sim=10):
+        # realized contribution margin of the current (predictive) schedule for each row of realized_A[ctr, i, t]
+        return sequential_replications(self.iter_schedule_replications(realized_A), precision, min_sim)
+
+    def iter_schedule_replications(self, realized_A):
+        # generator of the realized contribution margins of schedule_replications; the schedule is retrieved when
+        # the first margin is requested
+        solution = self.solution_arrays()
+        x, y, z = solution["x"], solution["y"], solution["z"]
+        consumption, remaining = self._secondary_requirements(y)
+        CM_without_secondary_materials_cost = np.sum(self.p[:, None] * z - self.k[:, None] * y
+                                                     - self.h[:, None] * x[:, 1:])
+        for ctr in range(len(realized_A)):
+            # initialize
+            secondary_materials_cost = 0.0
+            R_values = self.R_a.copy()
+
+            # iterate periods
+            for tau in range(self.T):
+                for i in self.I_A:
+                    R_value = R_values[i]
+
+                    # compute realized purchases of secondary and primary materials
+                    realized_v, realized_w = self._realized_procurement(R_value, realized_A[ctr, i, tau],
+                                                                        consumption[i, tau], remaining[i, tau])
+
+                    # update inventory for tau + 1
+                    R_values[i] = R_value + realized_v + realized_w - consumption[i, tau]
+                    secondary_materials_cost += self.b[i] * realized_v + self.c[i] * realized_w
+
+            total_CM = CM_without_secondary_materials_cost - secondary_materials_cost
+            self._report("schedule_simulation", ctr + 1, len(realized_A))
+            yield total_CM
+
+    @timed("exact_schedule_evaluation")
+    def expected_schedule_CM(self, pmfs=None):
+        # expected realized contribution margin of the current (predictive) schedule, computed exactly instead of
+        # estimated by schedule_replications: only the secondary materials cost is random, and it is the sum of the
+        # expected procurement costs of the secondary materials (see expected_procurement_cost). pmfs[i][t] =
+        # (values, probabilities) of the availability, by default that of the simulations
+        if pmfs is None:
+            pmfs = availability_pmfs(self.A)
+        solution = self.solution_arrays()
+        x, y, z = solution["x"], solution["y"], solution["z"]
+        consumption, remaining = self._secondary_requirements(y)
+        CM_without_secondary_materials_cost = np.sum(self.p[:, None] * z - self.k[:, None] * y
+                                                     - self.h[:, None] * x[:, 1:])
+        secondary_materials_cost = sum(expected_procurement_cost(self.R_a[i], consumption[i], remaining[i], pmfs[i],
+                                                                 self.b[i], self.c[i]) for i in self.I_A)
+        return CM_without_secondary_materials_cost - secondary_materials_cost
+
+    def solution_arrays(self):
+        # retrieve the solution with a single attribute query and split it into one array per variable block
+        values = np.array(self.model.getAttr("X", self.variables))
+        solution = {}
+        start = 0
+        for block, shape in self.variable_shapes.items():
+            size = int(np.prod(shape))
+            solution[block] = values[start:start + size].reshape(shape)
+            start += size
+        return solution
+
+    def _secondary_material_lines(self, R_mean, v_mean, w_mean):
+        lines = ["---------------------------------------------------------------------------------\n",
+                 " Secondary m. | Period |  Inventory | Procurement sec. m. | Procurement prim. m. \n",
+                 "---------------------------------------------------------------------------------\n"]
+        # rows for each secondary material i and period t
+        lines += [f"{i+1:13} | {t+1:6} | {R_mean[i, t]:10.2f} | {v_mean[i, t]:19.2f} | {w_mean[i, t]:20.2f} \n"
+                  for i in self.I_A for t in range(self.T)]
+        return lines
+
+    @timed("save_results")
+    def save_results(self, filename, directory="./results"):
+        solution = self.solution_arrays()
+        x, y, z = solution["x"], solution["y"], solution["z"]
+        # sample means of secondary material decisions
+        v_mean = solution["v"].mean(axis=2)
+        w_mean = solution["w"].mean(axis=2)
+        R_mean = solution["R"].mean(axis=2)
+        d = self.d
+
+        # Summary of key metrics
+        lines = ["Optimal circular master production schedule\n\n",
+                 "------------------------------------------------------------\n",
+                 " Product | Period | Inventory | Production | Sales | Demand \n",
+                 "------------------------------------------------------------\n"]
+        # rows for each product i and period t
+        lines += [f"{i+1:8} | {t+1:6} | {x[i, t]:9.2f} | {y[i, t]:10.2f} | {z[i, t]:5.2f} | {d[i, t]:6.2f} \n"
+                  for i in range(self.n) for t in range(self.T)]
+        lines.append("\n")
+        lines += self._secondary_material_lines(R_mean, v_mean, w_mean)
+        lines.append("\n")
+
+        # Compute alpha service level for each product: fraction of periods in which
+        # inventory + production >= demand
+        service_levels = (x[:, :self.T] + y >= d).mean(axis=1)
+        lines += [f"Service level for product {j + 1}: {sl:.4f}\n" for j, sl in enumerate(service_levels)]
+
+        TCM = np.sum(self.p[:, None] * z - self.k[:, None] * y - self.h[:, None] * x[:, 1:]) \
+            - np.sum(self.b[:, None] * v_mean + self.c[:, None] * w_mean)
+        lines.append(f"Total contribution margin: {TCM:.4f}\n")
+
+        # check whether folder results exists; if not, create folder
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        path = os.path.join(directory, f"{filename}.txt")
+        with open(path, "w") as f:
+            f.write("".join(lines))
+        return path
+
+    @timed("export_results")
+    def export_results(self, filename, fmt="parquet", directory="./results"):
+        # columnar export of the schedule and the per-sample secondary material trajectories
+        solution = self.solution_arrays()
+        return export_results(filename, solution["x"], solution["y"], solution["z"], self.d,
+                              solution["v"], solution["w"], solution["R"], fmt=fmt, directory=directory)
@@ -0,0 +1,30 @@
+import numpy as np
+from distributions_mps import availability_pmfs, availability_quantiles, distribution_spec, uniforms
+
+
+def draw_samples(A, q, seed=111, random_state=None, distribution=None):
+    # q samples A_l[i, t, l] of the availabilities, uniform on {0, ..., 2*A[i][t]} unless another distribution is
+    # given (see distributions_mps); the second half of the samples are antithetic to the first half to reduce
+    # variance
+    if random_state is None:
+        random_state = np.random.RandomState(seed)
+    if distribution_spec(distribution)["type"] != "uniform":
+        # antithetic samples of other distributions by the inverse transformation of 1 - u
+        u = uniforms((q,) + np.shape(A), distribution, random_state)
+        for l in range(q // 2, q):
+            u[l] = 1.0 - u[l - q // 2]
+        return np.moveaxis(availability_quantiles(availability_pmfs(A, distribution), u), 0, -1)
+    A = np.asarray(A, dtype=np.int64)
+    A_l = random_state.randint(0, 2*A[:, :, None] + 1, size=A.shape + (q,))
+    # antithetic variables (sequential, so that an odd q reflects the middle sample like the original loops)
+    for l in range(q // 2, q):
+        A_l[:, :, l] = 2*A - A_l[:, :, l - q // 2]
+    return A_l
+
+
+def draw_sample_pool(A, q, num_blocks, seed=222, distribution=None):
+    # pool of num_blocks independent sample blocks pool[block, i, t, l], drawn once before a simulation so that
+    # the rolling horizon stages can re-sample the remaining periods without running the random number generator
+    random_state = np.random.RandomState(seed)
+    return np.stack([draw_samples(A, q, random_state=random_state, distribution=distribution)
+                     for _ in range(num_blocks)])
@@ -1,42 +1,52 @@
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "common"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, os.pardir, os.pardir,
+                             "common", "Python"))
+from distributions_mps import distribution_spec, expected_availabilities
+from evaluation_mps import evaluate_schedules, finish_run
+from instances_mps import MPSInstance
 from models_det import ProductionDetPlanModel
+from run_control import RunControl
+from timing import TimerRegistry
 
+# names of the evaluated schedules in the results
+LABELS = {"pred": "predictive schedule without non-anticipativity",
+          "pred_na": "predictive schedule with non-anticipativity",
+          "rolling": "rolling schedule without non-anticipativity",
+          "rolling_na": "rolling schedule with non-anticipativity"}
 
-def run_gurobi_solver(n, m, m_A, T, x_a, R_a, R_fix, a, A, b, c, h, k, p, d):
+
+def run_gurobi_solver(n, m, m_A, T, x_a, R_a, R_fix, a, A, b, c, h, k, p, d,
+                      solver_params=None, results_dir="./results", shrinking=False, env=None,
+                      solver="gurobi", timers=None, control=None, registry=None, num_sim=100, precision=None,
+                      min_sim=10, distribution=None, export_format=None, timings_file=None):
     
-    I_A = range(m_A)
-    I_minus_I_A = [i for i in range(m) if i not in I_A] 
-    # create and build model
-    productionDetPlanModel = ProductionDetPlanModel(n, T, m, m_A, I_A, I_minus_I_A, R_fix, a, p, d, A, h, k, b, c, R_a,
-                                                    x_a)
+    if timers is None:
+        timers = TimerRegistry("MPS_CE")
+    # progress, intermediate results and cancellation of the run (e.g. by a frontend); the model only gets a given
+    # control, so that runs without one solve without a Gurobi callback
+    run_control = control if control is not None else RunControl()
+    # specification of the availability distribution of the planning and the simulations (see distributions_mps)
+    distribution = distribution_spec(distribution)
+    instance = MPSInstance(T, n, m, m_A, d, p, k, h, b, c, A, a, R_fix, x_a, R_a)
+    # create and build model, which plans with the expected availabilities of the distribution
+    productionDetPlanModel = ProductionDetPlanModel.from_instance(
+        instance, solver_params, env=env, solver=solver, timers=timers, control=control,
+        A_plan=expected_availabilities(instance.A, distribution))
+    run_control.progress("build_model")
     productionDetPlanModel.build_model()
 
-    results = {}
-    # evaluate predictive master production schedule
-    if productionDetPlanModel.optimize():
-        productionDetPlanModel.save_results("results_model")
-        predictive_CM = productionDetPlanModel.model.objVal
-        real_CM_avg_pred = productionDetPlanModel.simulate_schedule(num_sim=100)
-        productionDetPlanModel.reoptimize_subject_to_non_anticipativity(f_star=predictive_CM, epsilon=0.1)
-        productionDetPlanModel.save_results("results_model_na")
-        real_CM_avg_pred_na = productionDetPlanModel.simulate_schedule(num_sim=100)
-        # set epsilon to 0, if you don't want to use the model with non-anticipativity
-        real_CM_avg_rolling = productionDetPlanModel.simulate_rolling_schedule(num_sim=100, epsilon=0)
-        real_CM_avg_rolling_na = productionDetPlanModel.simulate_rolling_schedule(num_sim=100, epsilon=0.1)
-
-        results["Contribution margin predicted by expected value model without non-anticipativity"] = predictive_CM
-        results["Contribution margin predicted by expected value model with non-anticipativity"] = predictive_CM
-        results["Average realized contribution margin of predictive schedule without non-anticipativity"] = \
-            real_CM_avg_pred
-        results["Average realized contribution margin of predictive schedule with non-anticipativity"] = \
-            real_CM_avg_pred_na
-        results["Average realized contribution margin of rolling schedule without non-anticipativity"] = \
-            real_CM_avg_rolling
-        results["Average realized contribution margin of rolling schedule with non-anticipativity"] = \
-            real_CM_avg_rolling_na
-    else:
-        print("Could not determine predictive master production schedule")
+    # evaluate predictive and rolling master production schedules (set epsilon to 0, if you don't want to use the
+    # model with non-anticipativity)
+    results, result_paths = evaluate_schedules(
+        productionDetPlanModel, "expected value model", LABELS, timers, run_control, num_sim=num_sim, epsilon=0.1,
+        shrinking=shrinking, precision=precision, min_sim=min_sim, distribution=distribution,
+        results_dir=results_dir, export_format=export_format)
+    params = {"T": T, "n": n, "m": m, "m_A": m_A, "shrinking": shrinking, "solver": solver, "num_sim": num_sim,
+              "precision": precision, "distribution": distribution["type"]}
+    finish_run("mps_deterministic", params,
+               {**instance.to_dict(), "solver_params": solver_params, "distribution": distribution},
+               results, result_paths, timers, registry, results_dir, timings_file)
 
     return results
-
-
-    
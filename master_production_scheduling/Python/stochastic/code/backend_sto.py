@@ -1,53 +1,65 @@
-import numpy as np
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "common"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, os.pardir, os.pardir,
+                             "common", "Python"))
+from distributions_mps import distribution_spec
+from evaluation_mps import evaluate_schedules, finish_run
+from instances_mps import MPSInstance
 from models_sto import ProductionStoPlanModel
+from run_control import RunControl
+from sampling_mps import draw_samples, draw_sample_pool
+from timing import TimerRegistry
 
+# names of the evaluated schedules in the results
+LABELS = {"pred": "sampling approximation without non-anticipativity",
+          "pred_na": "sampling approximation with non-anticipativity",
+          "rolling": "rolling sampling approximation without non-anticipativity",
+          "rolling_na": "rolling sampling approximation with non-anticipativity"}
 
-def run_gurobi_solver(n, m, m_A, T, x_a, R_a, R_fix, a, A, b, c, h, k, p, d, q):
+
+def run_gurobi_solver(n, m, m_A, T, x_a, R_a, R_fix, a, A, b, c, h, k, p, d, q,
+                      solver_params=None, results_dir="./results", resample=False, shrinking=False,
+                      env=None, solver="gurobi", timers=None, A_l=None, control=None, registry=None,
+                      num_sim=100, precision=None, min_sim=10, distribution=None, export_format=None,
+                      timings_file=None):
     
-    I_A = range(m_A)
-    I_minus_I_A = [i for i in range(m) if i not in I_A]
-    np.random.seed(111)
-    A_l = [[[np.random.randint(0, 2*A[i][t]+1) for _ in range(q)] for t in range(T)] for i in I_A]
-    # antithetic variables to reduce variance
-    for i in I_A:
-        for t in range(T):
-            for l in range(q // 2, q):
-                A_l[i][t][l] = 2 * A[i][t] - A_l[i][t][l - q // 2]
+    if timers is None:
+        timers = TimerRegistry("MPS_CE_Sampling")
+    # progress, intermediate results and cancellation of the run (e.g. by a frontend); the models only get a given
+    # control, so that runs without one solve without a Gurobi callback
+    run_control = control if control is not None else RunControl()
+    # specification of the availability distribution of the samples and simulations (see distributions_mps)
+    distribution = distribution_spec(distribution)
+    run_control.progress("draw_samples")
+    # instance with samples of the availabilities incl. antithetic variables to reduce variance, or with the given
+    # samples A_l[i, t, l] (e.g. read from a stored sample cube), whose number replaces q
+    with timers.phase("draw_samples"):
+        instance = MPSInstance(T, n, m, m_A, d, p, k, h, b, c, A, a, R_fix, x_a, R_a,
+                               draw_samples(A, q, distribution=distribution) if A_l is None else A_l)
+        q = instance.q
+        # with resample, the stage models of the rolling schedules re-draw their samples from a pool of one block
+        # per period
+        sample_pool = draw_sample_pool(instance.A, q, num_blocks=T, distribution=distribution) if resample else None
     
     # create and build model
-    productionStoPlanModel = ProductionStoPlanModel(n, T, m, q, m_A, I_A, I_minus_I_A, R_fix, a, p, d, A, A_l, h, k, b,
-                                                    c, R_a, x_a)
+    productionStoPlanModel = ProductionStoPlanModel.from_instance(instance, solver_params, env=env, solver=solver,
+                                                                  timers=timers, control=control)
+    run_control.progress("build_model")
     productionStoPlanModel.build_model()
 
-    results = {}
-    # evaluate predictive master production schedule
-    if productionStoPlanModel.optimize():
-        productionStoPlanModel.save_results("results_model")
-        predictive_CM = productionStoPlanModel.model.objVal
-        real_CM_avg_pred = productionStoPlanModel.simulate_schedule(num_sim=100)
-        productionStoPlanModel.reoptimize_subject_to_non_anticipativity(f_star=predictive_CM, epsilon=0.1)
-        productionStoPlanModel.save_results("results_model_na")
-        real_CM_avg_pred_na = productionStoPlanModel.simulate_schedule(num_sim=100)
-        # set epsilon to 0, if you don't want to use the model with non-anticipativity
-        real_CM_avg_rolling = productionStoPlanModel.simulate_rolling_schedule(num_sim=100, epsilon=0)
-        real_CM_avg_rolling_na = productionStoPlanModel.simulate_rolling_schedule(num_sim=100, epsilon=0.1)
+    # evaluate predictive and rolling master production schedules (set epsilon to 0, if you don't want to use the
+    # model with non-anticipativity)
+    results, result_paths = evaluate_schedules(
+        productionStoPlanModel, "sampling approximation model", LABELS, timers, run_control, num_sim=num_sim,
+        epsilon=0.1, shrinking=shrinking, sample_pool=sample_pool, precision=precision, min_sim=min_sim,
+        distribution=distribution, results_dir=results_dir, export_format=export_format)
+    # sizes and options are indexed by the registry; the input data excludes the samples, which are drawn anew by
+    # each run
+    params = {"T": T, "n": n, "m": m, "m_A": m_A, "q": q, "resample": resample, "shrinking": shrinking,
+              "solver": solver, "num_sim": num_sim, "precision": precision, "distribution": distribution["type"]}
+    finish_run("mps_stochastic", params,
+               {**instance.with_samples(None).to_dict(), "solver_params": solver_params, "distribution": distribution},
+               results, result_paths, timers, registry, results_dir, timings_file)
 
-        results["Contribution margin predicted by sampling approximation model without non-anticipativity"] \
-            = predictive_CM
-        results["Contribution margin predicted by sampling approximation model with non-anticipativity"] \
-            = predictive_CM
-        results["Average realized contribution margin of sampling approximation without non-anticipativity"] \
-            = real_CM_avg_pred
-        results["Average realized contribution margin of sampling approximation with non-anticipativity"] \
-            = real_CM_avg_pred_na
-        results["Average realized contribution margin of rolling sampling approximation without non-anticipativity"] \
-            = real_CM_avg_rolling
-        results["Average realized contribution margin of rolling sampling approximation with non-anticipativity"] \
-            = real_CM_avg_rolling_na
-    else:
-        print("Could not determine predictive master production schedule")
-     
     return results
-
-
-    
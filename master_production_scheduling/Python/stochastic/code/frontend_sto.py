@@ -1,11 +1,36 @@
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout,
                              QHBoxLayout, QLabel, QLineEdit, QPushButton, QWidget,
-                             QGridLayout, QSizePolicy, QDesktopWidget, QShortcut, QFileDialog, QMessageBox)
+                             QGridLayout, QSizePolicy, QDesktopWidget, QShortcut, QFileDialog, QMessageBox,
+                             QProgressBar, QScrollArea)
 from PyQt5.QtGui import QFont, QPixmap, QKeySequence
-from backend_sto import *
-from PyQt5.QtCore import Qt
+import os
 import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "common"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, os.pardir, os.pardir,
+                             "common", "Python"))
+from solver_worker import SolverWorker, progress_text
+from array_table import ArrayTableModel, array_table_view
+from instances_mps import MPSInstance
+from PyQt5.QtCore import Qt
 import json
+import numpy as np
+
+
+# input tables: parameter, label, row and column index names (vectors have a single row without name)
+INPUT_TABLES = [
+    ("d", "d (demands)", "j", "t"),
+    ("p", "p (prices)", "", "j"),
+    ("k", "k (production costs)", "", "j"),
+    ("h", "h (holding costs)", "", "j"),
+    ("A", "A (expected availabilities of secondary materials)", "i", "t"),
+    ("x_a", "x_a (initial inventory levels of products)", "", "j"),
+    ("a", "a (production coefficients)", "i", "j"),
+    ("R_a", "R_a (initial inventory levels of secondary materials)", "", "i"),
+    ("b", "b (procurement costs of secondary materials)", "", "i"),
+    ("c", "c (procurement costs of corresponding primary materials)", "", "i"),
+    ("R_fix", "Rfix (capacities of non-secondary production factors)", "i", "t"),
+]
+VECTORS = ("p", "k", "h", "x_a", "R_a", "b", "c")
 
 
 class MainWindow(QMainWindow):
@@ -67,11 +92,16 @@ class MainWindow(QMainWindow):
 
         main_layout.addLayout(param_layout)
 
-        # dynamic fields (demand, availability, etc.)
+        # input tables (demand, availability, etc.), scrollable as a whole
         self.dynamic_layout = QGridLayout()
-        self.dynamic_widgets = {"q": input_field}
+        self.table_models = {}
+        tables_widget = QWidget()
+        tables_widget.setLayout(self.dynamic_layout)
+        tables_area = QScrollArea()
+        tables_area.setWidgetResizable(True)
+        tables_area.setWidget(tables_widget)
 
-        main_layout.addLayout(self.dynamic_layout)
+        main_layout.addWidget(tables_area)
 
         # buttons (Run Solver and Save Results)
         button_layout = QHBoxLayout()
@@ -84,6 +114,15 @@ class MainWindow(QMainWindow):
         self.run_button.clicked.connect(self.run_solver)
         button_layout.addWidget(self.run_button)
 
+        # Cancel button (enabled while the solver runs)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setFont(QFont("Arial", 10, QFont.Bold))
+        self.cancel_button.setStyleSheet("background-color: lightgray;")
+        self.cancel_button.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_solver)
+        button_layout.addWidget(self.cancel_button)
+
         # Save Results button
         self.save_button = QPushButton("Save Parameters")
         self.save_button.setFont(QFont("Arial", 10, QFont.Bold))
@@ -102,8 +141,21 @@ class MainWindow(QMainWindow):
 
         main_layout.addLayout(button_layout)
 
+        # progress of the solver run
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1)
+        progress_layout.addWidget(self.progress_bar)
+        self.status_label = QLabel("")
+        progress_layout.addWidget(self.status_label)
+        main_layout.addLayout(progress_layout)
+
         # results
         self.results = None
+        # solver running in the background
+        self.worker = None
+        # loaded instance file with a stored sample cube (if any)
+        self.sample_path = None
         self.results_layout = QVBoxLayout()
         self.results_label = QLabel("")
         self.results_layout.addWidget(self.results_label)
@@ -148,45 +200,12 @@ class MainWindow(QMainWindow):
         m_A = int(self.params["m_A (secondary factors)"])
         I_A = range(m_A)
 
-        q = int(self.dynamic_widgets["q"].text())
-        d = [[0.0] * T for _ in range(n)]
-        for j in range(n):
-            for t in range(T):
-                d[j][t] = float(self.dynamic_widgets[f"d-{j+1}-{t+1}"].text())
-        p = [0.0]*n
-        for j in range(n):
-            p[j] = float(self.dynamic_widgets[f"p-{j+1}"].text())
-        k = [0.0]*n
-        for j in range(n):
-            k[j] = float(self.dynamic_widgets[f"k-{j+1}"].text())
-        h = [0.0]*n
-        for j in range(n):
-            h[j] = float(self.dynamic_widgets[f"h-{j+1}"].text())
-        b = [0.0]*m_A
-        for i in range(m_A):
-            b[i] = float(self.dynamic_widgets[f"b-{i+1}"].text())   
-        c = [0.0]*m_A
-        for i in range(m_A):
-            c[i] = float(self.dynamic_widgets[f"c-{i+1}"].text()) 
-        A = [[0.0] * T for _ in range(m_A)]
-        for i in range(m_A):
-            for t in range(T):
-                A[i][t] = float(self.dynamic_widgets[f"A-{i+1}-{t+1}"].text())
-        a = [[0.0] * n for _ in range(m)]
-        for i in range(m):
-            for j in range(n):
-                a[i][j] = float(self.dynamic_widgets[f"a-{i+1}-{j+1}"].text())
-        I_minus_I_A = [i for i in range(m) if i not in I_A]  
-        R_fix = [[0.0] * T for _ in range(m-m_A)]
-        for i in range(m-m_A):
-            for t in range(T):
-                R_fix[i][t] = float(self.dynamic_widgets[f"R_fix-{i+1}-{t+1}"].text())
-        x_a = [0.0]*n
-        for j in range(n):
-            x_a[j] = float(self.dynamic_widgets[f"x_a-{j+1}"].text())
-        R_a = [0.0]*m_A
-        for i in range(m_A):
-            R_a[i] = float(self.dynamic_widgets[f"Ra-{i+1}"].text())
+        q = int(self.param_inputs["q (samples)"].text())
+        if not self.tables_complete():
+            self.show_error_message("One of the entries is not valid. Please enter a valid number.")
+            return
+        d, p, k, h, A, x_a, a, R_a, b, c, R_fix = self.table_values()
+        I_minus_I_A = [i for i in range(m) if i not in I_A]
         
         data_to_save = {
             "T": T,
@@ -194,18 +213,18 @@ class MainWindow(QMainWindow):
             "m": m,
             "m_A": m_A,
             "q": q,
-            "d": d,     
-            "p": p,      
-            "k": k,       
-            "h": h,       
-            "b": b,       
-            "c": c,       
-            "A": A,       
-            "a": a,       
+            "d": d.tolist(),
+            "p": p.tolist(),
+            "k": k.tolist(),
+            "h": h.tolist(),
+            "b": b.tolist(),
+            "c": c.tolist(),
+            "A": A.tolist(),
+            "a": a.tolist(),
             "I_minus_I_A": I_minus_I_A, 
-            "R_fix": R_fix,
-            "x_a": x_a,
-            "R_a": R_a
+            "R_fix": R_fix.tolist(),
+            "x_a": x_a.tolist(),
+            "R_a": R_a.tolist()
         }
         # choose an existing json file
         file_path, _ = QFileDialog.getSaveFileName(self, "select a json-file with saved parameters ", "",
@@ -228,10 +247,9 @@ class MainWindow(QMainWindow):
 
         with open(f"{file_path}", "r") as file:
             loaded_data = json.load(file)
+        # the sample cube stored next to the file is not read here; the solver maps the samples it needs
+        self.sample_path = file_path if "samples" in loaded_data else None
     
-        # clear previous dynamic widgets
-        self.clear_layout(self.dynamic_layout)
-       
         self.params["T (periods)"] = loaded_data["T"]
         self.params["n (products)"] = loaded_data["n"]
         self.params["m (factors)"] = loaded_data["m"]
@@ -248,233 +266,41 @@ class MainWindow(QMainWindow):
         n = self.params["n (products)"]
         m = self.params["m (factors)"]
         m_A = self.params["m_A (secondary factors)"]
-        
-        label_widget = QLabel(f"d (demands):")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, 0, 0)
-        for j in range(n):
-            for t in range(T):
-                field = QLineEdit(str(loaded_data["d"][j][t]))
-                field.setCursorPosition(0)
-                field.setMaximumWidth(50)
-                self.dynamic_layout.addWidget(field, j, t + 1)  # add fields next to the label
-                self.dynamic_widgets[f"d-{j+1}-{t+1}"] = field
-        
-        label_widget = QLabel(f"p (prices):")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+1, 0)
-        for j in range(n):
-            field = QLineEdit(str(loaded_data["p"][j]))
-            field.setCursorPosition(0)
-            field.setMaximumWidth(50)
-            self.dynamic_layout.addWidget(field, n+1, j + 1)  # add fields next to the label
-            self.dynamic_widgets[f"p-{j+1}"] = field
-        
-        label_widget = QLabel(f"k (production costs):")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+2, 0)
-        for j in range(n):
-            field = QLineEdit(str(loaded_data["k"][j]))
-            field.setCursorPosition(0)
-            field.setMaximumWidth(50)
-            self.dynamic_layout.addWidget(field, n+2, j + 1)  # add fields next to the label
-            self.dynamic_widgets[f"k-{j+1}"] = field
-        
-        label_widget = QLabel(f"h (holding costs):")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+3, 0)
-        for j in range(n):
-            field = QLineEdit(str(loaded_data[f"h"][j]))
-            field.setCursorPosition(0)
-            field.setMaximumWidth(50)
-            self.dynamic_layout.addWidget(field, n+3, j + 1)  # add fields next to the label
-            self.dynamic_widgets[f"h-{j+1}"] = field
-        
-        label_widget = QLabel(f"A (expected availabilities of secondary material):")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+4, 0)
-        for i in range(m_A):
-            for t in range(T):
-                field = QLineEdit(str(loaded_data["A"][i][t]))
-                field.setCursorPosition(0)
-                field.setMaximumWidth(50)
-                self.dynamic_layout.addWidget(field, n+i+4, t + 1)  # add fields next to the label
-                self.dynamic_widgets[f"A-{i+1}-{t+1}"] = field   
-
-        label_widget = QLabel(f"x_a (initial inventory levels of products):")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+m+5, 0)
-        for j in range(n):
-            field = QLineEdit(str(loaded_data[f"x_a"][j]))
-            field.setCursorPosition(0)
-            field.setMaximumWidth(50)
-            self.dynamic_layout.addWidget(field, n+m+5, j + 1)  # add fields next to the label
-            self.dynamic_widgets[f"x_a-{j+1}"] = field
-        
-        label_widget = QLabel(f"a (production coefficients):")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+m+6, 0)
-        for i in range(m):
-            for j in range(n):
-                field = QLineEdit(str(loaded_data["a"][i][j]))
-                field.setCursorPosition(0)
-                field.setMaximumWidth(50)
-                self.dynamic_layout.addWidget(field, n+m+i+6, j + 1)  # add fields next to the label
-                self.dynamic_widgets[f"a-{i+1}-{j+1}"] = field
-        
-        label_widget = QLabel(f"R_a (initial inventory levels of secondary materials):")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+2*m+7, 0)
-        for i in range(m_A):
-            field = QLineEdit(str(loaded_data["R_a"][i]))
-            field.setCursorPosition(0)
-            field.setMaximumWidth(50)
-            self.dynamic_layout.addWidget(field, n+2*m+7, i + 1)
-            self.dynamic_widgets[f"Ra-{i+1}"] = field
-        
-        label_widget = QLabel(f"b (procurement costs of secondary materials):")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+2*m+8, 0)
-        for i in range(m_A):
-            field = QLineEdit(str(loaded_data["b"][i]))
-            field.setCursorPosition(0)
-            field.setMaximumWidth(50)
-            self.dynamic_layout.addWidget(field, n+2*m+8, i + 1)
-            self.dynamic_widgets[f"b-{i+1}"] = field
-        
-        label_widget = QLabel(f"c (procurement costs of corresponding primary materials):")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+2*m+9, 0)
-        for i in range(m_A):
-            field = QLineEdit(str(loaded_data["c"][i]))
-            field.setCursorPosition(0)
-            field.setMaximumWidth(50)
-            self.dynamic_layout.addWidget(field, n+2*m+9, i + 1)
-            self.dynamic_widgets[f"c-{i+1}"] = field
-        
-        label_widget = QLabel(f"Rfix (capacities of non-secondary production factors):")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+2*m+10, 0)
-        for i in range(m-m_A):
-            for t in range(T):
-                field = QLineEdit(str(loaded_data["R_fix"][i][t]))
-                field.setCursorPosition(0)
-                field.setMaximumWidth(50)
-                self.dynamic_layout.addWidget(field, n+2*m+10+i, t + 1)
-                self.dynamic_widgets[f"R_fix-{i+1}-{t+1}"] = field
+        self.build_tables(T, n, m, m_A, loaded_data)
         
     def generate_fields(self):
-        # clear previous dynamic widgets
-        self.clear_layout(self.dynamic_layout)
-       
+        self.sample_path = None
         # get values for T, n, m, m_A
         T = int(self.param_inputs["T (periods)"].text())
         n = int(self.param_inputs["n (products)"].text())
         m = int(self.param_inputs["m (factors)"].text())
         m_A = int(self.param_inputs["m_A (secondary factors)"].text())
-        
-        label_widget = QLabel(f"d (demands)")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, 0, 0)
-        for j in range(n):
-            for t in range(T):
-                field = QLineEdit()
-                field.setMaximumWidth(50)
-                self.dynamic_layout.addWidget(field, j, t + 1)  # add fields next to the label
-                self.dynamic_widgets[f"d-{j+1}-{t+1}"] = field
-        
-        label_widget = QLabel(f"p (prices)")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+1, 0)
-        for j in range(n):
-            field = QLineEdit()
-            field.setMaximumWidth(50)
-            self.dynamic_layout.addWidget(field, n+1, j + 1)  # add fields next to the label
-            self.dynamic_widgets[f"p-{j+1}"] = field
-        
-        label_widget = QLabel(f"k (production costs)")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+2, 0)
-        for j in range(n):
-            field = QLineEdit()
-            field.setMaximumWidth(50)
-            self.dynamic_layout.addWidget(field, n+2, j + 1)  # add fields next to the label
-            self.dynamic_widgets[f"k-{j+1}"] = field
-
-        label_widget = QLabel(f"h (holding costs)")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+3, 0)
-        for j in range(n):
-            field = QLineEdit()
-            field.setMaximumWidth(50)
-            self.dynamic_layout.addWidget(field, n+3, j + 1)  # add fields next to the label
-            self.dynamic_widgets[f"h-{j+1}"] = field
-        
-        label_widget = QLabel(f"A (expected availabilities of secondary materials)")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+4, 0)
-        for i in range(m_A):
-            for t in range(T):
-                field = QLineEdit()
-                field.setMaximumWidth(50)
-                self.dynamic_layout.addWidget(field, n+i+4, t + 1)  # add fields next to the label
-                self.dynamic_widgets[f"A-{i+1}-{t+1}"] = field   
-
-        label_widget = QLabel(f"x_a (initial inventory levels of products)")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+m+5, 0)
-        for j in range(n):
-            field = QLineEdit()
-            field.setMaximumWidth(50)
-            self.dynamic_layout.addWidget(field, n+m+5, j + 1)  # add fields next to the label
-            self.dynamic_widgets[f"x_a-{j+1}"] = field
-        
-        label_widget = QLabel(f"a (production coefficients)")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+m+6, 0)
-        for i in range(m):
-            for j in range(n):
-                field = QLineEdit()
-                field.setMaximumWidth(50)
-                self.dynamic_layout.addWidget(field, n+m+i+6, j + 1)  # add fields next to the label
-                self.dynamic_widgets[f"a-{i+1}-{j+1}"] = field
-        
-        label_widget = QLabel(f"R_a (initial inventory levels of secondary materials)")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+2*m+7, 0)
-        for i in range(m_A):
-            field = QLineEdit()
-            field.setMaximumWidth(50)
-            self.dynamic_layout.addWidget(field, n+2*m+7, i + 1)
-            self.dynamic_widgets[f"Ra-{i+1}"] = field
-        
-        label_widget = QLabel(f"b (procurement costs of secondary materials)")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+2*m+8, 0)
-        for i in range(m_A):
-            field = QLineEdit()
-            field.setMaximumWidth(50)
-            self.dynamic_layout.addWidget(field, n+2*m+8, i + 1)
-            self.dynamic_widgets[f"b-{i+1}"] = field
-        
-        label_widget = QLabel(f"c (procurement costs of corresponding primary materials)")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+2*m+9, 0)
-        for i in range(m_A):
-            field = QLineEdit()
-            field.setMaximumWidth(50)
-            self.dynamic_layout.addWidget(field, n+2*m+9, i + 1)
-            self.dynamic_widgets[f"c-{i+1}"] = field
-        
-        label_widget = QLabel(f"Rfix (capacities of non-secondary production factors)")
-        label_widget.setFont(QFont("Arial", 10, QFont.Bold))
-        self.dynamic_layout.addWidget(label_widget, n+2*m+10, 0)
-        for i in range(m-m_A):
-            for t in range(T):
-                field = QLineEdit()
-                field.setMaximumWidth(50)
-                self.dynamic_layout.addWidget(field, n+2*m+10+i, t + 1)
-                self.dynamic_widgets[f"R_fix-{i+1}-{t+1}"] = field
+        self.build_tables(T, n, m, m_A)
+
+    def build_tables(self, T, n, m, m_A, values=None):
+        # one table per parameter, filled with the given values (e.g. of a loaded file) or empty
+        self.clear_layout(self.dynamic_layout)
+        shapes = {"d": (n, T), "p": (1, n), "k": (1, n), "h": (1, n), "A": (m_A, T), "x_a": (1, n), "a": (m, n),
+                  "R_a": (1, m_A), "b": (1, m_A), "c": (1, m_A), "R_fix": (m - m_A, T)}
+        self.table_models = {}
+        for row, (name, label, row_name, column_name) in enumerate(INPUT_TABLES):
+            if values is None:
+                array = np.full(shapes[name], np.nan)
+            else:
+                array = np.reshape(np.asarray(values[name], dtype=float), shapes[name])
+            model = ArrayTableModel(array, row_name, column_name)
+            label_widget = QLabel(label)
+            label_widget.setFont(QFont("Arial", 10, QFont.Bold))
+            self.dynamic_layout.addWidget(label_widget, row, 0, alignment=Qt.AlignTop)
+            self.dynamic_layout.addWidget(array_table_view(model), row, 1)
+            self.table_models[name] = model
+
+    def tables_complete(self):
+        return all(model.is_complete() for model in self.table_models.values())
+
+    def table_values(self):
+        # copies of the entries in the order d, p, k, h, A, x_a, a, R_a, b, c, R_fix (vectors as 1-D arrays)
+        return [self.table_models[name].values(vector=name in VECTORS) for name, _, _, _ in INPUT_TABLES]
     
     def show_error_message(self, message):
         # show an error message
@@ -507,56 +333,77 @@ class MainWindow(QMainWindow):
         m = int(params["m (factors)"])   # number of production factors
         m_A = int(params["m_A (secondary factors)"])
         q = int(params["q (samples)"])
-        try:
-            d = [[0.0] * T for _ in range(n)]
-            for j in range(n):
-                for t in range(T):
-                    d[j][t] = float(self.dynamic_widgets[f"d-{j+1}-{t+1}"].text())
-            p = [0.0]*n
-            for j in range(n):
-                p[j] = float(self.dynamic_widgets[f"p-{j+1}"].text())
-            k = [0.0]*n
-            for j in range(n):
-                k[j] = float(self.dynamic_widgets[f"k-{j+1}"].text())
-            h = [0.0]*n
-            for j in range(n):
-                h[j] = float(self.dynamic_widgets[f"h-{j+1}"].text())
-            b = [0.0]*m_A
-            for i in range(m_A):
-                b[i] = float(self.dynamic_widgets[f"b-{i+1}"].text())   
-            c = [0.0]*m_A
-            for i in range(m_A):
-                c[i] = float(self.dynamic_widgets[f"c-{i+1}"].text()) 
-            A = [[0.0] * T for _ in range(m_A)]
-            for i in range(m_A):
-                for t in range(T):
-                    A[i][t] = float(self.dynamic_widgets[f"A-{i+1}-{t+1}"].text())
-            a = [[0.0] * n for _ in range(m)]
-            for i in range(m):
-                for j in range(n):
-                    a[i][j] = float(self.dynamic_widgets[f"a-{i+1}-{j+1}"].text())
-            R_fix = [[0.0] * T for _ in range(m-m_A)]
-            for i in range(m-m_A):
-                for t in range(T):
-                    R_fix[i][t] = float(self.dynamic_widgets[f"R_fix-{i+1}-{t+1}"].text())
-            x_a = [0.0]*n
-            for j in range(n):
-                x_a[j] = float(self.dynamic_widgets[f"x_a-{j+1}"].text()) 
-            R_a = [0.0]*m_A
-            for i in range(m_A):
-                R_a[i] = float(self.dynamic_widgets[f"Ra-{i+1}"].text())
-
-        except ValueError:
-            # show an error message if there is an error
+        # the entries of the tables were converted when they were entered
+        if self.table_models["d"].array.shape != (n, T) or self.table_models["a"].array.shape != (m, n) \
+                or self.table_models["A"].array.shape != (m_A, T):
+            self.show_error_message("The tables do not match the entered sizes. Please generate the input fields.")
+            return
+        if not self.tables_complete():
             self.show_error_message(f"One of the entries is not valid. Please enter a valid number.")
             return  # prevent the execution of the solver if an error occurred
+        d, p, k, h, A, x_a, a, R_a, b, c, R_fix = self.table_values()
         self.params = params
-        # execute the solver and save the results
-        self.results = run_gurobi_solver(n, m, m_A, T, x_a, R_a, R_fix, a, A, b, c, h, k, p, d, q)
-      
-        # update the performance label
+        # first q samples of the loaded sample cube, as long as they belong to the entered availabilities
+        A_l = None
+        if self.sample_path is not None:
+            instance = MPSInstance.load(self.sample_path, samples=slice(q))
+            if instance.q == q and np.array_equal(instance.A, A):
+                A_l = instance.A_l
+        # the solver modules (Gurobi, SciPy, pandas) are only loaded for the first run, so that the window opens quickly
+        # solved by the solve service if SOLVE_SERVICE_URL is set, otherwise locally (recorded in the run registry)
+        from solve_client import solver_for
+        run_gurobi_solver, options = solver_for("mps_stochastic")
+        # execute the solver in the background; the results are shown as soon as they are available
+        self.results = {}
+        self.results_label.setText("")
+        self.worker = SolverWorker(run_gurobi_solver, n, m, m_A, T, x_a, R_a, R_fix, a, A, b, c, h, k, p, d, q, A_l=A_l,
+                                   **options)
+        self.worker.progress.connect(self.show_progress)
+        self.worker.results.connect(self.show_results)
+        self.worker.finished.connect(self.show_results)
+        self.worker.finished.connect(lambda: self.solver_stopped("Finished"))
+        self.worker.failed.connect(self.solver_failed)
+        self.worker.cancelled.connect(lambda: self.solver_stopped("Cancelled"))
+        self.set_running(True)
+        self.worker.start()
+
+    def set_running(self, running):
+        self.run_button.setEnabled(not running)
+        self.load_button.setEnabled(not running)
+        self.cancel_button.setEnabled(running)
+
+    def show_progress(self, phase, done, total):
+        # a phase without steps shows a busy indicator
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+        self.status_label.setText(progress_text(phase, done, total))
+
+    def show_results(self, results):
+        self.results = results
         self.update_performance_label()
 
+    def solver_stopped(self, status):
+        self.set_running(False)
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(1 if status == "Finished" else 0)
+        self.status_label.setText(status)
+
+    def solver_failed(self, message):
+        self.solver_stopped("Failed")
+        self.show_error_message(f"The solver stopped with an error: {message}")
+
+    def cancel_solver(self):
+        if self.worker is not None and self.worker.is_running():
+            self.worker.cancel()
+            self.status_label.setText("Cancelling ...")
+
+    def closeEvent(self, event):
+        # stop a running solver before the window is closed
+        if self.worker is not None and self.worker.is_running():
+            self.worker.cancel()
+            self.worker.wait()
+        super().closeEvent(event)
+
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
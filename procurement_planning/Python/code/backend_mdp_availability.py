@@ -1,10 +1,15 @@
-import gurobipy as gp
-from gurobipy import GRB
 import math
+import os
+import sys
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from scipy.special import erf
-from main_mdp_availability import pY
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, os.pardir, "common",
+                             "Python"))
+from lp_backend import SparseLP
+from run_control import RunControl
+from timing import TimerRegistry
 
 
 # cumulative density function of standard normal distribution
@@ -30,6 +35,11 @@ def binomial_p(d, d_max, par_pD):
     return math.comb(d_max, d) * (par_pD ** d) * ((1 - par_pD) ** (d_max - d))
 
 
+# probability of availability level y (binomial or discretized normal distribution)
+def availability_p(y, y_max, par_pY, mu_y, sigma_y):
+    return binomial_p(y, y_max, par_pY) if par_pY > 0.0 else normal_p(y, mu_y, sigma_y, y_max)
+
+
 def reward(val_x, a, pi, h, k, v, availabilities, y_max, par_pY, mu_y, sigma_y):
     # compute reward for state s and action a
     if par_pY > 0.0:
@@ -64,8 +74,14 @@ def transition_prob(val_x, a, val_x_prime, availabilities, demands, x_max, y_max
                 for d in demands if val_x_prime == min(max(val_x, 0) + min(a, y) - d, x_max))
 
 
-def run_gurobi_solver(params):
+def run_gurobi_solver(params, solver_params=None, env=None, solver="gurobi", timers=None, control=None,
+                      registry=None):
     # Gurobi-Modell erstellen
+    if timers is None:
+        timers = TimerRegistry("InventoryOptimization")
+    # progress and cancellation of the run (e.g. by the frontend)
+    if control is None:
+        control = RunControl()
     d_max = int(params["d_max"])
     x_max = int(params["x_max"])
     y_max = int(params["y_max"])
@@ -84,10 +100,16 @@ def run_gurobi_solver(params):
     demands = range(d_max + 1)               # Demand levels
     availabilities = range(y_max + 1)        # Availability levels
 
-    model = gp.Model("InventoryOptimization")
-    model.setParam(GRB.Param.OptimalityTol, 1.0e-9)
-    model.setParam(GRB.Param.FeasibilityTol, 1.0e-9)
-    sigma = model.addVars(states, actions, vtype=GRB.CONTINUOUS, name="sigma(x,q)")
+    # sparse linear program solved by Gurobi, built in the given environment (e.g. from a pool of environments) or
+    # the default one, or with solver="highs" by HiGHS, which needs no Gurobi license
+    model = SparseLP("InventoryOptimization", solver=solver, env=env)
+    model.setParam("OptimalityTol", 1.0e-9)
+    model.setParam("FeasibilityTol", 1.0e-9)
+    # user-defined solver parameters (e.g. Threads, Method) override the defaults
+    for param_name, value in (solver_params or {}).items():
+        model.setParam(param_name, value)
+    # column indices of the variables sigma(x,q)
+    sigma = dict(zip(((x, q) for x in states for q in actions), model.add_vars(len(states) * len(actions))))
 
     # define feasible actions
     A = {}
@@ -95,22 +117,40 @@ def run_gurobi_solver(params):
         # determine all actions q satisfying condition q ≤ x_max - s + d_max
         valid_actions = [q for q in actions if q <= x_max - x + d_max]
         A[x] = valid_actions
+    pairs = [(x, q) for x in states for q in A[x]]
+    columns = np.array([sigma[x, q] for x, q in pairs])
     # objective: maximize expected reward
-    model.setObjective(gp.quicksum(reward(x, q, pi, h, k, v, availabilities, y_max, par_pY, mu_y, sigma_y)*sigma[x, q]
-                                   for q in A[x] for x in states), GRB.MAXIMIZE)
+    control.progress("rewards")
+    with timers.phase("rewards"):
+        model.set_objective(model.linear(columns, [reward(x, q, pi, h, k, v, availabilities, y_max, par_pY, mu_y,
+                                                          sigma_y) for x, q in pairs]))
     # constraints
-    model.addConstr(gp.quicksum(
-            sigma[x, q] for q in A[x] for x in states) == 1.0, name="probs_sum_to_one")
-
-    for x_prime in states:
-        # Bellman constraint
-        model.addConstr(gp.quicksum(sigma[x_prime, q] for q in A[x_prime]) == gp.quicksum(
-                transition_prob(x, q, x_prime, availabilities, demands, x_max, y_max, par_pY, d_max, par_pD, mu_d,
-                                sigma_d, mu_y, sigma_y)*sigma[x, q]
-                for q in A[x] for x in states), name="functional_equation")
+    model.add_constrs(columns[None, :], 1.0, "=", 1.0)  # probabilities sum to one
+
+    # Bellman constraints: sum_q sigma(x',q) - sum_(x,q) P(x'|x,q) sigma(x,q) = 0 for each state x'; only the
+    # non-zero coefficients are collected (coordinate format), so no dense states x pairs matrix is built
+    with timers.phase("transition_probabilities"):
+        rows, pair_indices, values = [], [], []
+        for row, x_prime in enumerate(states):
+            for index, (x, q) in enumerate(pairs):
+                value = (x == x_prime) - transition_prob(x, q, x_prime, availabilities, demands, x_max, y_max, par_pY,
+                                                         d_max, par_pD, mu_d, sigma_d, mu_y, sigma_y)
+                if value != 0.0:
+                    rows.append(row)
+                    pair_indices.append(index)
+                    values.append(value)
+            control.progress("transition_probabilities", row + 1, len(states))
+        coefficients = sparse.coo_matrix((values, (rows, pair_indices)), shape=(len(states), len(pairs)))
+    model.add_matrix_constrs(columns, coefficients, "=", 0.0)
 
     # solve the model
-    model.optimize()
+    control.progress("optimize")
+    with timers.phase("optimize"):
+        model.optimize(control.gurobi_callback)
+    timers.record_solve(model)
+    control.check()
+    # values of the variables sigma(x,q)
+    sigma_x = dict(zip(sigma, model.getAttr("X", list(sigma.values()))))
 
     # process the results
     results = {
@@ -119,30 +159,36 @@ def run_gurobi_solver(params):
         "Probability": []
     }
     performance_results = {}
-    # save the results
+    # save the results (states that are never reached keep the order quantity of the previous state, starting with 0)
+    q_best = 0
     for x in states:
         max_sum = 0.0
         for q in A[x]:
-            if sigma[x, q].x > 0.0:
+            if sigma_x[x, q] > 0.0:
                 q_best = q
-                max_sum = sigma[x, q].x
+                max_sum = sigma_x[x, q]
         results["Inventory Level"].append(x)
         results["Order Quantity"].append(q_best)
         results["Probability"].append(round(max_sum, 10))
 
     # get the optimal objective function value (minimal cost per period)
     performance_results["Expected total cost per period"] = round(-model.objVal, 4)
-    performance_results["Expected inventory level"] = round(sum(x*sum(sigma[x, q].x for q in A[x]) for x in states
+    performance_results["Expected inventory level"] = round(sum(x*sum(sigma_x[x, q] for q in A[x]) for x in states
                                                                 if x > 0), 4)
-    max_inv = np.max([x_val for x_val in states if (x_val >= 0 and sum(sigma[x_val, q].x for q in A[x_val]) > 0)])
+    max_inv = np.max([x_val for x_val in states if (x_val >= 0 and sum(sigma_x[x_val, q] for q in A[x_val]) > 0)])
     performance_results["Maximum inventory level"] = round(max_inv, 4)
-    exp_short = sum(-x*sum(sigma[x, q].x for q in A[x]) for x in states if x < 0)
+    exp_short = sum(-x*sum(sigma_x[x, q] for q in A[x]) for x in states if x < 0)
     performance_results["Expected shortage"] = exp_short
-    max_short = max(-x for x in states if (x < 0 and sum(sigma[x, q].x for q in A[x] if sigma[x, q].x > 0)))
+    max_short = max(-x for x in states if (x < 0 and sum(sigma_x[x, q] for q in A[x] if sigma_x[x, q] > 0)))
     performance_results["Maximum shortage"] = max_short
-    exp_ord_quant = sum(q * sigma[x, q].x for x in states for q in A[x])
+    exp_ord_quant = sum(q * sigma_x[x, q] for x in states for q in A[x])
     performance_results["Expected order quantity"] = exp_ord_quant
-    exp_sup_quant = sum(pY(y) * min(a, y) * sigma[s, a].x for s in states for a in actions for y in availabilities)
+    exp_sup_quant = sum(availability_p(y, y_max, par_pY, mu_y, sigma_y) * min(a, y) * sigma_x[s, a]
+                        for s in states for a in actions for y in availabilities)
     performance_results["Expected supply quantity"] = exp_sup_quant
+    if registry is not None:
+        # the parameters are indexed by the registry; the policy is stored with the performance results
+        registry.record("procurement", {**params, "solver": solver}, inputs={"solver_params": solver_params},
+                        results={**performance_results, "Order Quantity": results["Order Quantity"]}, timers=timers)
 
     return pd.DataFrame(results), performance_results
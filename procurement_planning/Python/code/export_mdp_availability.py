@@ -0,0 +1,117 @@
+import datetime
+import glob
+import os
+import time
+import uuid
+import pandas as pd
+
+# performance results -> column of the metrics tables (as in the sheets written by the frontend so far)
+RESULT_COLUMNS = {
+    "Expected total cost per period": "Expected total cost per period",
+    "Expected inventory level": "Expected inventory",
+    "Maximum inventory level": "Maximum inventory",
+    "Expected shortage": "Expected shortage",
+    "Maximum shortage": "Maximum shortage",
+    "Expected order quantity": "Expected order quantity",
+    "Expected supply quantity": "Expected supply quantity",
+}
+# columns identifying a saved run, which are not written to the metrics sheets
+RUN_COLUMNS = ["run", "sheet", "saved"]
+# sheet of the workbook holding the policies of all saved runs
+POLICY_SHEET = "Policies"
+# result store of the frontend (a directory in the working directory) and the workbook the frontend wrote before the
+# store existed, which is imported into an empty store
+STORE_DIRECTORY = "results_MDP_availability"
+LEGACY_WORKBOOK = "results_MDP_availability.xlsx"
+
+
+class ResultStore:
+    # append-only store of saved runs in a directory: each run is written to its own parquet files (a metrics row
+    # and the policy table), so saving a run neither reads nor rewrites the earlier ones and costs the same for the
+    # first and the 500th run. The runs are grouped by sheet name like the sheets of the Excel export
+    def __init__(self, directory=STORE_DIRECTORY):
+        self.directory = directory
+        self.metrics_dir = os.path.join(directory, "metrics")
+        self.policies_dir = os.path.join(directory, "policies")
+
+    def __len__(self):
+        return len(glob.glob(os.path.join(self.metrics_dir, "*.parquet")))
+
+    def append(self, sheet, params, performance_results, policy=None):
+        # run ids start with the time of saving (to the microsecond), so that the files sort chronologically
+        now = datetime.datetime.now()
+        run = f"{now:%Y%m%d-%H%M%S-%f}-{uuid.uuid4().hex[:8]}"
+        saved = f"{now:%Y-%m-%d %H:%M:%S}"
+        row = {"run": run, "sheet": sheet, "saved": saved, **{key: float(value) for key, value in params.items()}}
+        row.update({column: performance_results[key] for key, column in RESULT_COLUMNS.items()})
+        self._write(pd.DataFrame([row]), self.metrics_dir, run)
+        if policy is not None:
+            policy = pd.DataFrame(policy)
+            policy.insert(0, "run", run)
+            policy.insert(1, "sheet", sheet)
+            self._write(policy, self.policies_dir, run)
+        return run
+
+    def import_excel(self, path):
+        # one-time import of a workbook written by the frontend before the store existed (one run per row, without
+        # policies) or exported by write_excel (whose policy sheet is not imported); empty sheets are skipped. The
+        # runs are dated by the modification time of the workbook, so that they come before the runs saved afterwards
+        from openpyxl import load_workbook
+
+        modified = time.localtime(os.path.getmtime(path))
+        workbook = load_workbook(path, read_only=True)
+        for sheet in workbook.worksheets:
+            rows = list(sheet.iter_rows(values_only=True))
+            if sheet.title == POLICY_SHEET or len(rows) < 2 or rows[0][0] is None:
+                continue
+            metrics = pd.DataFrame(rows[1:], columns=rows[0])
+            run = f"{time.strftime('%Y%m%d-%H%M%S', modified)}-{uuid.uuid4().hex[:8]}"
+            metrics.insert(0, "run", [f"{run}-{row}" for row in range(len(metrics))])
+            metrics.insert(1, "sheet", sheet.title)
+            metrics.insert(2, "saved", time.strftime("%Y-%m-%d %H:%M:%S", modified))
+            self._write(metrics, self.metrics_dir, run)
+        workbook.close()
+
+    def metrics(self):
+        return self._read(self.metrics_dir)
+
+    def policies(self):
+        return self._read(self.policies_dir)
+
+    @staticmethod
+    def _write(df, directory, run):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        df.to_parquet(os.path.join(directory, f"{run}.parquet"), index=False)
+
+    @staticmethod
+    def _read(directory):
+        # all runs in the order of saving (None if there are none)
+        paths = sorted(glob.glob(os.path.join(directory, "*.parquet")))
+        if not paths:
+            return None
+        return pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+
+
+def write_excel(path, metrics, policies=None):
+    # write the whole workbook in one pass with a write-only (streaming) openpyxl workbook: one sheet of metrics per
+    # sheet name, in the order in which the sheets were first used, and the policies of all runs in POLICY_SHEET.
+    # Nothing is read from an existing file, which is replaced
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+    tables = [(sheet, rows.drop(columns=RUN_COLUMNS)) for sheet, rows in metrics.groupby("sheet", sort=False)]
+    if policies is not None:
+        tables.append((POLICY_SHEET, policies))
+    for sheet_name, table in tables:
+        sheet = workbook.create_sheet(sheet_name)
+        # column widths (set before the rows are streamed): longest entry plus padding
+        for col_idx, column in enumerate(table.columns, start=1):
+            max_length = max([len(str(column))] + [len(str(value)) for value in table[column]])
+            sheet.column_dimensions[get_column_letter(col_idx)].width = max_length + 2
+        sheet.append(list(table.columns))
+        for row in table.itertuples(index=False):
+            sheet.append([None if pd.isna(value) else value for value in row])
+    workbook.save(path)
+    return path
@@ -1,18 +1,18 @@
+import os
 import sys
-import openpyxl
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QWidget, QPushButton,
     QTableWidget, QTableWidgetItem, QLabel, QLineEdit, QHBoxLayout,
-    QInputDialog, QDesktopWidget, QShortcut,
-    QSizePolicy, QMessageBox
+    QInputDialog, QDesktopWidget, QShortcut, QFileDialog,
+    QSizePolicy, QMessageBox, QProgressBar
 )
-from PyQt5.QtWebEngineWidgets import QWebEngineView
 from PyQt5.QtGui import QFont, QPixmap, QKeySequence
-import plotly.graph_objects as go
-from openpyxl.utils import get_column_letter
-from backend_mdp_availability import run_gurobi_solver
+import pyqtgraph as pg
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, os.pardir, "common",
+                             "Python"))
+from timing import TimerRegistry
+from solver_worker import SolverWorker, progress_text
 from PyQt5.QtCore import Qt
-import os
 
 
 class MainWindow(QMainWindow):
@@ -79,19 +79,45 @@ class MainWindow(QMainWindow):
         self.run_button.clicked.connect(self.run_solver)
         self.run_button.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
 
-        # add Save Result button to the right
-        self.save_button = QPushButton("Save results to Excel file")
+        # add Save Result button (appends the run to the result store) to the right
+        self.save_button = QPushButton("Save results")
         self.save_button.setFont(QFont("Arial", 10, QFont.Bold))
         self.save_button.setStyleSheet("background-color: yellow;")
-        self.save_button.clicked.connect(self.save_to_excel)
+        self.save_button.clicked.connect(self.save_to_store)
         self.save_button.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
         
+        # add Cancel button (enabled while the solver runs) between them
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setFont(QFont("Arial", 10, QFont.Bold))
+        self.cancel_button.setStyleSheet("background-color: lightgray;")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_solver)
+        self.cancel_button.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+        # add Export button (writes the Excel workbook of all saved runs) to the right
+        self.export_button = QPushButton("Export results to Excel file")
+        self.export_button.setFont(QFont("Arial", 10, QFont.Bold))
+        self.export_button.setStyleSheet("background-color: khaki;")
+        self.export_button.clicked.connect(self.export_to_excel)
+        self.export_button.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
         button_layout.addWidget(self.run_button)
+        button_layout.addWidget(self.cancel_button)
         button_layout.addWidget(self.save_button)
+        button_layout.addWidget(self.export_button)
 
         # add this layout to the main layout
         layout.addLayout(button_layout)
 
+        # progress of the solver run
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1)
+        progress_layout.addWidget(self.progress_bar)
+        self.status_label = QLabel("")
+        progress_layout.addWidget(self.status_label)
+        layout.addLayout(progress_layout)
+
         # results table
         self.order_table = QTableWidget()
         self.order_table.setColumnCount(3)
@@ -111,10 +137,28 @@ class MainWindow(QMainWindow):
         self.performance_results_label.setFont(QFont("Arial", 12))
         layout.addWidget(self.performance_results_label)
 
-        # display plot in QWebEngineView
-        self.web_view = QWebEngineView()
-        self.web_view.setHtml("<h1></h1>")
-        layout.addWidget(self.web_view)
+        # plot of the policy (order quantities, left axis) and the probabilities (right axis), drawn natively; the
+        # curves are created once and only their data is replaced by a new run
+        self.plot_widget = pg.PlotWidget(title="Policy and probabilities")
+        plot_item = self.plot_widget.getPlotItem()
+        plot_item.setLabel("bottom", "Inventory Level")
+        plot_item.setLabel("left", "Order Quantity")
+        plot_item.setLabel("right", "Probability")
+        plot_item.showGrid(x=True, y=True, alpha=0.3)
+        legend = plot_item.addLegend(offset=(-10, 10))
+        self.order_curve = plot_item.plot([], [], name="Order Quantity", pen=pg.mkPen("g", width=2), symbol="o",
+                                          symbolSize=6, symbolBrush="g")
+        # view box of the secondary y-axis, kept on top of the main view box with the same x-range
+        self.probability_view = pg.ViewBox()
+        plot_item.scene().addItem(self.probability_view)
+        plot_item.getAxis("right").linkToView(self.probability_view)
+        self.probability_view.setXLink(plot_item)
+        plot_item.vb.sigResized.connect(self.update_probability_view)
+        self.probability_curve = pg.PlotDataItem([], [], pen=pg.mkPen((80, 140, 255), width=2), symbol="o",
+                                                 symbolSize=6, symbolBrush=(80, 140, 255))
+        self.probability_view.addItem(self.probability_curve)
+        legend.addItem(self.probability_curve, "Probability")
+        layout.addWidget(self.plot_widget)
         
         # central widget
         container = QWidget()
@@ -127,6 +171,9 @@ class MainWindow(QMainWindow):
 
         self.results = None
         self.performance_results = None
+        # solver running in the background and the timings of its run
+        self.worker = None
+        self.timers = None
 
     def validate_distribution_params(self, params):
         # check for conflicting distributions (binomial vs normal) for D
@@ -187,8 +234,57 @@ class MainWindow(QMainWindow):
             return  # stop the execution if the validation fails
         
         self.params = params
-        # execute the solver and save the results
-        self.results, self.performance_results = run_gurobi_solver(params)
+        # the solver modules (Gurobi, SciPy, pandas) are only loaded for the first run, so that the window opens quickly
+        # solved by the solve service if SOLVE_SERVICE_URL is set, otherwise locally (recorded in the run registry)
+        from solve_client import solver_for
+        run_gurobi_solver, options = solver_for("procurement")
+        # execute the solver in the background; the timings of the run are recorded with the run
+        self.timers = TimerRegistry("InventoryOptimization")
+        self.worker = SolverWorker(run_gurobi_solver, params, timers=self.timers, **options)
+        self.worker.progress.connect(self.show_progress)
+        self.worker.finished.connect(self.show_results)
+        self.worker.failed.connect(self.solver_failed)
+        self.worker.cancelled.connect(lambda: self.solver_stopped("Cancelled"))
+        self.set_running(True)
+        self.worker.start()
+
+    def set_running(self, running):
+        self.run_button.setEnabled(not running)
+        self.save_button.setEnabled(not running)
+        self.export_button.setEnabled(not running)
+        self.cancel_button.setEnabled(running)
+
+    def show_progress(self, phase, done, total):
+        # a phase without steps shows a busy indicator
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+        self.status_label.setText(progress_text(phase, done, total))
+
+    def solver_stopped(self, status):
+        self.set_running(False)
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(1 if status == "Finished" else 0)
+        self.status_label.setText(status)
+
+    def solver_failed(self, message):
+        self.solver_stopped("Failed")
+        self.show_error_message(f"The solver stopped with an error: {message}")
+
+    def cancel_solver(self):
+        if self.worker is not None and self.worker.is_running():
+            self.worker.cancel()
+            self.status_label.setText("Cancelling ...")
+
+    def closeEvent(self, event):
+        # stop a running solver before the window is closed
+        if self.worker is not None and self.worker.is_running():
+            self.worker.cancel()
+            self.worker.wait()
+        super().closeEvent(event)
+
+    def show_results(self, outcome):
+        self.results, self.performance_results = outcome
+        self.solver_stopped("Finished")
 
         # update the table
         self.update_table(self.results)
@@ -225,121 +321,63 @@ class MainWindow(QMainWindow):
         result_text += "</table>"
         self.performance_results_label.setText(result_text)
 
+    def update_probability_view(self):
+        plot_item = self.plot_widget.getPlotItem()
+        self.probability_view.setGeometry(plot_item.vb.sceneBoundingRect())
+        self.probability_view.linkedViewChanged(plot_item.vb, self.probability_view.XAxis)
+
     def plot_results(self, df):
-        fig = go.Figure()
-
-        # probability vs inventory level (on secondary y-axis)
-        fig.add_trace(go.Scatter(
-            x=df["Inventory Level"],
-            y=df["Probability"],
-            mode='lines+markers',
-            name='Probability',
-            line=dict(color='blue'),
-            marker=dict(size=6),
-            yaxis='y2'  # use secondary y-axis
-        ))
-
-        # order quantity vs inventory level
-        fig.add_trace(go.Scatter(
-            x=df["Inventory Level"],
-            y=df["Order Quantity"],
-            mode='lines+markers',
-            name='Order Quantity',
-            line=dict(color='green'),
-            marker=dict(size=6)
-        ))
-
-        # update layout with secondary y-axis
-        fig.update_layout(
-            title="Policy and probabilities",
-            xaxis_title="Inventory Level",
-            yaxis=dict(title="Order Quantity"),
-            yaxis2=dict(
-                title="Probability",
-                overlaying='y',  # overlay y-axis 2 on y-axis 1
-                side='right',    # place on the right
-                showgrid=False
-            ),
-            template="plotly_dark",
-            legend=dict(
-                orientation="h",  # horizontal legend
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            )
-        )
-
-        # set the HTML into the WebEngineView
-        html = fig.to_html(include_plotlyjs="cdn")
-        self.web_view.setHtml(html)
-
-    def save_to_excel(self):
-        if not (os.path.isfile("results_MDP_availability.xlsx")):
-            workbook = openpyxl.Workbook()
-            workbook.save(filename="results_MDP_availability.xlsx")
-
-        # get the name of the sheet
+        # order quantity and probability vs inventory level
+        inventory_levels = df["Inventory Level"].to_numpy(dtype=float)
+        self.order_curve.setData(inventory_levels, df["Order Quantity"].to_numpy(dtype=float))
+        self.probability_curve.setData(inventory_levels, df["Probability"].to_numpy(dtype=float))
+        self.plot_widget.getPlotItem().enableAutoRange()
+        self.probability_view.enableAutoRange()
+
+    def ask_sheet_name(self):
+        # name of the sheet the run is saved to (None if no results are available or the dialog was cancelled)
+        if self.performance_results is None:
+            self.show_error_message("There are no results to save. Please run the solver first.")
+            return None
         sheet_name, ok = QInputDialog.getText(self, "Sheet-name", "Enter a sheet-name:")
-
-        if ok and sheet_name:
-            self.save_performance_results_in_excel("results_MDP_availability.xlsx", sheet_name)
-    
-    def save_performance_results_in_excel(self, filename, sheet_name):
-      
-        try:
-            workbook = openpyxl.load_workbook(filename)
-        except FileNotFoundError:
-            workbook = openpyxl.Workbook()
-
-        # create or choose a sheet
-        if sheet_name in workbook.sheetnames:
-            sheet = workbook[sheet_name]
-        else:
-            sheet = workbook.create_sheet(sheet_name)
-
-        # create a complete list of the headers: parameters and result fields
-        headers = list(self.params.keys()) + ["Expected total cost per period", "Expected inventory",
-                                              "Maximum inventory", "Expected shortage", "Maximum shortage",
-                                              "Expected order quantity", "Expected supply quantity"]
-
-        # write the header to first row if the sheet is empty
-        if sheet.max_row == 1 and sheet.max_column == 1 and sheet.cell(1, 1).value is None:
-            for col, header in enumerate(headers, start=1):
-                sheet.cell(row=1, column=col, value=header)
-
-        # write the data
-        start_row = sheet.max_row + 1
-    
-        # values of the parameters
-        row = list(self.params.values())
-        # values of the results
-        row.extend([
-            self.performance_results["Expected total cost per period"],
-            self.performance_results["Expected inventory level"], 
-            self.performance_results["Maximum inventory level"],
-            self.performance_results["Expected shortage"], 
-            self.performance_results["Maximum shortage"],
-            self.performance_results["Expected order quantity"],
-            self.performance_results["Expected supply quantity"]
-        ])
-        # write the row
-        for col, value in enumerate(row, start=1):
-            sheet.cell(row=start_row, column=col, value=value)
-
-        # adjust the column widths
-        for col_idx, col in enumerate(headers, start=1):
-            col_letter = get_column_letter(col_idx)
-            max_length = max(
-                len(str(sheet.cell(row=row, column=col_idx).value)) for row in range(1, sheet.max_row + 1)
-            )
-            adjusted_width = max_length + 2  # Padding
-            sheet.column_dimensions[col_letter].width = adjusted_width
+        if not (ok and sheet_name):
+            return None
+        from export_mdp_availability import POLICY_SHEET
+        if sheet_name == POLICY_SHEET:
+            self.show_error_message(f"The sheet '{POLICY_SHEET}' holds the policies of all runs. "
+                                    "Please enter another sheet-name.")
+            return None
+        return sheet_name
+
+    def save_to_store(self):
+        # the run is appended to the result store (its own files), which costs the same for every saved run; the
+        # Excel workbook is only written by export_to_excel
+        sheet_name = self.ask_sheet_name()
+        if sheet_name:
+            from export_mdp_availability import LEGACY_WORKBOOK, ResultStore
+            store = ResultStore()
+            # a workbook written before the store existed is imported first, so that its rows are kept in the export
+            if len(store) == 0 and os.path.isfile(LEGACY_WORKBOOK):
+                store.import_excel(LEGACY_WORKBOOK)
+            store.append(sheet_name, self.params, self.performance_results, self.results)
+            QMessageBox.information(None, "Success", f"The results have been saved to '{store.directory}' "
+                                                     f"({len(store)} runs).")
+
+    def export_to_excel(self):
+        # write all saved runs to an Excel workbook in one pass (metrics per sheet and the policies of all runs)
+        from export_mdp_availability import LEGACY_WORKBOOK, ResultStore, write_excel
+        store = ResultStore()
+        if len(store) == 0:
+            self.show_error_message("There are no saved results to export. Please save a run first.")
+            return
+        filename, _ = QFileDialog.getSaveFileName(self, "Export results", LEGACY_WORKBOOK, "Excel files (*.xlsx)")
+        if not filename:
+            return
 
         # save the Excel file
         try:
             # try to save the workbook
-            workbook.save(filename)
+            write_excel(filename, store.metrics(), store.policies())
             QMessageBox.information(None, "Success", f"The file has been successfully saved as '{filename}'.")
         except PermissionError:
             # handle the case where the file is open or permission is denied
@@ -351,7 +389,6 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(None, "Unexpected Error",
                                  f"An error occurred while saving the file: {e}")
 
-
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     main_window = MainWindow()
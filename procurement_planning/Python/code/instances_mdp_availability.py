@@ -0,0 +1,15 @@
+def generate_params(d_max=10, x_max=20, y_max=15, demand="binomial", availability="binomial"):
+    # parameters of run_gurobi_solver for the given maximum demand, inventory level and availability; the
+    # distributions keep their shape when the sizes are scaled (binomial with p = 0.5 or discretized normal with mean
+    # 0.5 and standard deviation 0.2 of the maximum); the default values are those of the frontend
+    params = {"d_max": d_max, "x_max": x_max, "y_max": y_max, "pi": 5, "h": 1, "k": 5, "v": 20,
+              "par_pD": 0.0, "par_pY": 0.0, "mu_D": 0, "sigma_D": 0, "mu_Y": 0, "sigma_Y": 0}
+    if demand == "binomial":
+        params["par_pD"] = 0.5
+    else:
+        params["mu_D"], params["sigma_D"] = 0.5 * d_max, 0.2 * d_max
+    if availability == "binomial":
+        params["par_pY"] = 0.5
+    else:
+        params["mu_Y"], params["sigma_Y"] = 0.5 * y_max, 0.2 * y_max
+    return params
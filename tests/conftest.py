@@ -0,0 +1,13 @@
+import os
+import sys
+
+# the code directories are flat script directories (as in the frontends and backends, which extend sys.path
+# themselves)
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+for directory in (("common", "Python"), ("benchmark", "Python"), ("master_production_scheduling", "Python", "common"),
+                  ("master_production_scheduling", "Python", "deterministic", "code"),
+                  ("master_production_scheduling", "Python", "stochastic", "code"),
+                  ("procurement_planning", "Python", "code")):
+    path = os.path.join(ROOT, *directory)
+    if path not in sys.path:
+        sys.path.append(path)
@@ -0,0 +1,93 @@
+import os
+import numpy as np
+import pytest
+from backend_det import run_gurobi_solver as run_deterministic
+from backend_sto import run_gurobi_solver as run_stochastic
+from evaluation_mps import draw_availabilities
+from instances_mps import MPSInstance, generate_instance
+from models_det import ProductionDetPlanModel
+from models_mps import ProductionPlanModel
+from models_sto import ProductionStoPlanModel
+from sampling_mps import draw_sample_pool, draw_samples
+
+
+def instance_args():
+    instance = MPSInstance.from_dict(generate_instance(T=4, n=3, m=3, m_A=1, q=4, seed=5))
+    return {key: getattr(instance, key) for key in ("n", "m", "m_A", "T", "x_a", "R_a", "R_fix", "a", "A", "b", "c",
+                                                    "h", "k", "p", "d")}
+
+
+@pytest.mark.parametrize("run, extra", [(run_deterministic, {}), (run_stochastic, {"q": 4})])
+def test_exports_and_timings_only_on_request(tmp_path, run, extra):
+    args = {**instance_args(), **extra, "solver": "highs", "num_sim": 2}
+    assert run(**args, results_dir=str(tmp_path / "default"))
+    assert sorted(os.listdir(tmp_path / "default")) == ["results_model.txt", "results_model_na.txt"]
+    pytest.importorskip("pyarrow")
+    assert run(**args, results_dir=str(tmp_path / "requested"), export_format="parquet", timings_file="run.json")
+    assert sorted(os.listdir(tmp_path / "requested")) == [
+        "results_model.txt", "results_model_na.txt", "results_model_na_products.parquet",
+        "results_model_na_secondary.parquet", "results_model_products.parquet", "results_model_secondary.parquet",
+        "run.json"]
+
+
+@pytest.mark.parametrize("distribution, exact", [(None, True), ({"type": "correlated", "rho": 0.3}, False)])
+def test_predictive_schedules_evaluated_exactly_if_periods_independent(tmp_path, monkeypatch, distribution, exact):
+    simulated = []
+    schedule_replications = ProductionPlanModel.schedule_replications
+
+    def recording_schedule_replications(self, realized_A, **kwargs):
+        simulated.append(len(realized_A))
+        return schedule_replications(self, realized_A, **kwargs)
+
+    monkeypatch.setattr(ProductionPlanModel, "schedule_replications", recording_schedule_replications)
+    results = run_deterministic(**instance_args(), solver="highs", num_sim=3, distribution=distribution,
+                                results_dir=str(tmp_path))
+    label = "predictive schedule without non-anticipativity"
+    assert (f"Expected contribution margin of {label} (exact evaluation)" in results) == exact
+    assert (f"Average realized contribution margin of {label}" in results) != exact
+    # only the rolling schedules are simulated, if the predictive schedules are evaluated exactly
+    assert simulated == ([] if exact else [3, 3])
+    rolling = "rolling schedule without non-anticipativity"
+    difference = results[f"Paired difference of {rolling} to {label}"]
+    if exact:
+        expected_CM = results[f"Expected contribution margin of {label} (exact evaluation)"]
+        assert difference == pytest.approx(results[f"Average realized contribution margin of {rolling}"] - expected_CM)
+    assert results[f"Confidence interval half-width (95%) of paired difference of {rolling}"] >= 0
+
+
+def planned_CM(instance, A_plan):
+    model = ProductionDetPlanModel.from_instance(instance, solver="highs", A_plan=A_plan)
+    model.build_model()
+    assert model.optimize()
+    return model.model.objVal
+
+
+def test_expected_value_model_plans_with_mean_of_distribution(tmp_path):
+    instance = MPSInstance(**instance_args())
+    results = run_deterministic(**instance_args(), solver="highs", num_sim=2,
+                                distribution={"type": "binomial", "p": 0.3}, results_dir=str(tmp_path))
+    predicted = results["Contribution margin predicted by expected value model without non-anticipativity"]
+    assert predicted == pytest.approx(planned_CM(instance, 0.6 * instance.A))
+    assert predicted != pytest.approx(planned_CM(instance, instance.A))
+    # the stage models of the rolling schedules plan with the expected availabilities of their periods
+    model = ProductionDetPlanModel.from_instance(instance, solver="highs", A_plan=0.6 * instance.A)
+    tail = model.tail_model(1, instance.x_a, instance.R_a)
+    np.testing.assert_allclose(tail.A_l[:, :, 0], 0.6 * instance.A[:, 1:])
+
+
+def test_resampled_rolling_schedules_use_the_sample_pool(tmp_path):
+    args = instance_args()
+    instance = MPSInstance(**args).with_samples(draw_samples(args["A"], 4))
+    results = run_stochastic(**args, q=4, A_l=instance.A_l, resample=True, solver="highs", num_sim=3,
+                             results_dir=str(tmp_path))
+    # the stages re-draw their samples from the pool of one block per period drawn by the backend
+    model = ProductionStoPlanModel.from_instance(instance, solver="highs")
+    model.build_model()
+    assert model.optimize()
+    real_CMs = model.resampled_rolling_schedule_replications(draw_availabilities(instance.A, 3), 0.0,
+                                                             draw_sample_pool(instance.A, 4, num_blocks=instance.T))
+    label = "rolling sampling approximation without non-anticipativity"
+    assert results[f"Average realized contribution margin of {label}"] == pytest.approx(real_CMs.mean())
+    assert results[f"Average realized contribution margin of {label}"] != pytest.approx(
+        run_stochastic(**args, q=4, A_l=instance.A_l, solver="highs", num_sim=3,
+                       results_dir=str(tmp_path))[f"Average realized contribution margin of {label}"])
@@ -0,0 +1,76 @@
+import argparse
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+from batch_mps import load_instance, main, parse_solver_params, run_batch
+from conftest import ROOT
+from instances_mps import MPSInstance, generate_instance
+from sampling_mps import draw_samples
+
+
+def test_parse_solver_params():
+    assert parse_solver_params(["Threads=2", "TimeLimit=1.5", "LogFile=x.log"]) == \
+        {"Threads": 2, "TimeLimit": 1.5, "LogFile": "x.log"}
+    with pytest.raises(argparse.ArgumentTypeError, match="Name=Value"):
+        parse_solver_params(["Threads"])
+
+
+def test_highs_batch_keeps_results_of_files_with_the_same_stem(tmp_path):
+    instance = MPSInstance.from_dict(generate_instance(T=4, n=3, m=3, m_A=1, q=4, seed=5))
+    instance.save(str(tmp_path / "instances" / "x.json"))
+    instance.with_samples(draw_samples(instance.A, 4)).save(str(tmp_path / "instances" / "x.npz"))
+    # only the first q stored samples are used
+    np.testing.assert_array_equal(load_instance(str(tmp_path / "instances" / "x.npz"), "stochastic", q=2)["A_l"],
+                                  draw_samples(instance.A, 4)[:, :, :2])
+    output_dir = tmp_path / "results"
+    summary = run_batch(str(tmp_path / "instances"), "deterministic", str(output_dir), solver="highs",
+                        solver_params={"OutputFlag": 0}, evaluation={"num_sim": 2}, timings=True)
+    assert list(summary["instance"]) == ["x.json", "x.npz"]
+    assert list(summary["status"]) == ["optimal", "optimal"]
+    # both instances are the same expected value model
+    column = "Contribution margin predicted by expected value model without non-anticipativity"
+    assert summary[column].iloc[0] == pytest.approx(summary[column].iloc[1])
+    for name in ("x.json", "x.npz"):
+        assert (output_dir / name / "results_model.txt").is_file()
+        assert (output_dir / name / "timings.json").is_file()
+    assert (output_dir / "summary.csv").is_file()
+
+
+def test_highs_batch_without_gurobipy(tmp_path):
+    # the license-free path must not import gurobipy (import of gurobipy blocked in a fresh interpreter)
+    MPSInstance.from_dict(generate_instance(T=4, n=3, m=3, m_A=1, q=4, seed=5)).save(str(tmp_path / "x.json"))
+    script = (
+        "import sys; sys.modules['gurobipy'] = None; sys.path[:0] = sys.argv[1:4]\n"
+        "from batch_mps import run_batch\n"
+        "summary = run_batch(sys.argv[4], 'stochastic', sys.argv[5], solver='highs', q=4,\n"
+        "                    solver_params={'OutputFlag': 0}, evaluation={'num_sim': 2})\n"
+        "assert list(summary['status']) == ['optimal'], summary.to_dict()\n"
+        "assert 'gurobipy' not in sys.modules or sys.modules['gurobipy'] is None\n"
+    )
+    directories = [os.path.join(ROOT, *directory) for directory in (
+        ("common", "Python"), ("master_production_scheduling", "Python", "common"),
+        ("master_production_scheduling", "Python", "stochastic", "code"))]
+    completed = subprocess.run([sys.executable, "-c", script, *directories, str(tmp_path), str(tmp_path / "results")],
+                               capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
+
+
+def test_resampled_batch_of_the_stochastic_model(tmp_path, monkeypatch):
+    MPSInstance.from_dict(generate_instance(T=4, n=3, m=3, m_A=1, q=4, seed=5)).save(str(tmp_path / "x.json"))
+    summary = run_batch(str(tmp_path), "stochastic", str(tmp_path / "results"), solver="highs",
+                        solver_params={"OutputFlag": 0}, evaluation={"num_sim": 2, "resample": True})
+    assert list(summary["status"]) == ["optimal"]
+    # the expected value model has no samples to re-draw
+    monkeypatch.setattr(sys, "argv", ["batch_mps.py", str(tmp_path), "--model", "deterministic", "--resample"])
+    with pytest.raises(SystemExit):
+        main()
+
+
+def test_status_of_the_predictive_solve(tmp_path):
+    MPSInstance.from_dict(generate_instance(T=4, n=3, m=3, m_A=1, q=4, seed=5)).save(str(tmp_path / "x.json"))
+    summary = run_batch(str(tmp_path), "deterministic", str(tmp_path / "results"), solver="highs",
+                        solver_params={"OutputFlag": 0, "IterationLimit": 0}, evaluation={"num_sim": 2})
+    # a solve stopped by a limit is not reported as infeasible
+    assert list(summary["status"]) == ["iteration_limit"]
@@ -0,0 +1,28 @@
+from run_benchmarks import find_regressions
+
+
+def entry(wall_times, case="mps T=6", host="node"):
+    return {"case": case, "host": host,
+            "phases": {phase: {"calls": 1, "wall [s]": wall, "cpu [s]": wall} for phase, wall in wall_times.items()}}
+
+
+def test_phase_slower_than_the_median_of_the_window_regresses():
+    # the first run is outside the window of the last three runs, whose median of the solve times is 1.0
+    history = [entry({"optimize": 0.1}), entry({"optimize": 1.0}), entry({"optimize": 0.9}),
+               entry({"optimize": 1.1})]
+    regressions = find_regressions(entry({"optimize": 1.5}), history, window=3)
+    assert regressions == [("optimize", 1.0, 1.5)]
+
+
+def test_small_or_absolute_slowdowns_do_not_regress():
+    history = [entry({"optimize": 1.0, "build_model": 0.002})] * 3
+    # 20% slower (below the threshold 1.25) and 3 ms slower (below min_seconds) than the baseline
+    assert find_regressions(entry({"optimize": 1.2, "build_model": 0.005}), history) == []
+
+
+def test_phase_without_baseline_is_skipped():
+    # runs of other cases, other hosts or without the phase are no baseline
+    history = [entry({"optimize": 0.1}, case="procurement"), entry({"optimize": 0.1}, host="other"),
+               entry({"build_model": 0.1})]
+    assert find_regressions(entry({"optimize": 5.0, "build_model": 0.1}), history) == []
+    assert find_regressions(entry({"optimize": 5.0}), []) == []
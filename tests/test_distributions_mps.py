@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from scipy import stats
+from distributions_mps import (availability_pmfs, distribution_spec, expected_availabilities, sample_availabilities,
+                               uniforms)
+from instances_mps import MPSInstance, generate_instance
+from sampling_mps import draw_samples
+
+A = [[3, 5, 2], [4, 0, 6]]
+HISTORY = [[[2, 5, 1], [4, 0, 7]], [[3, 5, 3], [6, 0, 5]], [[2, 6, 1], [1, 0, 6]]]
+
+
+def instance():
+    # instance with the expected availabilities A
+    data = generate_instance(T=3, n=2, m=3, m_A=2, q=1, seed=7)
+    return MPSInstance(**{key: value for key, value in data.items() if key not in ("q", "I_minus_I_A", "A")}, A=A)
+
+
+@pytest.mark.parametrize("distribution, message", [
+    ("poisson", "Unknown availability distribution"),
+    ({"type": "normal", "sigma": 1.0}, "Unknown parameters"),
+    ({"type": "binomial", "p": 1.5}, "success probability"),
+    ({"type": "normal", "cv": 0.0}, "coefficient of variation"),
+    ({"type": "empirical"}, "needs a history"),
+    ({"type": "empirical", "history": [[[2.5, 5, 1], [4, 0, 7]]]}, "non-negative integral"),
+    ({"type": "empirical", "history": [[[2, 5, 1], [-4, 0, 7]]]}, "non-negative integral"),
+    ({"type": "correlated", "marginal": "correlated"}, "must not be correlated"),
+    ({"type": "correlated", "rho": 1.0}, "correlation rho"),
+])
+def test_invalid_distributions(distribution, message):
+    with pytest.raises(ValueError, match=message):
+        distribution_spec(distribution)
+
+
+@pytest.mark.parametrize("distribution", ["uniform", "binomial", "normal",
+                                          {"type": "empirical", "history": HISTORY},
+                                          {"type": "correlated", "marginal": "binomial", "rho": 0.8}])
+def test_sampled_marginals_match_pmfs(distribution):
+    size = 20000
+    realized_A = sample_availabilities(A, size, distribution, seed=3)
+    for i, pmfs_i in enumerate(availability_pmfs(A, distribution)):
+        for t, (values, probabilities) in enumerate(pmfs_i):
+            assert probabilities.sum() == pytest.approx(1.0)
+            frequencies = np.array([np.mean(realized_A[:, i, t] == value) for value in values])
+            assert frequencies.sum() == pytest.approx(1.0)
+            np.testing.assert_array_less(np.abs(frequencies - probabilities),
+                                         5 * np.sqrt(probabilities * (1 - probabilities) / size) + 1e-12)
+
+
+def test_uniform_pmfs_are_those_of_the_simulations():
+    for i, pmfs_i in enumerate(availability_pmfs(A)):
+        for t, (values, probabilities) in enumerate(pmfs_i):
+            np.testing.assert_array_equal(values, np.arange(2*A[i][t] + 1))
+            np.testing.assert_allclose(probabilities, 1.0 / (2*A[i][t] + 1))
+
+
+def test_empirical_history_for_all_periods():
+    history = [[2, 4], [3, 6]]
+    pmfs = availability_pmfs(A, {"type": "empirical", "history": history})
+    for t in range(3):
+        np.testing.assert_array_equal(pmfs[1][t][0], [4, 6])
+        np.testing.assert_allclose(pmfs[1][t][1], [0.5, 0.5])
+
+
+def test_expected_availabilities():
+    np.testing.assert_allclose(expected_availabilities(A), A)
+    np.testing.assert_allclose(expected_availabilities(A, {"type": "binomial", "p": 0.3}), 0.6 * np.array(A))
+    np.testing.assert_allclose(expected_availabilities(A, {"type": "empirical", "history": HISTORY}),
+                               np.mean(HISTORY, axis=0))
+    np.testing.assert_allclose(expected_availabilities(A, {"type": "correlated", "marginal": "binomial"}), A)
+
+
+def test_correlated_uniforms_have_ar1_correlation():
+    u = uniforms((50000, 2, 3), {"type": "correlated", "rho": 0.6}, seed=4)
+    z = stats.norm.ppf(u)
+    for i in range(2):
+        correlation = np.corrcoef(z[:, i, :].T)
+        assert correlation[0, 1] == pytest.approx(0.6, abs=0.02)
+        assert correlation[1, 2] == pytest.approx(0.6, abs=0.02)
+        assert correlation[0, 2] == pytest.approx(0.36, abs=0.02)
+    # the secondary materials are independent
+    assert np.corrcoef(z[:, 0, 1], z[:, 1, 1])[0, 1] == pytest.approx(0.0, abs=0.02)
+
+
+@pytest.mark.parametrize("distribution", [{"type": "empirical", "history": HISTORY},
+                                          {"type": "correlated", "marginal": "normal", "rho": 0.5}])
+def test_samples_of_other_distributions_form_an_instance(distribution):
+    A_l = draw_samples(A, 10, seed=5, distribution=distribution)
+    assert A_l.shape == (2, 3, 10)
+    samples = instance().with_samples(A_l)
+    assert samples.q == 10
+    for i, pmfs_i in enumerate(availability_pmfs(A, distribution)):
+        for t, (values, _) in enumerate(pmfs_i):
+            assert set(samples.A_l[i, t]) <= set(values)
+
+
+def test_antithetic_samples():
+    A_l = draw_samples(A, 2000, seed=6, distribution="binomial")
+    # the second half is drawn from 1 - u of the first half, so that each pair is negatively correlated
+    for i in range(2):
+        for t in range(3):
+            if A[i][t] > 0:
+                assert np.corrcoef(A_l[i, t, :1000], A_l[i, t, 1000:])[0, 1] < -0.9
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from evaluation_mps import (RunningStatistics, confidence_half_width, draw_availabilities, paired_differences,
+                            relative_half_width, sequential_replications)
+
+
+def test_draw_availabilities_reproduce_replication_seeds():
+    # the original simulation loops seed replication ctr with ctr + 1 and draw period by period, secondary material
+    # by secondary material
+    A = [[3, 5, 2, 4], [1, 6, 0, 2]]
+    realized_A = draw_availabilities(A, 5)
+    assert realized_A.shape == (5, 2, 4)
+    for ctr in range(5):
+        np.random.seed(ctr + 1)
+        for tau in range(4):
+            for i in range(2):
+                assert realized_A[ctr, i, tau] == np.random.randint(0, 2*A[i][tau] + 1)
+
+
+def test_paired_differences():
+    real_CMs = {"pred": [10.0, 12.0, 11.0, 13.0], "rolling": [11.0, 14.0, 12.0, 16.0, 20.0]}
+    differences = paired_differences(real_CMs, baseline="pred")
+    assert list(differences) == ["rolling"]
+    # paired on the four common replications: differences 1, 2, 1, 3 with mean 1.75 and standard deviation
+    # sqrt(0.9167); t quantile 3.1824 for 3 degrees of freedom
+    mean_difference, half_width = differences["rolling"]
+    assert mean_difference == pytest.approx(1.75)
+    assert half_width == pytest.approx(3.182446 * np.sqrt(11/12) / 2, rel=1e-6)
+
+
+def test_running_statistics_match_batch_statistics():
+    values = np.random.RandomState(1).normal(100.0, 15.0, 50)
+    statistics = RunningStatistics(0.9).update(values)
+    assert statistics.count == 50
+    assert statistics.mean == pytest.approx(values.mean())
+    assert statistics.variance == pytest.approx(values.var(ddof=1))
+    assert statistics.half_width == pytest.approx(confidence_half_width(values, 0.9))
+    assert statistics.relative_half_width == pytest.approx(relative_half_width(values, 0.9))
+
+
+def test_half_width_of_fewer_than_two_values():
+    assert confidence_half_width([1.0]) == np.inf
+    assert RunningStatistics().add(1.0).half_width == np.inf
+
+
+def test_sequential_replications_stop_at_precision():
+    values = np.random.RandomState(2).normal(100.0, 10.0, 1000)
+    stopped = sequential_replications(iter(values), precision=0.05, min_sim=10)
+    assert 10 <= len(stopped) < 1000
+    assert relative_half_width(stopped) <= 0.05
+    assert relative_half_width(stopped[:-1]) > 0.05 or len(stopped) == 10
+    assert len(sequential_replications(iter(values))) == 1000
@@ -0,0 +1,46 @@
+import itertools
+import numpy as np
+import pytest
+from distributions_mps import availability_pmfs
+from evaluation_mps import draw_availabilities, expected_procurement_cost
+from instances_mps import generate_instance
+from models_mps import ProductionPlanModel
+
+
+def enumerated_procurement_cost(R_a, consumption, remaining, pmfs, b, c):
+    # expected procurement cost by enumerating every path of availabilities with the rule of the simulations
+    expected_cost = 0.0
+    for path in itertools.product(*(zip(values, probabilities) for values, probabilities in pmfs)):
+        R_value, cost, probability = R_a, 0.0, 1.0
+        for t, (realized_A, path_probability) in enumerate(path):
+            realized_v, realized_w = ProductionPlanModel._realized_procurement(
+                R_value, realized_A, consumption[t], remaining[t])
+            R_value += realized_v + realized_w - consumption[t]
+            cost += b * realized_v + c * realized_w
+            probability *= path_probability
+        expected_cost += probability * cost
+    return expected_cost
+
+
+@pytest.mark.parametrize("distribution", ["uniform", "binomial", {"type": "normal", "cv": 0.3}])
+def test_expected_procurement_cost_matches_enumeration(distribution):
+    consumption = np.array([4.0, 7.5, 2.0, 6.0])
+    remaining = np.cumsum(consumption[::-1])[::-1]
+    pmfs = availability_pmfs([[3, 5, 2, 4]], distribution)[0]
+    expected_cost = expected_procurement_cost(3.0, consumption, remaining, pmfs, 7.0, 40.0)
+    assert expected_cost == pytest.approx(enumerated_procurement_cost(3.0, consumption, remaining, pmfs, 7.0, 40.0))
+
+
+def test_expected_schedule_CM_matches_simulation():
+    instance = generate_instance(T=4, n=3, m=3, m_A=1, q=1, seed=5)
+    model = ProductionPlanModel(instance["n"], instance["T"], instance["m"], 1, instance["m_A"],
+                                range(instance["m_A"]), instance["I_minus_I_A"], instance["R_fix"], instance["a"],
+                                instance["p"], instance["d"], instance["A"], np.asarray(instance["A"])[:, :, None],
+                                instance["h"], instance["k"], instance["b"], instance["c"], instance["R_a"],
+                                instance["x_a"], solver="highs")
+    model.build_model()
+    model.optimize()
+    real_CMs = model.schedule_replications(draw_availabilities(model.A, 20000))
+    standard_error = real_CMs.std(ddof=1) / np.sqrt(len(real_CMs))
+    assert standard_error > 0
+    assert abs(model.expected_schedule_CM() - real_CMs.mean()) < 4 * standard_error
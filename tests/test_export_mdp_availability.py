@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from export_mdp_availability import POLICY_SHEET, RESULT_COLUMNS, ResultStore, write_excel
+
+PARAMS = {"d_max": 10, "x_max": 20, "y_max": 15}
+PERFORMANCE = {key: float(index) for index, key in enumerate(RESULT_COLUMNS)}
+POLICY = {"Inventory Level": [-1, 0, 1], "Order Quantity": [3, 2, 0], "Probability": [0.2, 0.5, 0.3]}
+
+
+def test_append_writes_one_file_per_run(tmp_path):
+    store = ResultStore(str(tmp_path / "store"))
+    assert len(store) == 0 and store.metrics() is None
+    runs = [store.append(sheet, PARAMS, PERFORMANCE, POLICY) for sheet in ("A", "B", "A")]
+    assert len(store) == 3
+    assert len(os.listdir(store.metrics_dir)) == 3
+    metrics = store.metrics()
+    assert sorted(metrics["run"]) == sorted(runs)
+    assert list(metrics["sheet"]) == ["A", "B", "A"]
+    assert metrics["Expected shortage"].tolist() == [PERFORMANCE["Expected shortage"]] * 3
+    assert len(store.policies()) == 3 * len(POLICY["Order Quantity"])
+
+
+def test_export_to_excel(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    store = ResultStore(str(tmp_path / "store"))
+    for sheet in ("A", "B", "A"):
+        store.append(sheet, PARAMS, PERFORMANCE, POLICY)
+    path = write_excel(str(tmp_path / "results.xlsx"), store.metrics(), store.policies())
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    assert workbook.sheetnames == ["A", "B", POLICY_SHEET]
+    assert len(list(workbook["A"].iter_rows())) == 3
+    # the import of an exported workbook restores its metrics (the policies are not imported)
+    imported = ResultStore(str(tmp_path / "imported"))
+    imported.import_excel(path)
+    assert sorted(imported.metrics()["sheet"]) == ["A", "A", "B"]
+    workbook.close()
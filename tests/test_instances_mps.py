@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from instances_mps import MPSInstance, generate_instance
+from sampling_mps import draw_samples
+
+
+def sample_instance(q=6):
+    instance = MPSInstance.from_dict(generate_instance(T=5, n=3, m=4, m_A=2, q=q, seed=3))
+    return instance.with_samples(draw_samples(instance.A, q))
+
+
+def test_arrays_are_typed_and_taken_over_without_copying():
+    instance = sample_instance()
+    assert instance.A.dtype == np.int64 and instance.A_l.dtype == np.int64
+    assert instance.d.dtype == np.float64 and instance.a.dtype == np.float64
+    assert instance.q == 6
+    assert instance.with_samples(instance.A_l).A_l is instance.A_l
+    # integral floats are accepted for integer fields
+    assert MPSInstance(**{**instance.arrays(), "A": instance.A.astype(float)}).A.dtype == np.int64
+
+
+@pytest.mark.parametrize("name, value, message", [
+    ("d", np.ones((3, 4)), "shape"),
+    ("A_l", np.ones((2, 5)), "shape"),
+    ("R_fix", np.ones((3, 5)), "shape"),
+    ("A", np.full((2, 5), 2.5), "integral"),
+    ("A_l", np.full((2, 5, 3), 0.5), "integral"),
+    ("a", -np.ones((4, 3)), "non-negative"),
+])
+def test_invalid_arrays_are_rejected(name, value, message):
+    with pytest.raises(ValueError, match=message):
+        MPSInstance(**{**sample_instance().arrays(), name: value})
+
+
+def test_invalid_number_of_secondary_factors_is_rejected():
+    with pytest.raises(ValueError, match="m_A"):
+        MPSInstance(**{**sample_instance().arrays(), "m_A": 5})
+
+
+def test_tail_holds_views_of_the_remaining_periods():
+    instance = sample_instance()
+    x_a, R_a = np.array([1.0, 2.0, 3.0]), np.array([4.0, 5.0])
+    tail = instance.tail(2, x_a, R_a)
+    assert tail.T == 3 and tail.q == instance.q
+    np.testing.assert_array_equal(tail.d, instance.d[:, 2:])
+    np.testing.assert_array_equal(tail.A_l, instance.A_l[:, 2:, :])
+    np.testing.assert_array_equal(tail.R_fix, instance.R_fix[:, 2:])
+    assert np.shares_memory(tail.d, instance.d) and np.shares_memory(tail.A_l, instance.A_l)
+    np.testing.assert_array_equal(tail.x_a, x_a)
+    np.testing.assert_array_equal(tail.R_a, R_a)
+    # other samples of the remaining periods replace those of the instance
+    other = np.zeros((2, 3, 4), dtype=np.int64)
+    assert instance.tail(2, x_a, R_a, other).A_l is other
+
+
+def assert_same_instance(loaded, instance):
+    for name, value in instance.arrays().items():
+        if isinstance(value, np.ndarray):
+            np.testing.assert_array_equal(getattr(loaded, name), value)
+            assert getattr(loaded, name).dtype == value.dtype
+        else:
+            assert getattr(loaded, name) == value
+
+
+def test_json_header_with_memory_mapped_samples(tmp_path):
+    instance = sample_instance()
+    path = instance.save(str(tmp_path / "instance.json"))
+    cube = np.load(tmp_path / "instance_samples.npy", mmap_mode="r")
+    # the samples are stored in the layout [l, i, t]
+    assert cube.shape == (instance.q, instance.m_A, instance.T)
+    np.testing.assert_array_equal(cube, np.moveaxis(instance.A_l, 2, 0))
+    assert_same_instance(MPSInstance.load(path), instance)
+    # a slice of the samples is a view of the mapped file in the layout [i, t, l]
+    block = MPSInstance.load(path, samples=slice(2, 5))
+    assert isinstance(block.A_l.base, np.memmap)
+    np.testing.assert_array_equal(block.A_l, instance.sample_block(2, 5))
+    assert MPSInstance.load(path, samples=None).A_l is None
+
+
+def test_npz_round_trip(tmp_path):
+    instance = sample_instance()
+    path = instance.save(str(tmp_path / "instance.npz"))
+    assert_same_instance(MPSInstance.load(path), instance)
+    np.testing.assert_array_equal(MPSInstance.load(path, samples=[0, 3]).A_l, instance.A_l[:, :, [0, 3]])
+    assert MPSInstance.load(path, samples=None).A_l is None
+
+
+def test_json_instance_without_samples(tmp_path):
+    instance = sample_instance().with_samples(None)
+    path = instance.save(str(tmp_path / "instance.json"))
+    assert not (tmp_path / "instance_samples.npy").exists()
+    assert_same_instance(MPSInstance.load(path), instance)
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from scipy import sparse
+
+from lp_backend import MINIMIZE, OPTIMAL, SparseLP
+
+
+def small_lp(solver="highs"):
+    # max 3x + 2y  s.t.  x + y <= 4,  x + 3y <= 9,  x <= 3  (optimum x = 3, y = 1 with objective value 11)
+    model = SparseLP("small", solver=solver)
+    model.setParam("OutputFlag", 0)
+    x = model.add_vars(2)
+    model.add_constrs(np.stack([x, x]), [[1.0, 1.0], [1.0, 3.0]], "<", [4.0, 9.0])
+    model.add_constrs(x[None, :1], 1.0, "<", 3.0)
+    model.set_objective(model.linear(x, [3.0, 2.0]))
+    return model
+
+
+def test_highs_solution_and_duals():
+    model = small_lp()
+    assert model.optimize()
+    assert model.status == OPTIMAL
+    assert model.objVal == pytest.approx(11.0)
+    np.testing.assert_allclose(model.getAttr("X", [0, 1]), [3.0, 1.0], atol=1e-9)
+    # x + y <= 4 and x <= 3 are binding with dual prices 2 and 1
+    np.testing.assert_allclose(model.Pi, [2.0, 0.0, 1.0], atol=1e-9)
+
+
+def test_highs_minimize_with_greater_equal_rows():
+    # min x + y  s.t.  x + 2y >= 4,  3x + y >= 6  (optimum at x = 1.6, y = 1.2)
+    model = SparseLP("min", solver="highs")
+    x = model.add_vars(2)
+    model.add_constrs(np.stack([x, x]), [[1.0, 2.0], [3.0, 1.0]], ">", [4.0, 6.0])
+    model.set_objective(model.linear(x, 1.0), sense=MINIMIZE)
+    assert model.optimize()
+    assert model.objVal == pytest.approx(2.8)
+    np.testing.assert_allclose(model.X, [1.6, 1.2], atol=1e-9)
+    np.testing.assert_allclose(model.Pi, [0.4, 0.2], atol=1e-9)
+
+
+def test_sparse_matrix_rows_match_dense_rows():
+    # the rows of small_lp given as a sparse matrix over the columns in reverse order
+    model = SparseLP("sparse", solver="highs")
+    x = model.add_vars(2)
+    model.add_matrix_constrs(x[::-1], sparse.coo_matrix([[1.0, 1.0], [3.0, 1.0], [0.0, 1.0]]), "<", [4.0, 9.0, 3.0])
+    model.set_objective(model.linear(x, [3.0, 2.0]))
+    assert model.optimize()
+    assert model.objVal == pytest.approx(11.0)
+    np.testing.assert_allclose(model.Pi, [2.0, 0.0, 1.0], atol=1e-9)
+    # zero coefficients are not stored
+    assert model.NumNZs == 5
+
+
+def test_lexicographic_keeps_primary_optimum():
+    # max x + y  s.t.  x + y <= 4,  x <= 3,  y <= 3, then max y among the optima of the first objective
+    model = SparseLP("lexicographic", solver="highs")
+    x = model.add_vars(2, ub=3.0)
+    model.add_constrs(x[None, :], 1.0, "<", 4.0)
+    primary = model.linear(x, 1.0)
+    model.set_objective(primary)
+    assert model.optimize_lexicographic([primary, model.linear(x[1:], 1.0)])
+    np.testing.assert_allclose(model.X, [1.0, 3.0], atol=1e-7)
+    # objVal reports the primary objective; the objective constraints are removed again
+    assert model.objVal == pytest.approx(4.0)
+    assert model.num_constrs == 1
+    assert len(model.Pi) == 1
+    np.testing.assert_array_equal(model.obj, primary)
+
+
+def test_gurobi_matches_highs():
+    pytest.importorskip("gurobipy")
+    highs, gurobi = small_lp("highs"), small_lp("gurobi")
+    assert highs.optimize() and gurobi.optimize()
+    assert gurobi.objVal == pytest.approx(highs.objVal)
+    np.testing.assert_allclose(gurobi.X, highs.X, atol=1e-9)
+    np.testing.assert_allclose(gurobi.Pi, highs.Pi, atol=1e-9)
@@ -0,0 +1,147 @@
+from functools import partial
+import numpy as np
+import pytest
+from evaluation_mps import RunningStatistics, draw_availabilities
+from instances_mps import MPSInstance, generate_instance
+from models_det import ProductionDetPlanModel
+from models_mps import ProductionPlanModel
+from models_sto import ProductionStoPlanModel
+from sampling_mps import draw_sample_pool, draw_samples
+
+
+def small_instance(q=4, seed=5):
+    instance = MPSInstance.from_dict(generate_instance(T=4, n=3, m=3, m_A=1, q=q, seed=seed))
+    return instance.with_samples(draw_samples(instance.A, q))
+
+
+def solved_model(instance, solver="gurobi"):
+    model = ProductionPlanModel.from_instance(instance, solver_params={"OutputFlag": 0}, solver=solver)
+    model.build_model()
+    assert model.optimize()
+    return model
+
+
+def optimality_constraint_reoptimization(instance, epsilon):
+    # profit and weighted procurement of the non-anticipativity stage as formulated originally: a second solve
+    # minimizing the weighted procurement subject to an equality constraint on the optimal profit
+    gp = pytest.importorskip("gurobipy")
+    model = solved_model(instance)
+    model.model.addConstr(model.profit == model.model.objVal, name="OptimalityConstraint")
+    model.model.setObjective(model.non_anticipativity_objective(epsilon), gp.GRB.MINIMIZE)
+    model.model.optimize()
+    return model.profit.getValue(), model.model.objVal
+
+
+def test_non_anticipativity_reoptimization_can_be_repeated():
+    pytest.importorskip("gurobipy")
+    instance = small_instance()
+    model = solved_model(instance)
+    for epsilon in (0.1, 0.1, 0.2):
+        profit, weighted_procurement = optimality_constraint_reoptimization(instance, epsilon)
+        assert model.reoptimize_subject_to_non_anticipativity(epsilon)
+        assert model.profit.getValue() == pytest.approx(profit)
+        assert model.non_anticipativity_objective(epsilon).getValue() == pytest.approx(weighted_procurement)
+    # the model is back to the single profit objective
+    assert model.optimize()
+    assert model.model.NumObj == 1
+    assert model.model.objVal == pytest.approx(profit)
+
+
+def expected_value_model(instance):
+    # optimal profit and production of the expected value model as formulated originally, without a sample index
+    gp = pytest.importorskip("gurobipy")
+    n, T, m_A = instance.n, instance.T, instance.m_A
+    model = gp.Model("MPS_CE")
+    model.Params.OutputFlag = 0
+    x = model.addVars(n, T + 1)
+    y = model.addVars(n, T)
+    z = model.addVars(n, T)
+    v = model.addVars(m_A, T)
+    w = model.addVars(m_A, T)
+    R = model.addVars(m_A, T + 1)
+    model.setObjective(gp.quicksum(
+        gp.quicksum(instance.p[j]*z[j, t] - instance.k[j]*y[j, t] - instance.h[j]*x[j, t+1] for j in range(n))
+        - gp.quicksum(instance.b[i]*v[i, t] + instance.c[i]*w[i, t] for i in instance.I_A)
+        for t in range(T)), gp.GRB.MAXIMIZE)
+    for t in range(T):
+        for i in instance.I_minus_I_A:
+            model.addConstr(gp.quicksum(instance.a[i, j]*y[j, t] for j in range(n)) <= instance.R_fix[i-m_A, t])
+    model.addConstrs(x[j, 0] == instance.x_a[j] for j in range(n))
+    model.addConstrs(R[i, 0] == instance.R_a[i] for i in instance.I_A)
+    for t in range(T):
+        for j in range(n):
+            model.addConstr(x[j, t+1] == x[j, t] + y[j, t] - z[j, t])
+            model.addConstr(z[j, t] <= instance.d[j, t])
+        for i in instance.I_A:
+            model.addConstr(R[i, t+1] == R[i, t] + v[i, t] + w[i, t]
+                            - gp.quicksum(instance.a[i, j]*y[j, t] for j in range(n)))
+            model.addConstr(v[i, t] <= instance.A[i, t])
+    model.optimize()
+    return model.objVal
+
+
+@pytest.mark.parametrize("solver", ["gurobi", "highs"])
+def test_single_sample_core_reproduces_expected_value_model(solver):
+    instance = small_instance(q=1)
+    objective = expected_value_model(instance)
+    deterministic = ProductionDetPlanModel.from_instance(instance, {"OutputFlag": 0}, solver=solver)
+    deterministic.build_model()
+    assert deterministic.optimize()
+    assert deterministic.model.ModelName == "MPS_CE"
+    assert deterministic.model.objVal == pytest.approx(objective)
+    # the sampling approximation with the expected availabilities as its only sample is the same model
+    stochastic = ProductionStoPlanModel.from_instance(instance.with_samples(instance.A[:, :, None]),
+                                                      {"OutputFlag": 0}, solver=solver)
+    stochastic.build_model()
+    assert stochastic.optimize()
+    assert stochastic.model.ModelName == "MPS_CE_Sampling"
+    assert stochastic.model.objVal == pytest.approx(objective)
+    np.testing.assert_allclose(stochastic.solution_arrays()["y"], deterministic.solution_arrays()["y"], atol=1e-6)
+
+
+def test_resampled_stages_use_rotating_sample_blocks():
+    instance = small_instance()
+    model = solved_model(instance, solver="highs")
+    sample_pool = draw_sample_pool(instance.A, instance.q, num_blocks=3)
+    stage_samples = []
+    tail_model = model.tail_model
+
+    def recording_tail_model(tau, x_init, R_init, A_l=None):
+        stage_samples.append(A_l)
+        return tail_model(tau, x_init, R_init, A_l)
+
+    model.tail_model = recording_tail_model
+    real_CMs = model.resampled_rolling_schedule_replications(draw_availabilities(instance.A, 2), 0.0, sample_pool)
+    assert len(real_CMs) == 2
+    assert len(stage_samples) == 2 * instance.T
+    for ctr in range(2):
+        for tau in range(instance.T):
+            np.testing.assert_array_equal(stage_samples[ctr*instance.T + tau],
+                                          sample_pool[(ctr + tau) % 3][:, tau:, :])
+
+
+@pytest.mark.parametrize("epsilon", [0.0, 0.1])
+def test_shrinking_horizon_matches_pinned_rolling_schedule(epsilon):
+    pytest.importorskip("gurobipy")
+    instance = small_instance()
+    model = solved_model(instance)
+    realized_A = draw_availabilities(instance.A, 3)
+    pinned = model.rolling_schedule_replications(realized_A, epsilon)
+    shrinking = model.rolling_schedule_replications(realized_A, epsilon, shrinking=True)
+    np.testing.assert_allclose(shrinking, pinned, rtol=1e-6)
+    # the pinned mode restores the full model after each replication
+    assert model.optimize()
+
+
+def test_sequential_replications_are_a_prefix_of_all_replications():
+    instance = small_instance()
+    model = solved_model(instance, solver="highs")
+    realized_A = draw_availabilities(instance.A, 30)
+    for replications in (model.schedule_replications, partial(model.rolling_schedule_replications, epsilon=0.0)):
+        all_CMs = replications(realized_A)
+        stopped = replications(realized_A, precision=0.5, min_sim=3)
+        assert 3 <= len(stopped) < len(all_CMs)
+        np.testing.assert_allclose(stopped, all_CMs[:len(stopped)])
+        statistics = RunningStatistics().update(stopped)
+        assert statistics.mean == pytest.approx(all_CMs[:len(stopped)].mean())
+        assert statistics.relative_half_width <= 0.5
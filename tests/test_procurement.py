@@ -0,0 +1,29 @@
+import pytest
+
+from backend_mdp_availability import run_gurobi_solver
+
+BASE = {"d_max": 10, "x_max": 20, "y_max": 15, "pi": 5, "h": 1, "k": 5, "v": 20, "par_pD": 0.5, "par_pY": 0.5,
+        "mu_D": 0, "sigma_D": 0, "mu_Y": 0, "sigma_Y": 0}
+
+
+def test_binomial_defaults():
+    policy, performance = run_gurobi_solver(BASE, solver="highs")
+    assert performance["Expected total cost per period"] == pytest.approx(33.394)
+    assert performance["Expected order quantity"] == pytest.approx(5.195, abs=1e-4)
+    assert max(policy["Order Quantity"]) == 8
+
+
+@pytest.mark.parametrize("solver", ["highs", "gurobi"])
+def test_orders_above_d_max(solver):
+    # every state has its own feasible actions q <= x_max - x + d_max, so orders above d_max are possible (they were
+    # limited to the actions of x_max, i.e. to d_max = 10, before)
+    if solver == "gurobi":
+        pytest.importorskip("gurobipy")
+    params = dict(BASE, par_pY=0, mu_Y=6, sigma_Y=2)
+    policy, performance = run_gurobi_solver(params, solver_params={"OutputFlag": 0}, solver=solver)
+    assert performance["Expected total cost per period"] == pytest.approx(35.0988)
+    assert performance["Expected order quantity"] == pytest.approx(8.2642, abs=1e-4)
+    assert performance["Expected inventory level"] == pytest.approx(3.8386)
+    # order quantities of the inventory levels -10, ..., 20
+    assert list(policy["Inventory Level"]) == list(range(-10, 21))
+    assert list(policy["Order Quantity"]) == [13] * 11 + [12, 11, 10, 9, 8, 7] + [0] * 14
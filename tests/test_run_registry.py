@@ -0,0 +1,25 @@
+from run_registry import RunRegistry, parameter_hash
+
+
+def test_find_by_parameters(tmp_path):
+    registry = RunRegistry(str(tmp_path / "runs.sqlite"))
+    first = registry.record("mps_stochastic", {"T": 12, "q": 50, "status": "draft", "limit": 5})
+    second = registry.record("mps_stochastic", {"T": 6, "q": 100, "status": "final", "limit": 50})
+    registry.record("procurement", {"T": 12}, status="failed")
+    assert [run["id"] for run in registry.find("mps_stochastic", params={"T": 12})] == [first]
+    assert [run["id"] for run in registry.find(params={"q": (">=", 50)})] == [second, first]
+    # parameters may have the names of the filters on the runs
+    assert [run["id"] for run in registry.find(params={"status": "draft"})] == [first]
+    assert [run["id"] for run in registry.find(params={"limit": (">", 10)}, limit=5)] == [second]
+    assert len(registry.find(status="failed")) == 1
+
+
+def test_latest_run_of_a_scenario(tmp_path):
+    registry = RunRegistry(str(tmp_path / "runs.sqlite"))
+    params, inputs = {"T": 12}, {"A": [[1, 2]]}
+    registry.record("mps_deterministic", params, inputs, results={"CM": 1.0})
+    newer = registry.record("mps_deterministic", params, inputs, results={"CM": 2.0})
+    run = registry.latest(params, inputs)
+    assert run["id"] == newer
+    assert run["param_hash"] == parameter_hash(params, inputs)
+    assert run["results"] == {"CM": 2.0}
@@ -0,0 +1,170 @@
+import asyncio
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import solve_service
+from backend_det import run_gurobi_solver as run_deterministic
+from instances_mps import MPSInstance, generate_instance
+from run_control import Cancelled, RunControl
+from solve_client import ServiceError, SolveClient, remote_solver
+from solve_service import MPS_ARGUMENTS, SolveService, solver_params_error
+from timing import TimerRegistry
+
+
+def test_solver_params_error():
+    assert solver_params_error(None) is None
+    assert solver_params_error({"TimeLimit": 60, "Threads": 2, "MIPGap": 1e-4}) is None
+    assert "LogFile" in solver_params_error({"LogFile": "/tmp/gurobi.log", "TimeLimit": 60})
+    assert "ResultFile" in solver_params_error({"ResultFile": "model.lp"})
+    assert "TimeLimit" in solver_params_error({"TimeLimit": "60"})
+    assert "Method" in solver_params_error({"Method": True})
+    assert "TimeLimit" in solver_params_error({"TimeLimit": float("inf")})
+    assert solver_params_error(["TimeLimit", 60]) is not None
+
+
+@pytest.fixture
+def service():
+    service = SolveService(workers=1)
+    yield service
+    service.executor.shutdown()
+    service.manager.shutdown()
+
+
+def test_submit_rejects_file_parameters(service):
+    status, response = service.submit({"application": "procurement",
+                                       "arguments": {"params": {}, "solver_params": {"LogFile": "/etc/passwd"}}})
+    assert status == 400
+    assert "LogFile" in response["error"]
+    assert not service.jobs
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_with_server(service, client_calls):
+    # serve in the event loop of the test and make the (blocking) client calls in a thread
+    port = free_port()
+    client = SolveClient(f"http://127.0.0.1:{port}", timeout=10.0)
+
+    async def main():
+        server = asyncio.create_task(service.serve("127.0.0.1", port))
+        try:
+            for _ in range(100):
+                try:
+                    await asyncio.to_thread(client.health)
+                    break
+                except ServiceError:
+                    await asyncio.sleep(0.05)
+            return await asyncio.to_thread(client_calls, client)
+        finally:
+            server.cancel()
+            await asyncio.gather(server, return_exceptions=True)
+
+    return asyncio.run(main())
+
+
+def wait_for(client, job_id, *statuses):
+    for _ in range(200):
+        job = client.job(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} is still {job['status']}.")
+
+
+@pytest.fixture
+def blocking_service(monkeypatch):
+    # service whose jobs run in a thread of the test process until they are released (or cancelled)
+    release = threading.Event()
+
+    def blocking_solve_job(application, arguments, results_dir, registry_path=None, cancel_event=None,
+                           progress=None):
+        progress.update(phase="optimize", done=0, total=0)
+        while not release.wait(0.02):
+            if cancel_event.is_set():
+                raise Cancelled()
+        return {"results": {"objective": arguments["params"]["objective"]}, "timings": {}}
+
+    monkeypatch.setattr(solve_service, "solve_job", blocking_solve_job)
+    service = SolveService(workers=1, queue_size=1)
+    service.executor.shutdown()
+    service.executor = ThreadPoolExecutor(max_workers=1)
+    yield service, release
+    release.set()
+    service.executor.shutdown()
+
+
+def procurement_job(objective):
+    return {"params": {"objective": objective}, "solver": "highs"}
+
+
+def test_bounded_queue_deduplication_and_cache(blocking_service):
+    service, release = blocking_service
+
+    def client_calls(client):
+        running = client.submit("procurement", procurement_job(1))
+        wait_for(client, running["job"], "running")
+        assert client.job(running["job"])["progress"]["phase"] == "optimize"
+        queued = client.submit("procurement", procurement_job(2))
+        assert queued["status"] == "queued"
+        # the queue holds one waiting job
+        with pytest.raises(ServiceError, match="queue is full"):
+            client.submit("procurement", procurement_job(3))
+        # identical requests are attached to the queued or running job
+        assert client.submit("procurement", procurement_job(1))["job"] == running["job"]
+        assert client.submit("procurement", procurement_job(2))["job"] == queued["job"]
+        assert client.health()["queued"] == 1 and client.health()["running"] == 1
+        release.set()
+        finished = wait_for(client, queued["job"], "finished")
+        assert finished["results"] == {"objective": 2}
+        # a finished result is answered from the cache without a new job
+        cached = client.submit("procurement", procurement_job(1))
+        assert cached["cached"] and cached["job"] == running["job"] and cached["results"] == {"objective": 1}
+        assert client.health()["cached"] == 2
+
+    run_with_server(service, client_calls)
+
+
+def test_cancellation(blocking_service):
+    service, _ = blocking_service
+
+    def client_calls(client):
+        running = client.submit("procurement", procurement_job(1))
+        wait_for(client, running["job"], "running")
+        queued = client.submit("procurement", procurement_job(2))
+        assert client.cancel(queued["job"])["status"] == "cancelled"
+        assert client.cancel(running["job"])["status"] == "running"
+        assert wait_for(client, running["job"], "cancelled", "finished")["status"] == "cancelled"
+        with pytest.raises(ServiceError, match="already cancelled"):
+            client.cancel(running["job"])
+        # cancelled jobs are not cached, and cancelling the control of a waiting client cancels its job
+        control = RunControl(on_progress=lambda phase, done, total: control.cancel())
+        with pytest.raises(Cancelled):
+            client.solve("procurement", procurement_job(1), control, poll_interval=0.02)
+        assert client.health()["cached"] == 0
+
+    run_with_server(service, client_calls)
+
+
+def test_client_solves_in_worker_process(tmp_path):
+    instance = MPSInstance.from_dict(generate_instance(T=4, n=3, m=3, m_A=1, q=4, seed=5))
+    args = [getattr(instance, key) for key in MPS_ARGUMENTS]
+    expected = run_deterministic(*args, solver="highs", num_sim=2, results_dir=str(tmp_path / "local"))
+    service = SolveService(workers=1, results_dir=str(tmp_path / "service"))
+
+    def client_calls(client):
+        timers = TimerRegistry("remote")
+        # the instance is passed positionally, as by the frontends
+        results = remote_solver("mps_deterministic", client.url)(*args, solver="highs", num_sim=2, timers=timers)
+        assert "optimize" in timers.phases
+        return results
+
+    results = run_with_server(service, client_calls)
+    assert results.keys() == expected.keys()
+    for key, value in expected.items():
+        assert results[key] == pytest.approx(value)
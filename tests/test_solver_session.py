@@ -0,0 +1,58 @@
+import threading
+import pytest
+from solver_session import EnvPool, SolverSession, ThreadBudget
+
+
+def test_env_pool_reuses_environments():
+    pytest.importorskip("gurobipy")
+    pool = EnvPool(size=2, params={"OutputFlag": 0})
+    with pool.acquire() as first:
+        pass
+    with pool.acquire() as second:
+        # the environment is reused; a concurrent solve gets a second one
+        assert second is first
+        with pool.acquire() as third:
+            assert third is not first
+    assert pool._created == 2
+    pool.close()
+    assert pool._created == 0
+
+
+def test_thread_budget_waits_for_free_cores():
+    budget = ThreadBudget(cores=4)
+    with budget.reserve(16) as granted:
+        # requests are limited to the cores of the budget
+        assert granted == 4
+    assert budget.free == 4
+    reserved = threading.Event()
+    release = threading.Event()
+
+    def solve():
+        with budget.reserve(2):
+            reserved.set()
+            release.wait(5)
+
+    with budget.reserve(3):
+        waiting = threading.Thread(target=solve)
+        waiting.start()
+        # the second solve waits until the first one returns its threads
+        assert not reserved.wait(0.1)
+        assert budget.free == 1
+    assert reserved.wait(5)
+    assert budget.free == 2
+    release.set()
+    waiting.join(5)
+    assert budget.free == 4
+
+
+def test_session_splits_the_cores_among_the_environments():
+    pytest.importorskip("gurobipy")
+    with SolverSession(pool_size=2, cores=8, method=1, env_params={"OutputFlag": 0}) as session:
+        assert session.threads == 4
+        with session.job(solver_params={"TimeLimit": 10}) as (env, solver_params):
+            assert solver_params == {"TimeLimit": 10, "Threads": 4, "Method": 1}
+            assert session.budget.free == 4
+        # Threads of the solver parameters is a request, granted within the budget
+        with session.job(solver_params={"Threads": 16}, method=2) as (env, solver_params):
+            assert solver_params == {"Threads": 8, "Method": 2}
+        assert session.budget.free == 8